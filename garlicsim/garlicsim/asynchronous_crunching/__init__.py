@@ -17,6 +17,7 @@ from .base_cruncher import BaseCruncher
 from . import crunchers
 from .project import Project
 from .job import Job
+from .job_list import JobList
 from .crunching_manager import CrunchingManager
 
 
@@ -27,4 +28,43 @@ The `max_size` given to the crunchers' work queues.
 This is needed for simpacks with very fast step functions, because without a
 `max_size` the cruncher might work so fast that the GUI will never catch up
 with it.
-'''
\ No newline at end of file
+'''
+
+CRUNCHER_BATCH_SIZE = 100
+'''
+The maximal number of states that a cruncher puts in its work queue at once.
+
+Crunchers collect the states they produce into batches, (lists of states,) and
+put each batch in their work queue as one item, which the crunching manager
+adds to the tree in one operation. This saves a lot of queue and pickling
+overhead for simpacks with fast step functions. Set to 1 to make crunchers put
+the states in the queue one by one.
+'''
+
+CRUNCHER_BATCH_INTERVAL = 0.1
+'''
+The maximal time, in seconds, that a cruncher holds states before sending them.
+
+A batch is sent when it reaches `CRUNCHER_BATCH_SIZE` states, or when a state
+is crunched this much time after the last batch was sent, whichever comes
+first. So with slow step functions, states are sent one by one without delay.
+'''
+
+
+PROCESS_CRUNCHER_SHARED_MEMORY_SIZE = 64 * 2**20
+'''
+The size, in bytes, of the shared memory through which processes send states.
+
+`ProcessCruncher` sends states through shared memory when the simpack's state
+type defines the `dump_payload` and `load_payload` hooks, (see `State`,) which
+saves pickling big states. The memory is allocated lazily by the OS, so a big
+size costs little. Set to 0 to always send states through the work queue.
+'''
+
+
+PROCESS_POOL_SIZE = None
+'''
+The number of free worker processes that `ProcessPoolCruncher`'s pool keeps.
+
+`None` means one per processor core.
+'''
@@ -48,6 +48,14 @@ class BaseCruncher(object):
     
     This will be displayed to GUI users who may not be programmers.
     '''
+    
+    history_browser = None
+    '''
+    The history browser used by the cruncher, if it has one in our process.
+    
+    The crunching manager tells it about the nodes it adds to the tree from
+    the cruncher's work. (See `HistoryBrowser.add_nodes`.)
+    '''
 
     
     def __init__(self, crunching_manager, initial_state, crunching_profile):
@@ -72,6 +80,17 @@ class BaseCruncher(object):
         assert isinstance(self.crunching_profile,
                           garlicsim.asynchronous_crunching.CrunchingProfile)
         
+        self.detect_cycles = self.project.simpack_grokker.can_detect_cycles(
+            self.crunching_profile.step_profile
+        )
+        '''
+        Flag saying whether the cruncher should stop when the simulation cycles.
+        
+        If it's set, the cruncher gives every state it produces to a
+        `CycleDetector`, and when the simulation gets back to a state it had
+        before, the cruncher puts a `CycleMarker` in its work queue and stops.
+        '''
+        
     
     @abc_tools.abstract_static_method
     def can_be_used_with_simpack_grokker(simpack_grokker):
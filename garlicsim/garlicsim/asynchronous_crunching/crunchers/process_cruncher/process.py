@@ -30,12 +30,23 @@ class Process(multiprocessing.Process):
     # prevent us from getting the crunching manager as an argument, since it's
     # not pickleable.
     
-    def __init__(self, step_iterator_getter, initial_state, crunching_profile):        
+    def __init__(self, step_iterator_getter, initial_state, crunching_profile,
+                 detect_cycles=False, transition_cache=None):
         multiprocessing.Process.__init__(self)
         
         self.step_iterator_getter = step_iterator_getter
         '''
         Function that return a step iterator given a state and step profile.
+        
+        It also takes a `transition_cache` keyword argument, like
+        `SimpackGrokker.get_step_iterator`.
+        '''
+        
+        self.transition_cache = transition_cache
+        '''
+        `TransitionCache` for the step iterator to use, or `None` for no cache.
+        
+        This is the process' own copy of the project's cache.
         '''
         
         self.initial_state = initial_state
@@ -45,6 +56,9 @@ class Process(multiprocessing.Process):
         
         self.crunching_profile = crunching_profile
         
+        self.detect_cycles = detect_cycles
+        '''Flag saying whether to stop when the simulation cycles.'''
+        
         self.daemon = True
 
         self.work_queue = multiprocessing.Queue(
@@ -54,12 +68,41 @@ class Process(multiprocessing.Process):
         Queue for putting completed work to be picked up by the main thread.
         
         In this queue the cruncher will put the states that it produces, in
-        chronological order. If the cruncher reaches a simulation ends, it will
+        chronological order, either one by one or in batches. (Lists of states;
+        see `WorkBatcher`.) If the cruncher reaches a simulation ends, it will
         put an `EndMarker` in this queue.
         '''
         
         self.order_queue = multiprocessing.Queue()
         '''Queue for receiving instructions from the main thread.'''
+        
+        self.batch_size = garlicsim.asynchronous_crunching.CRUNCHER_BATCH_SIZE
+        '''The maximal number of states we put in the work queue at once.'''
+        
+        self.batch_interval = \
+            garlicsim.asynchronous_crunching.CRUNCHER_BATCH_INTERVAL
+        '''The maximal time, in seconds, that we hold states before sending.'''
+        
+        shared_memory_size = \
+            garlicsim.asynchronous_crunching.PROCESS_CRUNCHER_SHARED_MEMORY_SIZE
+        state_type = type(initial_state)
+        if shared_memory_size and (state_type.dump_payload is not None) and \
+           (state_type.load_payload is not None) and \
+           (sys.platform != 'win32'):
+            # (On Windows the process gets pickled rather than forked, and the
+            # shared memory can't be pickled.)
+            self.shared_memory_ring = \
+                garlicsim.asynchronous_crunching.misc.SharedMemoryRing(
+                    shared_memory_size
+                )
+        else:
+            self.shared_memory_ring = None
+        '''
+        Ring buffer in shared memory for sending states, or `None`.
+        
+        This is used only if the simpack's state type supports it. See
+        `SharedMemoryRing`.
+        '''
     
         
     def set_low_priority(self):
@@ -94,6 +137,7 @@ class Process(multiprocessing.Process):
         its job, so it is propagated up to this level, where it causes the
         cruncher to terminate.
         '''
+        self.set_low_priority()
         try:
             self.main_loop()
         except ObsoleteCruncherError:
@@ -120,36 +164,79 @@ class Process(multiprocessing.Process):
             
         or 
         
-         4. We have received a new crunching profile which has a different step
+         4. The simulation is deterministic, and it got back to a state it had
+            before, so it will repeat itself from now on.
+            
+        or 
+        
+         5. We have received a new crunching profile which has a different step
             profile than the one we started with. We can't change step profile
             on the fly, so we simply retire and let the crunching manager 
             recruit a new cruncher.
             
         '''
-        self.set_low_priority()
-        
         state = self.initial_state
         
         self.step_profile = self.crunching_profile.step_profile
         
-        self.iterator = self.step_iterator_getter(self.initial_state,
-                                                  self.step_profile)
+        self.iterator = self.step_iterator_getter(
+            self.initial_state,
+            self.step_profile,
+            transition_cache=self.transition_cache
+        )
+        
+        if self.detect_cycles:
+            self.cycle_detector = garlicsim.misc.CycleDetector(
+                self.initial_state
+            )
+        else:
+            self.cycle_detector = None
+        
+        self.work_batcher = garlicsim.asynchronous_crunching.misc.WorkBatcher(
+            self.work_queue,
+            max_size=self.batch_size,
+            max_interval=self.batch_interval
+        )
         
         order = None
         
         try:
             for state in self.iterator:
-                self.work_queue.put(state)
+                if self.shared_memory_ring:
+                    self.work_batcher.add(self.shared_memory_ring.pack(state))
+                else:
+                    self.work_batcher.add(state)
+                if self.cycle_detector:
+                    self.check_cycle(state)
                 self.check_crunching_profile(state)
                 order = self.get_order()
                 if order:
                     self.process_order(order) 
         except garlicsim.misc.WorldEnded:
+            self.work_batcher.flush()
             self.work_queue.put(
                 garlicsim.asynchronous_crunching.misc.EndMarker()
             )
 
             
+    def check_cycle(self, state):
+        '''
+        Check if the simulation got back to an earlier state. If so retire.
+        
+        From that state on, the simulation will repeat itself, so there's no
+        point in crunching it. We put a `CycleMarker` in the work queue, which
+        tells the crunching manager how long the cycle is.
+        '''
+        period = self.cycle_detector.check(state)
+        if period:
+            self.work_batcher.flush()
+            self.work_queue.put(
+                garlicsim.asynchronous_crunching.misc.CycleMarker(period)
+            )
+            raise ObsoleteCruncherError("The simulation is repeating itself. "
+                                        "Shutting down.")
+
+            
     def check_crunching_profile(self, state):
         '''
         Check if the cruncher crunched enough states. If so retire.
@@ -159,6 +246,7 @@ class Process(multiprocessing.Process):
         we retire the cruncher.
         '''
         if self.crunching_profile.state_satisfies(state):
+            self.work_batcher.flush()
             raise ObsoleteCruncherError("We're done working, the clock target "
                                         "has been reached. Shutting down.")
     
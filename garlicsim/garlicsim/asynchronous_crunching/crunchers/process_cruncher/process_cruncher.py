@@ -72,7 +72,9 @@ class ProcessCruncher(BaseCruncher):
         self.process = Process(
             self.project.simpack_grokker.get_step_iterator,
             initial_state,
-            crunching_profile
+            crunching_profile,
+            self.detect_cycles,
+            self.project.transition_cache
         )
         '''The actual process which does the crunching.'''
         
@@ -81,12 +83,22 @@ class ProcessCruncher(BaseCruncher):
         Queue for putting completed work to be picked up by the main thread.
         
         In this queue the cruncher will put the states that it produces, in
-        chronological order. If the cruncher reaches a simulation ends, it will
+        chronological order, either one by one or in batches. (Lists of states;
+        see `WorkBatcher`.) If the cruncher reaches a simulation ends, it will
         put an `EndMarker` in this queue.
         '''
         
         self.order_queue = self.process.order_queue
         '''Queue for receiving instructions from the main thread.'''
+        
+        self.shared_memory_ring = self.process.shared_memory_ring
+        '''
+        Ring buffer in shared memory for sending states, or `None`.
+        
+        If the simpack supports it, the process sends states through this ring,
+        putting only `StatePayload` objects in the work queue. See
+        `SharedMemoryRing`.
+        '''
      
     
     @staticmethod
@@ -0,0 +1,153 @@
+# Copyright 2009-2011 Ram Rachum.
+# This program is distributed under the LGPL2.1 license.
+
+'''
+This module defines the `ProcessPoolCruncher` class.
+
+See its documentation for more information.
+'''
+
+import Queue
+
+from garlicsim.general_misc import string_tools
+from garlicsim.general_misc import import_tools
+
+import garlicsim
+from garlicsim.asynchronous_crunching import BaseCruncher
+from ..process_cruncher.process_cruncher import ProcessCruncher, \
+                                                multiprocessing_missing_text
+
+        
+class ProcessPoolCruncher(BaseCruncher):
+    '''
+    Cruncher that crunches from a process kept in a pool of warm processes.
+    
+    A cruncher is a worker which crunches the simulation. It receives a state
+    from the main program, and then it repeatedly applies the step function of
+    the simulation to produce more states. Those states are then put in the
+    cruncher's `.work_queue`. They are then taken by the main program when
+    `Project.sync_crunchers` is called, and put into the tree.
+        
+    Read more about crunchers in the documentation of the `crunchers` package.
+    
+    `ProcessPoolCruncher` is like `ProcessCruncher`, except it doesn't start a
+    new process. The crunching manager keeps a `WorkerPool` of processes, one
+    per processor core by default, (see `PROCESS_POOL_SIZE`,) and each cruncher
+    borrows a process from the pool and gives it back when it's retired. This
+    makes starting crunchers much faster, which matters when forking the
+    simulation or changing the step profile often.
+    '''
+    
+    
+    gui_explanation = string_tools.docstring_trim(
+    '''
+    `ProcessPoolCruncher`:
+    
+     - Works from a `multiprocessing.Process` kept in a pool of processes.
+    
+     - Able to run on a different core of the processor than the main process 
+       or other crunchers, thus utilizing the full power of the processor.
+       
+     - Starts crunching faster than `ProcessCruncher`, because the pool's
+       processes are started in advance and reused.
+     '''
+    )
+    
+    
+    def __init__(self, crunching_manager, initial_state, crunching_profile):
+        
+        BaseCruncher.__init__(self, crunching_manager, initial_state, 
+                              crunching_profile)
+        
+        if not import_tools.exists('multiprocessing'):
+            raise Exception(multiprocessing_missing_text)
+        
+        from .worker_pool import get_worker_pool
+        
+        self.worker_pool = get_worker_pool(crunching_manager, initial_state)
+        '''The pool from which we borrow a worker process.'''
+        
+        self.worker = None
+        '''The worker doing our job, or `None` if we weren't started yet.'''
+        
+        self.work_queue = None
+        '''
+        Queue for putting completed work to be picked up by the main thread.
+        
+        In this queue the cruncher will put the states that it produces, in
+        chronological order, either one by one or in batches. (Lists of states;
+        see `WorkBatcher`.) If the cruncher reaches a simulation ends, it will
+        put an `EndMarker` in this queue.
+        
+        This is the worker, which gives only the work of our job. Until we're
+        started, it's `None`.
+        '''
+        
+        self.retired = False
+        '''Flag saying whether we were retired and gave back our worker.'''
+        
+    
+    @staticmethod
+    def can_be_used_with_simpack_grokker(simpack_grokker):
+        '''
+        Return whether `ProcessPoolCruncher` can be used with `simpack_grokker`.
+        
+        The conditions are the same as for `ProcessCruncher`: The
+        `multiprocessing` module must be installed, and the simpack must not be
+        history-dependent.
+        '''
+        return ProcessCruncher.can_be_used_with_simpack_grokker(
+            simpack_grokker
+        )
+
+        
+    def start(self):
+        '''
+        Start the cruncher so it will start crunching and delivering states.
+        '''
+        self.worker = self.work_queue = self.worker_pool.start_job(
+            self.initial_state,
+            self.crunching_profile,
+            self.detect_cycles
+        )
+
+            
+    def retire(self):
+        '''
+        Retire the cruncher, giving its worker back to the pool.
+        
+        The worker will stop crunching our job as soon as it receives the
+        order.
+        '''
+        if self.retired:
+            return
+        self.retired = True
+        if self.worker is not None:
+            self.worker_pool.release_worker(self.worker)
+            # The worker will go on to other jobs, so we stop using it as our
+            # work queue:
+            self.work_queue = Queue.Queue()
+        
+        
+    def update_crunching_profile(self, profile):
+        '''Update the cruncher's crunching profile. Process-safe.'''
+        if not self.retired:
+            self.worker.give_order(profile)
+        
+        
+    def is_alive(self):
+        '''
+        Report whether the cruncher is alive and crunching.
+        
+        If the worker finished our job by itself, (e.g. it reached the clock
+        target or the simulation ended,) and all its work was taken, we give it
+        back to the pool here, because the crunching manager doesn't retire
+        crunchers that aren't alive.
+        '''
+        if self.retired or (self.worker is None):
+            return False
+        if self.worker.job_finished:
+            if not self.worker.pending_work:
+                self.retire()
+            return False
+        return self.worker.is_alive()
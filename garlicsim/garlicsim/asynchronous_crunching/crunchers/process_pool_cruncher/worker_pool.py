@@ -0,0 +1,263 @@
+# Copyright 2009-2011 Ram Rachum.
+# This program is distributed under the LGPL2.1 license.
+
+'''
+This module defines the `WorkerPool` and `Worker` classes.
+
+See their documentation for more info.
+'''
+
+import collections
+import itertools
+import multiprocessing
+import Queue
+import time
+import weakref
+
+from garlicsim.general_misc import queue_tools
+
+import garlicsim
+from .worker_process import WorkerProcess, JobStartedMarker, \
+                            JobFinishedMarker
+
+
+_pools = weakref.WeakKeyDictionary()
+'''The worker pool of each crunching manager that uses one.'''
+
+
+def get_worker_pool(crunching_manager, template_state):
+    '''
+    Get the worker pool of `crunching_manager`, creating it if needed.
+    
+    `template_state` is a state of the simulation, which is used only to know
+    whether states can be sent through shared memory.
+    
+    The pool's worker processes use the project's `.transition_cache` as it was
+    when the pool was created. When the crunching manager is deleted, the pool
+    is deleted and shuts down its workers, so the pool mustn't refer to the
+    crunching manager or to its project.
+    '''
+    if crunching_manager not in _pools:
+        project = crunching_manager.project
+        size = garlicsim.asynchronous_crunching.PROCESS_POOL_SIZE or \
+               multiprocessing.cpu_count()
+        _pools[crunching_manager] = WorkerPool(
+            project.simpack_grokker.get_step_iterator,
+            template_state,
+            size,
+            project.transition_cache
+        )
+    return _pools[crunching_manager]
+
+
+class Worker(object):
+    '''
+    A worker process in a `WorkerPool`, as seen from the main process.
+    
+    The worker is also the work queue of the job it's currently doing: It has
+    `.qsize` and `.get` methods, which give the states that the process
+    crunched in this job without the markers around them.
+    '''
+    
+    def __init__(self, step_iterator_getter, template_state,
+                 job_start_latencies, transition_cache=None):
+        
+        self.process = WorkerProcess(step_iterator_getter, template_state,
+                                     transition_cache)
+        '''The actual process which does the crunching.'''
+        
+        self.job_number = None
+        '''The number of the current job, or the last one.'''
+        
+        self.job_finished = True
+        '''Flag saying whether the process has finished the current job.'''
+        
+        self.job_start_time = None
+        '''The time at which we gave the current job to the process.'''
+        
+        self.pending_work = collections.deque()
+        '''Work of the current job that we took from the process' queue.'''
+        
+        self.job_start_latencies = job_start_latencies
+        '''Deque to which we append the start latency of every job.'''
+        
+        self.process.start()
+        
+        
+    def start_job(self, job_number, initial_state, crunching_profile,
+                  detect_cycles):
+        '''Give a job to the process.'''
+        assert self.job_finished
+        self.pending_work.clear()
+        self.job_number = job_number
+        self.job_finished = False
+        self.job_start_time = time.time()
+        self.process.order_queue.put(
+            ('start', job_number, initial_state, crunching_profile,
+             detect_cycles)
+        )
+        
+        
+    def give_order(self, order):
+        '''Give an order to the current job, if it's not finished.'''
+        if not self.job_finished:
+            self.process.order_queue.put((self.job_number, order))
+        
+        
+    def receive(self):
+        '''Take everything the process has sent so far from its work queue.'''
+        queue_iterator = queue_tools.iterate(
+            self.process.work_queue,
+            limit_to_original_size=True,
+            _prefetch_if_no_qsize=True
+        )
+        for thing in queue_iterator:
+            if isinstance(thing, JobStartedMarker):
+                self.job_start_latencies.append(
+                    thing.start_time - self.job_start_time
+                )
+            elif isinstance(thing, JobFinishedMarker):
+                self.job_finished = True
+            else:
+                self.pending_work.append(thing)
+                
+                
+    def qsize(self):
+        '''Get the number of pending work items of the current job.'''
+        self.receive()
+        return len(self.pending_work)
+    
+    
+    def get(self, block=False):
+        '''Get the next pending work item of the current job.'''
+        assert block is False
+        try:
+            return self.pending_work.popleft()
+        except IndexError:
+            raise Queue.Empty
+        
+        
+    def is_alive(self):
+        '''Report whether the worker process is alive.'''
+        return self.process.is_alive()
+    
+    
+    def quit(self):
+        '''Make the worker process exit, after its current job.'''
+        self.give_order('retire')
+        self.process.order_queue.put('quit')
+        
+        
+class WorkerPool(object):
+    '''
+    A pool of worker processes, kept warm to crunch jobs of one simulation.
+    
+    Starting a process for every job costs a fork and a lot of memory setup,
+    which delays crunching whenever the user forks the simulation or changes
+    the step profile. The pool starts `size` worker processes in advance, and
+    reuses them for job after job, with any step profile.
+    
+    A worker that's released goes back to the pool only after its process
+    tells us it finished the job it was doing; Until then, we keep taking work
+    from its queue and discarding it. If there's no free worker, we start a new
+    one, and it'll be kept in the pool if there are less than `size` free
+    workers when it's released.
+    '''
+    
+    def __init__(self, step_iterator_getter, template_state, size,
+                 transition_cache=None):
+        
+        self.step_iterator_getter = step_iterator_getter
+        '''Function that gets a step iterator given a state and step profile.'''
+        
+        self.transition_cache = transition_cache
+        '''`TransitionCache` that the workers get a copy of, or `None`.'''
+        
+        self.template_state = template_state
+        '''A state, used to know whether states could use shared memory.'''
+        
+        self.size = size
+        '''The number of free workers we keep.'''
+        
+        self.job_start_latencies = collections.deque(maxlen=100)
+        '''
+        The start latencies of the recent jobs, in seconds.
+        
+        A job's start latency is the time from giving the job to a worker until
+        the worker starts crunching it.
+        '''
+        
+        self.free_workers = [self.__create_worker() for i in xrange(size)]
+        '''Workers which are waiting for a job.'''
+        
+        self.released_workers = []
+        '''Workers which were released but may still be doing their last job.'''
+        
+        self.job_numbers = itertools.count()
+        '''Iterator of numbers for identifying jobs.'''
+        
+        
+    def __create_worker(self):
+        '''Create a worker and start its process.'''
+        return Worker(self.step_iterator_getter, self.template_state,
+                      self.job_start_latencies, self.transition_cache)
+    
+    
+    def __collect_released_workers(self):
+        '''Move released workers which finished their job to the free ones.'''
+        for worker in self.released_workers[:]:
+            if worker.is_alive():
+                worker.receive()
+                worker.pending_work.clear()
+                if not worker.job_finished:
+                    continue
+                if len(self.free_workers) < self.size:
+                    self.free_workers.append(worker)
+                else:
+                    worker.quit()
+            self.released_workers.remove(worker)
+            
+            
+    def start_job(self, initial_state, crunching_profile, detect_cycles=False):
+        '''
+        Give a job to a free worker, and return the worker.
+        
+        If `detect_cycles` is set, the worker will stop when the simulation
+        starts repeating itself. (See `CycleDetector`.)
+        '''
+        self.__collect_released_workers()
+        while self.free_workers:
+            worker = self.free_workers.pop()
+            if worker.is_alive():
+                break
+        else:
+            worker = self.__create_worker()
+        worker.start_job(self.job_numbers.next(), initial_state,
+                         crunching_profile, detect_cycles)
+        return worker
+    
+    
+    def release_worker(self, worker):
+        '''Take back a worker, whose job was retired.'''
+        worker.give_order('retire')
+        self.released_workers.append(worker)
+        self.__collect_released_workers()
+        
+        
+    def get_mean_job_start_latency(self):
+        '''Get the mean start latency of the recent jobs, in seconds.'''
+        if not self.job_start_latencies:
+            return None
+        return sum(self.job_start_latencies) / len(self.job_start_latencies)
+        
+        
+    def shut_down(self):
+        '''Make all the workers' processes exit.'''
+        for worker in self.free_workers + self.released_workers:
+            worker.quit()
+        self.free_workers = []
+        self.released_workers = []
+        
+        
+    def __del__(self):
+        self.shut_down()
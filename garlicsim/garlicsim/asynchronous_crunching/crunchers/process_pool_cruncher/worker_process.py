@@ -0,0 +1,142 @@
+# Copyright 2009-2011 Ram Rachum.
+# This program is distributed under the LGPL2.1 license.
+
+'''
+This module defines the `WorkerProcess` class.
+
+See its documentation for more info.
+'''
+
+import sys
+import time
+import traceback
+
+import garlicsim
+from garlicsim.asynchronous_crunching import ObsoleteCruncherError
+from ..process_cruncher.process import Process
+
+
+class JobStartedMarker(object):
+    '''
+    A marker put in the work queue by a worker process when it starts a job.
+    
+    It says at what time the job started, which is used for measuring job
+    start latency.
+    '''
+    def __init__(self, start_time):
+        self.start_time = start_time
+        '''The time at which the worker process started crunching the job.'''
+
+        
+class JobFinishedMarker(object):
+    '''
+    A marker put in the work queue by a worker process when it ends a job.
+    
+    Anything in the work queue after it belongs to the next job.
+    '''
+
+    
+class WorkerProcess(Process):
+    '''
+    A process kept in a `WorkerPool`, which crunches one job after another.
+    
+    It works like the process of a `ProcessCruncher`, except that when it's
+    done with a job it waits for the next one instead of exiting.
+    
+    It gets these orders in its order queue:
+    
+     - `('start', job_number, initial_state, crunching_profile,
+       detect_cycles)` to start a job. The worker must have finished its
+       previous job.
+       
+     - `(job_number, order)` to give `order` to the job with that number. This
+       can be `'retire'` or a crunching profile, as with `ProcessCruncher`.
+       Orders to jobs other than the current one are ignored, as they were sent
+       to jobs that have already ended.
+       
+     - `'quit'` to make the worker process exit.
+     
+    Every job's work is put in the work queue between a `JobStartedMarker` and
+    a `JobFinishedMarker`.
+    '''
+
+    def __init__(self, step_iterator_getter, template_state,
+                 transition_cache=None):
+        '''
+        Construct the worker process.
+        
+        `template_state` is a state of the simulation, which is used only to
+        know whether states can be sent through shared memory.
+        '''
+        Process.__init__(self, step_iterator_getter, template_state, None,
+                         transition_cache=transition_cache)
+        
+        self.job_number = None
+        '''The number of the job currently crunched, or last crunched.'''
+        
+        self.quitting = False
+        '''Flag saying we got a `'quit'` order in the middle of a job.'''
+        
+        
+    def run(self):
+        '''
+        Internal method.
+        
+        This is called when the worker process is started. It crunches jobs
+        as they come in, until it gets a `'quit'` order.
+        '''
+        self.set_low_priority()
+        while not self.quitting:
+            order = self.order_queue.get()
+            if order == 'quit':
+                return
+            elif order[0] == 'start':
+                (_, job_number, initial_state, crunching_profile,
+                 detect_cycles) = order
+                self.run_job(job_number, initial_state, crunching_profile,
+                             detect_cycles)
+            # Anything else is an order to a job that has already ended.
+
+                
+    def run_job(self, job_number, initial_state, crunching_profile,
+                detect_cycles):
+        '''Crunch a job, putting markers around its work in the work queue.'''
+        self.job_number = job_number
+        self.initial_state = initial_state
+        self.crunching_profile = crunching_profile
+        self.detect_cycles = detect_cycles
+        if self.shared_memory_ring:
+            # The main process has taken all the work of the previous job, so
+            # the whole ring is free:
+            self.shared_memory_ring.reset()
+            
+        self.work_queue.put(JobStartedMarker(time.time()))
+        try:
+            self.main_loop()
+        except ObsoleteCruncherError:
+            pass
+        except Exception:
+            # The step function failed. We print the traceback, like a
+            # `ProcessCruncher`'s process would before dying, and let the
+            # crunching manager see this job as a dead cruncher.
+            traceback.print_exc(file=sys.stderr)
+        self.work_queue.put(JobFinishedMarker())
+        
+        
+    def get_order(self):
+        '''
+        Attempt to read an order to the current job, if one has been sent.
+        
+        Returns the order.
+        '''
+        while True:
+            order = Process.get_order(self)
+            if order is None:
+                return None
+            if order == 'quit':
+                self.quitting = True
+                return 'retire'
+            (job_number, order) = order
+            if job_number == self.job_number:
+                return order
+            # Else it's an order to a job that has already ended; Skipping.
@@ -81,10 +81,12 @@ class ThreadCruncher(threading.Thread, BaseCruncher):
                               initial_state, crunching_profile)
         threading.Thread.__init__(self)
         
-        self.step_iterator_getter = \
-            self.project.simpack_grokker.get_step_iterator
+        self.step_iterator_getter = self.project.get_step_iterator
         self.history_dependent = self.project.simpack_grokker.history_dependent
         
+        if self.history_dependent:
+            self.history_browser = HistoryBrowser(cruncher=self)
+        
         self.daemon = True
 
         self.work_queue = Queue.Queue(
@@ -94,7 +96,8 @@ class ThreadCruncher(threading.Thread, BaseCruncher):
         Queue for putting completed work to be picked up by the main thread.
         
         In this queue the cruncher will put the states that it produces, in
-        chronological order. If the cruncher reaches a simulation ends, it will
+        chronological order, either one by one or in batches. (Lists of states;
+        see `WorkBatcher`.) If the cruncher reaches a simulation ends, it will
         put an `EndMarker` in this queue.
         '''
 
@@ -138,7 +141,12 @@ class ThreadCruncher(threading.Thread, BaseCruncher):
             
         or 
         
-         4. We have received a new crunching profile which has a different step
+         4. The simulation is deterministic, and it got back to a state it had
+            before, so it will repeat itself from now on.
+            
+        or 
+        
+         5. We have received a new crunching profile which has a different step
             profile than the one we started with. We can't change step profile
             on the fly, so we simply retire and let the crunching manager 
             recruit a new cruncher.
@@ -148,28 +156,64 @@ class ThreadCruncher(threading.Thread, BaseCruncher):
         self.step_profile = self.crunching_profile.step_profile
         
         if self.history_dependent:
-            self.history_browser = HistoryBrowser(cruncher=self)
             thing = self.history_browser
         else:
             thing = self.initial_state
 
         self.iterator = self.step_iterator_getter(thing, self.step_profile)
+        
+        if self.detect_cycles:
+            self.cycle_detector = garlicsim.misc.CycleDetector(
+                self.initial_state
+            )
+        else:
+            self.cycle_detector = None
+        
+        self.work_batcher = garlicsim.asynchronous_crunching.misc.WorkBatcher(
+            self.work_queue,
+            max_size=garlicsim.asynchronous_crunching.CRUNCHER_BATCH_SIZE,
+            max_interval=garlicsim.asynchronous_crunching.\
+                         CRUNCHER_BATCH_INTERVAL
+        )
             
         order = None
         
         try:
             for state in self.iterator:
-                self.work_queue.put(state)
+                if self.history_dependent:
+                    self.history_browser.add_state(state)
+                self.work_batcher.add(state)
+                if self.cycle_detector:
+                    self.check_cycle(state)
                 self.check_crunching_profile(state)
                 order = self.get_order()
                 if order:
                     self.process_order(order)
         except garlicsim.misc.WorldEnded:
+            self.work_batcher.flush()
             self.work_queue.put(
                 garlicsim.asynchronous_crunching.misc.EndMarker()
             )
 
         
+    def check_cycle(self, state):
+        '''
+        Check if the simulation got back to an earlier state. If so retire.
+        
+        From that state on, the simulation will repeat itself, so there's no
+        point in crunching it. We put a `CycleMarker` in the work queue, which
+        tells the crunching manager how long the cycle is.
+        '''
+        period = self.cycle_detector.check(state)
+        if period:
+            self.work_batcher.flush()
+            self.work_queue.put(
+                garlicsim.asynchronous_crunching.misc.CycleMarker(period)
+            )
+            raise ObsoleteCruncherError("The simulation is repeating itself. "
+                                        "Shutting down.")
+
+        
     def check_crunching_profile(self, state):
         '''
         Check if the cruncher crunched enough states. If so retire.
@@ -179,6 +223,7 @@ class ThreadCruncher(threading.Thread, BaseCruncher):
         we retire the cruncher.
         '''
         if self.crunching_profile.state_satisfies(state):
+            self.work_batcher.flush()
             raise ObsoleteCruncherError("We're done working, the clock target "
                                         "has been reached. Shutting down.")
 
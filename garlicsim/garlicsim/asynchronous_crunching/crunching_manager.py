@@ -22,9 +22,10 @@ import garlicsim.data_structures
 import garlicsim.misc
 from . import crunchers
 from .crunching_profile import CrunchingProfile
+from .job_list import JobList
 from .base_cruncher import BaseCruncher
 from garlicsim.misc.step_profile import StepProfile
-from .misc import EndMarker
+from .misc import EndMarker, CycleMarker, StatePayload
 
 
 __all__ = ['CrunchingManager']
@@ -56,13 +57,18 @@ class CrunchingManager(object):
     jobs. The crunching manager will employ crunchers in order to complete the
     jobs. It will then take work from these crunchers, put it into the tree,
     and delete the jobs when they are completed.
+
+    The crunching manager keeps reverse indexes, so it finds the jobs on a
+    node, or the job of a cruncher, without going over all the jobs: `.jobs`
+    is a `JobList`, which tracks the jobs on each node, and `.jobs_by_cruncher`
+    is kept as the reverse of `.crunchers`.
     '''
   
     def __init__(self, project):        
         
         self.project = project
         
-        self.jobs = []
+        self.jobs = JobList()
         '''
         The jobs that the crunching manager will be responsible for doing.
         
@@ -72,6 +78,9 @@ class CrunchingManager(object):
         self.crunchers = {}
         '''Dict that maps each job to the cruncher reponsible for doing it.'''
         
+        self.jobs_by_cruncher = {}
+        '''Dict that maps each cruncher in `.crunchers` to its job.'''
+        
         self.step_profiles = {}
         '''
         Dict that maps each cruncher to its step options profile.
@@ -140,7 +149,7 @@ class CrunchingManager(object):
                 (added_nodes, new_leaf) = \
                     self.__add_work_to_tree(cruncher, job, retire=True)
                 total_added_nodes += added_nodes
-                del self.crunchers[job]
+                self.__forget_cruncher(job)
 
                 
         # In this point all the crunchers in `.crunchers` have an active job
@@ -180,7 +189,7 @@ class CrunchingManager(object):
                                                               job)
             total_added_nodes += added_nodes
 
-            job.node = new_leaf
+            self.jobs.move_job(job, new_leaf)
             
             # We took work from the cruncher, now it's time to decide if we want
             # the cruncher to keep running or not. We will also update its
@@ -235,10 +244,23 @@ class CrunchingManager(object):
                     # latter happens when the user changes
                     # `crunching_manager.cruncher_type` in the middle of
                     # simulating. In any case, this cruncher is done for.
+                    #
+                    # The cruncher may have put more work in its queue after we
+                    # took work from it above, and before it stopped. (It
+                    # stops by itself when it reaches the clock target.) So we
+                    # take that work too, retiring the cruncher in case it's
+                    # not totally dead, before deciding whether to replace it.
                     
-                    cruncher.retire() # In case it's not totally dead.
+                    (added_nodes, new_leaf) = \
+                        self.__add_work_to_tree(cruncher, job, retire=True)
+                    total_added_nodes += added_nodes
+                    self.jobs.move_job(job, new_leaf)
                     
-                    self.__conditional_create_cruncher(job)
+                    if job.is_done():
+                        self.jobs.remove(job)
+                        self.__forget_cruncher(job)
+                    else:
+                        self.__conditional_create_cruncher(job)
                     
                     continue
                     
@@ -251,7 +273,7 @@ class CrunchingManager(object):
                 self.jobs.remove(job)
                 if cruncher.is_alive():
                     cruncher.retire()
-                del self.crunchers[job]
+                self.__forget_cruncher(job)
 
             
         return total_added_nodes
@@ -268,20 +290,29 @@ class CrunchingManager(object):
         if node.still_in_editing is False:
             cruncher = self.cruncher_type(self, node.state, crunching_profile)
             cruncher.start()
+            if job in self.crunchers:
+                self.__forget_cruncher(job)
             self.crunchers[job] = cruncher
+            self.jobs_by_cruncher[cruncher] = job
             
             self.crunching_profiles_change_tracker.check_in(crunching_profile)
             self.step_profiles[cruncher] = \
                 crunching_profile.step_profile
             
     
+    def __forget_cruncher(self, job):
+        '''Remove the cruncher of `job` from `.crunchers`, and its reverse.'''
+        cruncher = self.crunchers.pop(job)
+        del self.jobs_by_cruncher[cruncher]
+        
+    
     def get_jobs_by_node(self, node):
         '''
         Get all the jobs that should be done on the specified node.
         
-        This is every job whose `.node` attribute is the given node/
+        This is every job whose `.node` attribute is the given node.
         '''
-        return [job for job in self.jobs if (job.node is node)]
+        return self.jobs.get_jobs_by_node(node)
 
     
     def __add_work_to_tree(self, cruncher, job, retire=False):
@@ -289,8 +320,8 @@ class CrunchingManager(object):
         Take work from cruncher and add to tree at the specified job's node.
         
         If `retire` is set to `True`, retires the cruncher. Keep in mind that
-        if the cruncher gives an `EndMarker`, it will be retired regardless of
-        the `retire` argument.
+        if the cruncher gives an `EndMarker` or a `CycleMarker`, it will be
+        retired regardless of the `retire` argument.
         
         Returns `(number, leaf)`, where `number` is the number of nodes that
         were added, and `leaf` is the last node that was added.
@@ -301,6 +332,7 @@ class CrunchingManager(object):
         
         current_node = node
         counter = 0
+        step_profile = self.step_profiles[cruncher]
         
         queue_iterator = queue_tools.iterate(
             cruncher.work_queue,
@@ -308,25 +340,57 @@ class CrunchingManager(object):
             _prefetch_if_no_qsize=True
         )
         
+        states = []
+        '''States we took from the queue and didn't add to the tree yet.'''
+        
+        def add_states_to_tree():
+            '''Add the `states` to the tree after `current_node`, together.'''
+            if states:
+                new_nodes = tree.add_states(states, parent=current_node,
+                                            step_profile=step_profile)
+                del states[:]
+                if cruncher.history_browser is not None:
+                    cruncher.history_browser.add_nodes(new_nodes)
+                return new_nodes[-1]
+            return current_node
+        
         for thing in queue_iterator:
             
             if isinstance(thing, garlicsim.data_structures.State):
                 counter += 1
-                current_node = tree.add_state(
-                    thing,
-                    parent=current_node,
-                    step_profile=self.step_profiles[cruncher],            
+                states.append(thing)
+                
+            elif isinstance(thing, StatePayload):
+                # This is a state sent through shared memory.
+                counter += 1
+                states.append(thing.load())
+                
+            elif isinstance(thing, list):
+                # This is a batch of states. (See `WorkBatcher`.)
+                counter += len(thing)
+                states.extend(
+                    (item.load() if isinstance(item, StatePayload) else item)
+                    for item in thing
                 )
-                # todo optimization: save step profile in variable, it's
-                # wasteful to do a dict lookup every state.
             
             elif isinstance(thing, EndMarker):
+                current_node = add_states_to_tree()
                 tree.make_end(node=current_node,
-                              step_profile=self.step_profiles[cruncher])
+                              step_profile=step_profile)
+                job.resulted_in_end = True
+                
+            elif isinstance(thing, CycleMarker):
+                # The simulation repeats itself from here on, so there's no
+                # more crunching to do. Like with an end, the job is done.
+                current_node = add_states_to_tree()
+                tree.make_cycle(node=current_node, step_profile=step_profile,
+                                period=thing.period)
                 job.resulted_in_end = True
                 
             else:
                 raise TypeError('Unexpected object `%s` in work queue' % thing)
+            
+        current_node = add_states_to_tree()
                         
         if retire or job.resulted_in_end:
             cruncher.retire()
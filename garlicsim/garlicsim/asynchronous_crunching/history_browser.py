@@ -9,11 +9,7 @@ See its documentation for more info.
 
 from __future__ import with_statement
 
-import threading
-
 from garlicsim.general_misc import binary_search
-from garlicsim.general_misc import queue_tools
-from garlicsim.general_misc import decorator_tools
 from garlicsim.general_misc.context_manager import ContextManager
 
 import garlicsim.misc
@@ -22,14 +18,6 @@ from .obsolete_cruncher_error import ObsoleteCruncherError
 
 __all__ = ['HistoryBrowser']
 
-
-@decorator_tools.decorator
-def with_self(method, *args, **kwargs):
-    '''Decorator for using the history browser as a context manager.'''
-    self = args[0]
-    with self:
-        return method(*args, **kwargs)
-
     
 class HistoryBrowser(garlicsim.misc.BaseHistoryBrowser, ContextManager):
     '''
@@ -43,14 +31,23 @@ class HistoryBrowser(garlicsim.misc.BaseHistoryBrowser, ContextManager):
     timeline. States can be requested by clock time or position in the timeline
     or by other measures; see documentation for this class's methods.
     
-    Since we do not know whether the states we request have been implemented in
-    the tree already, or they are still in the `.work_queue`, it's the job of
-    the `HistoryBrowser` to find that out. This is done transperantly for the
-    user.
+    The timeline is made of the nodes in the tree that lead to the node that
+    our cruncher started from, followed by the states that our cruncher
+    produced. Neither of these ever changes, only grows, so the history
+    browser reads them without acquiring the tree lock:
     
-    When using a `HistoryBroswer`, the lock of the project's tree is acquired
-    for reading. That acquiring action can also be invoked by using
-    `HistoryBrowser` as a context manager.
+     1. The nodes that lead to our starting node are listed once, with the
+        tree lock acquired for reading. Then, whenever the crunching manager
+        adds our cruncher's states to the tree, it appends their nodes to the
+        list with `add_nodes`.
+    
+     2. The cruncher gives every state it produces to `add_state`. We keep the
+        states until their nodes were added to the list, so the states that
+        are still in the cruncher's `.work_queue` never need to be looked for
+        there.
+    
+    (`HistoryBrowser` can still be used as a context manager, which acquires
+    the lock of the project's tree for reading.)
     '''
         
     def __init__(self, cruncher):
@@ -58,6 +55,31 @@ class HistoryBrowser(garlicsim.misc.BaseHistoryBrowser, ContextManager):
         self.project = cruncher.project
         self.tree = self.project.tree
         self.tree_lock = self.project.tree.lock
+        
+        self.__nodes = None
+        '''
+        The nodes of the timeline that are in the tree, in order.
+        
+        It's built on first use, and after that it's only appended to, by
+        `add_nodes`.
+        '''
+        
+        self.__n_earlier_nodes = None
+        '''The number of nodes in `.__nodes` that aren't of our states.'''
+        
+        self.__n_added_nodes = 0
+        '''The number of our cruncher's states that were added to the tree.'''
+        
+        self.__states = []
+        '''The states that our cruncher produced that aren't in `.__nodes`.'''
+        
+        self.__n_dropped_states = 0
+        '''
+        The number of states that were dropped from `.__states`.
+        
+        These are the first states our cruncher produced, which now have nodes
+        in `.__nodes`.
+        '''
     
         
     def manage_context(self):
@@ -68,78 +90,88 @@ class HistoryBrowser(garlicsim.misc.BaseHistoryBrowser, ContextManager):
             yield self
 
         
-    @with_self
+    def add_state(self, state):
+        '''
+        Add a state that our cruncher produced to the end of the timeline.
+        
+        This is called from the cruncher's thread.
+        '''
+        self.__states.append(state)
+        if self.__nodes is not None:
+            self.__drop_states_in_tree()
+    
+    
+    def add_nodes(self, nodes):
+        '''
+        Note that our cruncher's next states were added to the tree as `nodes`.
+        
+        This is called by the crunching manager, while it holds the tree lock
+        for writing.
+        '''
+        if self.__nodes is not None:
+            # A single `extend` call, so readers never see a partial update:
+            self.__nodes.extend(nodes)
+        self.__n_added_nodes += len(nodes)
+    
+    
+    def __drop_states_in_tree(self):
+        '''Drop the states that have nodes in `.__nodes` from `.__states`.'''
+        n_states_in_tree = len(self.__nodes) - self.__n_earlier_nodes - \
+                           self.__n_dropped_states
+        if n_states_in_tree:
+            del self.__states[:n_states_in_tree]
+            self.__n_dropped_states += n_states_in_tree
+    
+    
+    def __get_nodes(self):
+        '''
+        Get the nodes of the timeline that are in the tree.
+        
+        On first use, the nodes are listed with the tree lock acquired.
+        '''
+        if self.__nodes is None:
+            with self.tree_lock.read:
+                our_node = self.__get_our_node()
+                path = our_node.make_past_path()
+                nodes = list(path.__iter__(tail=our_node))
+                # Our node may be a node of one of our states, if the
+                # crunching manager already added some to the tree:
+                self.__n_earlier_nodes = len(nodes) - self.__n_added_nodes
+                self.__nodes = nodes
+            self.__drop_states_in_tree()
+        return self.__nodes
+    
+    
     def get_last_state(self):
         '''
         Get the last state in the timeline. Identical to `.__getitem__(-1)`.
         '''
+        if self.__states:
+            return self.__states[-1]
         return self[-1]
 
     
-    @with_self
     def __getitem__(self, index):
         '''Get a state by its position in the timeline.'''
         assert isinstance(index, int)
-        if index < 0:
-            return self.__get_item_negative(index)
-        else: # index >= 0
-            return self.__get_item_positive(index)
-
+        nodes = self.__get_nodes()
+        n_nodes = len(nodes)
+        states = self.__states
+        states_offset = self.__n_earlier_nodes + self.__n_dropped_states
+        length = states_offset + len(states)
         
-    @with_self
-    def __get_item_negative(self, index):
-        '''
-        Get a state by its position in the timeline. Negative indices only.
-        '''
-        try:
-            return self.__get_item_from_queue(index)
-        except IndexError:
-            # The requested state is in the tree
-            queue_size = self.cruncher.work_queue.qsize()
-            new_index = index + queue_size
-            our_node = self.__get_our_node()
-            path = our_node.make_containing_path()
-            result_node = path.__getitem__(new_index, tail=our_node)
-            return result_node.state
-            
-    
-    @with_self
-    def __get_item_positive(self, index):
-        '''
-        Get a state by its position in the timeline. Positive indices only.
-        '''
-        our_node = self.__get_our_node()
-        path = our_node.make_containing_path()
-        try:
-            result_node = path.__getitem__(index, tail=our_node)
-            return result_node.state
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError('You asked for state number %s while the '
+                             'timeline has only %s states.' % (index, length))
         
-        except IndexError:
-            path_length = path.__len__(tail=our_node)
-            # todo: Probably inefficient: We're plowing through the path again.
-            new_index = index - path_length
-            try:
-                return self.__get_item_from_queue(new_index)
-            except IndexError:
-                queue_length = self.cruncher.work_queue.qsize()
-                timeline_length = queue_length + path_length
-                message = 'You asked for node number ' + str(index) + \
-                          ' while the timeline has only ' + timeline_length + \
-                          ' states, comprised by ' + path_length + \
-                          ' states in the tree and ' + queue_length + \
-                          ' states in the queue.'
-                raise IndexError(message)
-
-            
-    @with_self
-    def __get_item_from_queue(self, index):
-        '''
-        Obtain an item by index number from the work_queue of our cruncher.
-        '''
-        return queue_tools.get_item(self.cruncher.work_queue, index)
+        if index < n_nodes:
+            return nodes[index].state
+        else:
+            return states[index - states_offset]
 
-    
-    @with_self
+        
     def get_state_by_monotonic_function(self, function, value,
                                         rounding=binary_search.CLOSEST):
         '''
@@ -150,125 +182,23 @@ class HistoryBrowser(garlicsim.misc.BaseHistoryBrowser, ContextManager):
         See documentation of `binary_search.roundings` for details about
         rounding options.
         '''
-        
         assert issubclass(rounding, binary_search.Rounding)
-        
-        tree_result = self.__get_both_states_by_monotonic_function_from_tree \
-                      (function, value)
-        
-        if tree_result[1] is not None:
-            # Then there is no need to check the queue even.
-            return binary_search.make_both_data_into_preferred_rounding\
-                   (tree_result, function, value, rounding)
-        
-        else:
-            queue_result = self.__get_state_by_monotonic_function_from_queue \
-                           (function, value, rounding=binary_search.BOTH)
-            none_count = list(queue_result).count(None)
-            if none_count == 0:
-                # The result is entirely in the queue
-                return binary_search.make_both_data_into_preferred_rounding\
-                       (queue_result, function, value, rounding)
-            elif none_count == 1:
-                # The result is either before the past edge of the queue or
-                # after its future edge.
-                if queue_result[1] is None:
-                    # The result is beyond the future edge of the queue.
-                    return binary_search.\
-                           make_both_data_into_preferred_rounding\
-                           (queue_result, function, value, rounding)
-                else: # queue_result[0] == None
-                    # Getting tricky: The result is somewhere in the middle
-                    # between the queue and the tree.
-                    combined_result = (tree_result[0], queue_result[1])
-                    return binary_search.\
-                           make_both_data_into_preferred_rounding\
-                           (combined_result, function, value, rounding)
-    
-            else:
-                assert none_count == 2
-                # The queue is just totally empty.
-                return binary_search.make_both_data_into_preferred_rounding \
-                       (tree_result, function, value, rounding)
+        return binary_search.binary_search(self, function, value, rounding)
 
             
-    @with_self   
-    def __get_both_states_by_monotonic_function_from_tree(self, function,
-                                                          value):
-        '''
-        Get two states from the tree with value surrounding the desired value.
-
-        The function must be a monotonic rising function on the timeline.
-        
-        This uses the `binary_search.BOTH` rounding. See its documentation.
-        '''
-        our_node = self.__get_our_node()
-        path = our_node.make_containing_path()
-        new_function = lambda node: function(node.state)
-        
-        result_in_nodes = path.get_node_by_monotonic_function \
-            (new_function, value, binary_search.BOTH, tail_node=our_node)
-        
-        result = tuple((node.state if node is not None else None) \
-                       for node in result_in_nodes)
-        
-        return result
-    
-    
-    @with_self
-    def __get_state_by_monotonic_function_from_queue(
-        self, function, value, rounding=binary_search.CLOSEST):
-        '''
-        Get a state from the queue only by measure function and desired value.
-        
-        The function must by a monotonic rising function on the timeline.
-        
-        See documentation of `garlicsim.general_misc.binary_search.roundings`
-        for details about rounding options.
-        '''
-        assert issubclass(rounding, binary_search.Rounding)
-        queue = self.cruncher.work_queue
-        queue_as_list = queue_tools.queue_as_list(queue)
-        # todo: Probably inefficient, should access them one by one
-        
-        return binary_search.binary_search\
-               (queue_as_list, function, value, rounding)
-
-    
-    @with_self
     def __len__(self):
-        '''
-        Get the length of the timeline in nodes.
-        
-        This means the sum of:
-        1. The length of the `.work_queue` of our cruncher.
-        2. The length of the path in the tree which leads to our node, up to
-           our node.
-        '''
-        queue_length = self.cruncher.work_queue.qsize()
-        
-        our_node = self.__get_our_node()
-        our_path = our_node.make_containing_path()
-        path_length = our_path.__len__(tail=our_node)
-        
-        return queue_length + path_length
-
+        '''Get the length of the timeline in nodes.'''
+        self.__get_nodes()
+        return self.__n_earlier_nodes + self.__n_dropped_states + \
+               len(self.__states)
+    
     
-    @with_self
     def __get_our_node(self):
         '''Get the node that the current cruncher is assigned to work on.'''
-        jobs_to_crunchers = self.project.crunching_manager.crunchers.items()
-        
-        nodes_that_are_us = \
-            [job.node for (job, cruncher) in jobs_to_crunchers \
-             if cruncher == self.cruncher]
-        
-        num = len(nodes_that_are_us)
-        assert num <= 1
-        if num == 1:
-            our_node = nodes_that_are_us[0]
-        else: # num == 0
+        jobs_by_cruncher = self.project.crunching_manager.jobs_by_cruncher
+        try:
+            return jobs_by_cruncher[self.cruncher].node
+        except KeyError:
             raise ObsoleteCruncherError
-        return our_node
-        
+
     
\ No newline at end of file
@@ -35,6 +35,8 @@ class Job(object):
         self.resulted_in_end = False
         '''
         Flag marking that the job has resulted in an end of the simulation.
+        
+        This includes a `Cycle`, after which there's nothing to crunch.
         '''
   
         
@@ -0,0 +1,141 @@
+# Copyright 2009-2011 Ram Rachum.
+# This program is distributed under the LGPL2.1 license.
+
+'''
+This module defines the `JobList` class.
+
+See its documentation for more info.
+'''
+
+
+class JobList(list):
+    '''
+    A list of jobs which keeps track of the jobs on each node.
+
+    This is the type of `CrunchingManager.jobs`. It's used like a normal list,
+    but it also keeps a dict from each node to the jobs on it, so finding the
+    jobs on a node, and checking whether a job is in the list, don't need to
+    go over all the jobs.
+
+    While a job is in the list, its node must be changed only with `move_job`.
+    '''
+
+    def __init__(self, jobs=()):
+        list.__init__(self, jobs)
+
+        self.jobs_by_node = {}
+        '''
+        Dict that maps each node to the jobs on it.
+
+        The jobs of each node are in the order they got to it: either added to
+        the list, or moved there with `move_job`.
+        '''
+
+        for job in self:
+            self.__index_job(job)
+
+
+    def __index_job(self, job):
+        '''Add `job` to `.jobs_by_node`.'''
+        self.jobs_by_node.setdefault(job.node, []).append(job)
+
+
+    def __unindex_job(self, job):
+        '''Remove `job` from `.jobs_by_node`.'''
+        jobs_of_node = self.jobs_by_node[job.node]
+        jobs_of_node.remove(job)
+        if not jobs_of_node:
+            del self.jobs_by_node[job.node]
+
+
+    def get_jobs_by_node(self, node):
+        '''Get all the jobs on `node`, in the order they got to it.'''
+        return list(self.jobs_by_node.get(node, ()))
+
+
+    def move_job(self, job, node):
+        '''Change the node of `job`, which is in the list, to `node`.'''
+        if job.node is not node:
+            self.__unindex_job(job)
+            job.node = node
+            self.__index_job(job)
+
+
+    def __contains__(self, job):
+        return job in self.jobs_by_node.get(getattr(job, 'node', None), ())
+
+
+    def append(self, job):
+        list.append(self, job)
+        self.__index_job(job)
+
+
+    def insert(self, index, job):
+        list.insert(self, index, job)
+        self.__index_job(job)
+
+
+    def extend(self, jobs):
+        jobs = list(jobs)
+        list.extend(self, jobs)
+        for job in jobs:
+            self.__index_job(job)
+
+
+    def __iadd__(self, jobs):
+        self.extend(jobs)
+        return self
+
+
+    def __imul__(self, n):
+        list.__imul__(self, n)
+        self.jobs_by_node.clear()
+        for job in self:
+            self.__index_job(job)
+        return self
+
+
+    def remove(self, job):
+        list.remove(self, job)
+        self.__unindex_job(job)
+
+
+    def pop(self, index=-1):
+        job = list.pop(self, index)
+        self.__unindex_job(job)
+        return job
+
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            old_jobs = self[index]
+            new_jobs = list(value)
+            list.__setitem__(self, index, new_jobs)
+        else:
+            old_jobs = [self[index]]
+            new_jobs = [value]
+            list.__setitem__(self, index, value)
+        for job in old_jobs:
+            self.__unindex_job(job)
+        for job in new_jobs:
+            self.__index_job(job)
+
+
+    def __delitem__(self, index):
+        if isinstance(index, slice):
+            old_jobs = self[index]
+        else:
+            old_jobs = [self[index]]
+        list.__delitem__(self, index)
+        for job in old_jobs:
+            self.__unindex_job(job)
+
+
+    # Python 2 calls these for simple slices, so they must be overridden too:
+
+    def __setslice__(self, i, j, jobs):
+        self.__setitem__(slice(i, j), jobs)
+
+
+    def __delslice__(self, i, j):
+        self.__delitem__(slice(i, j))
@@ -3,4 +3,7 @@
 
 '''Defines miscellanous objects.'''
 
-from .end_marker import EndMarker
\ No newline at end of file
+from .end_marker import EndMarker
+from .cycle_marker import CycleMarker
+from .work_batcher import WorkBatcher
+from .shared_memory_ring import SharedMemoryRing, StatePayload
@@ -0,0 +1,26 @@
+# Copyright 2009-2011 Ram Rachum.
+# This program is distributed under the LGPL2.1 license.
+
+'''
+Defines the `CycleMarker` class.
+
+See its documentation for more info.
+'''
+
+
+class CycleMarker(object):
+    '''
+    A marker used by crunchers to say that the simulation started repeating.
+    
+    This is used only when crunching deterministic simulations. When the
+    cruncher's `CycleDetector` finds that the last state is the same as an
+    earlier one, the cruncher will place a `CycleMarker` in the work queue
+    after it, and stop crunching.
+    
+    The crunching manager will recognize the `CycleMarker` and put a `Cycle`
+    at the end of the timeline.
+    '''
+    
+    def __init__(self, period):
+        self.period = period
+        '''The number of states in the cycle.'''
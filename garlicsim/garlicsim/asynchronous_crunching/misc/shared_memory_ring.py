@@ -0,0 +1,160 @@
+# Copyright 2009-2011 Ram Rachum.
+# This program is distributed under the LGPL2.1 license.
+
+'''
+Defines the `SharedMemoryRing` and `StatePayload` classes.
+
+See their documentation for more info.
+'''
+
+import mmap
+import weakref
+
+
+_rings = weakref.WeakValueDictionary()
+'''The live rings in this process, by `.ring_id`, so payloads can find them.'''
+
+
+class SharedMemoryRing(object):
+    '''
+    A ring buffer in shared memory for sending states from a cruncher process.
+
+    `ProcessCruncher` normally sends states to the main process by pickling
+    them through its work queue, which is expensive for big states. If the
+    simpack's state type defines the `dump_payload` and `load_payload` hooks,
+    (see `State`,) the cruncher process instead writes each state's payload
+    into this ring, and puts in the work queue only a small `StatePayload`
+    saying where to find it. The main process then rebuilds the state straight
+    from the shared memory.
+
+    The ring must be created in the main process before the cruncher process
+    is started, so the cruncher process inherits it. The cruncher process
+    calls `.pack`, and the main process calls `StatePayload.load`. Payloads
+    must be loaded in the order in which they were packed, which the work
+    queue takes care of. If there's no room left in the ring, `.pack` just
+    returns the state, to be sent through the work queue as usual.
+    '''
+
+    def __init__(self, size):
+
+        # Importing `multiprocessing` here, so we'd import it only when it's
+        # actually used:
+        import multiprocessing
+
+        self.size = size
+        '''The size of the ring, in bytes.'''
+
+        self.buffer = mmap.mmap(-1, size)
+        '''The shared memory, an anonymous `mmap`.'''
+
+        self.consumed_position = multiprocessing.RawValue('L', 0)
+        '''
+        The position up to which the main process finished loading payloads.
+
+        Positions grow forever; The offset in `.buffer` of a position is the
+        position modulo `.size`. The cruncher process may overwrite only
+        memory before this position.
+        '''
+
+        self.write_position = 0
+        '''
+        The position up to which the cruncher process wrote payloads.
+
+        This is meaningful only in the cruncher process.
+        '''
+
+        self.ring_id = id(self)
+        '''Identifier of the ring, used by payloads to find it.'''
+
+        _rings[self.ring_id] = self
+
+
+    def reset(self):
+        '''
+        Mark all the payloads written so far as consumed.
+
+        Call this in the cruncher process, and only when the main process won't
+        load any of the payloads that were written so far.
+        '''
+        self.consumed_position.value = self.write_position
+
+
+    def pack(self, state):
+        '''
+        Write the state's payload into the ring and return a `StatePayload`.
+
+        If there isn't enough free room in the ring, returns `state` itself.
+        '''
+        (payload, rest) = state.dump_payload()
+        payload_size = len(payload)
+
+        start_position = self.write_position
+        offset = start_position % self.size
+        if offset + payload_size > self.size:
+            # The payload won't fit before the end of the buffer, so we skip
+            # to its start; Payloads are always contiguous.
+            start_position += self.size - offset
+            offset = 0
+        end_position = start_position + payload_size
+
+        if end_position - self.consumed_position.value > self.size:
+            return state
+
+        self.buffer[offset : offset + payload_size] = payload
+        self.write_position = end_position
+
+        return StatePayload(
+            self.ring_id, type(state), offset, payload_size, end_position,
+            rest, getattr(state, 'clock', None)
+        )
+
+
+class StatePayload(object):
+    '''
+    Description of a state whose payload is in a `SharedMemoryRing`.
+
+    This is what the cruncher process puts in the work queue instead of the
+    state, when sending states through shared memory.
+    '''
+
+    def __init__(self, ring_id, state_type, offset, payload_size, end_position,
+                 rest, clock):
+
+        self.ring_id = ring_id
+        '''The `.ring_id` of the ring that has the payload.'''
+
+        self.state_type = state_type
+        '''The type of the state, whose `load_payload` will rebuild it.'''
+
+        self.offset = offset
+        '''The offset of the payload in the ring's buffer.'''
+
+        self.payload_size = payload_size
+        '''The size of the payload, in bytes.'''
+
+        self.end_position = end_position
+        '''The position in the ring after the payload.'''
+
+        self.rest = rest
+        '''The rest of the state's data, as returned by `dump_payload`.'''
+
+        self.clock = clock
+        '''The clock reading of the state, or `None` if it had none.'''
+
+
+    def load(self):
+        '''
+        Rebuild the state, and release its payload's memory in the ring.
+
+        May be called only in the process which created the ring.
+        '''
+        ring = _rings[self.ring_id]
+        state = self.state_type.load_payload(
+            buffer(ring.buffer, self.offset, self.payload_size),
+            self.rest
+        )
+        if self.clock is not None:
+            state.clock = self.clock
+        ring.consumed_position.value = self.end_position
+        return state
+
@@ -0,0 +1,70 @@
+# Copyright 2009-2011 Ram Rachum.
+# This program is distributed under the LGPL2.1 license.
+
+'''
+Defines the `WorkBatcher` class.
+
+See its documentation for more info.
+'''
+
+import time
+
+
+class WorkBatcher(object):
+    '''
+    Puts states produced by a cruncher into its work queue in batches.
+    
+    States are collected into a list, and the list is put in the work queue as
+    a single item once it has `max_size` states, or when a state is added at
+    least `max_interval` seconds after we last put something in the queue. So
+    when the step function is slower than `max_interval`, every state is put
+    in the queue as soon as it's added. If `max_size` is 1, the states are put
+    in the queue one by one, not wrapped in lists.
+    
+    The cruncher must call `.flush` before it stops, so no states are left
+    behind.
+    '''
+    
+    def __init__(self, work_queue, max_size, max_interval):
+        
+        self.work_queue = work_queue
+        '''The work queue into which we put the batches.'''
+        
+        self.max_size = max_size
+        '''The maximal number of states in a batch.'''
+        
+        self.max_interval = max_interval
+        '''The maximal time, in seconds, that a state waits in a batch.'''
+        
+        self.batch = []
+        '''The states that were added and not yet put in the work queue.'''
+        
+        self.last_put_time = None
+        '''
+        The time at which we last put a batch in the work queue.
+        
+        `None` if we haven't put one yet, in which case the first state is put
+        in the queue right away.
+        '''
+        
+        
+    def add(self, state):
+        '''Add a state, putting the batch in the work queue if it's time.'''
+        if self.max_size <= 1:
+            self.work_queue.put(state)
+            return
+        
+        self.batch.append(state)
+        
+        if (len(self.batch) >= self.max_size) or \
+           (self.last_put_time is None) or \
+           (time.time() - self.last_put_time >= self.max_interval):
+            self.flush()
+            
+            
+    def flush(self):
+        '''Put the current batch in the work queue, if it's not empty.'''
+        if self.batch:
+            self.work_queue.put(self.batch)
+            self.batch = []
+            self.last_put_time = time.time()
@@ -87,6 +87,30 @@ class Project(object):
         
         self.default_step_function = self.simpack_grokker.default_step_function
         '''The step function that we use by default.'''
+        
+        settings = self.simpack_grokker.settings
+        self.scalar_evaluator = garlicsim.misc.ScalarEvaluator(
+            settings.SCALAR_STATE_FUNCTIONS,
+            settings.SCALAR_HISTORY_FUNCTIONS
+        )
+        '''
+        Evaluates the simpack's scalar functions over paths into arrays.
+        
+        See documentation of `garlicsim.misc.ScalarEvaluator` for more info.
+        '''
+        
+        self.transition_cache = None
+        '''
+        `TransitionCache` of steps that were taken, or `None` for no cache.
+        
+        It's opt-in; set it to a `TransitionCache` to have deterministic steps
+        taken from it when they were taken before. (The cache's `.n_hits` and
+        `.n_misses` tell how well it's doing.) It's used by this project and
+        its crunchers only; process crunchers work with a copy of the cache
+        that's given to their process when it starts, and the worker processes
+        of `ProcessPoolCruncher` get theirs when the pool is created. It isn't
+        pickled with the project.
+        '''
     
 
     def create_root(self, *args, **kwargs):
@@ -308,33 +332,22 @@ class Project(object):
             tail_node=node
         )
         
-        iterator = self.simpack_grokker.get_step_iterator(history_browser,
-                                                          step_profile)
+        iterator = self.get_step_iterator(history_browser, step_profile)
         finite_iterator = cute_iter_tools.shorten(iterator, iterations)
         
         current_node = node
-        first_run = True
         try:
             for current_state in finite_iterator:
                 current_node = self.tree.add_state(current_state,
                                                    parent=current_node,
                                                    step_profile=step_profile)
                 history_browser.tail_node = current_node
-                if first_run:
-                    history_browser.path = current_node.make_containing_path()
-                    # Just once, after the first run, we set the path of the
-                    # history browser to be the new tail_node's path. Why?
-                    
-                    # Because just after the first run we've created the first
-                    # new node, possibly causing a fork. Because of the new
-                    # fork, the original path that we created at the beginning
-                    # of this method will get confused and take the old
-                    # timeline instead of the new timeline. (And it wouldn't
-                    # even have the `tail_node` to stop it, because that would
-                    # be on the new timeline.) So we create a new path for the
-                    # history browser. We only need to do this once, because
-                    # after the first node we work on one straight timeline and
-                    # we don't fork the tree any more.
+                history_browser.path.modify_to_include_node(current_node)
+                # We need to make sure the history browser's path leads to the
+                # new `tail_node`: If the first node we created caused a fork,
+                # the original path would take the old timeline instead of the
+                # new one. After the first node this is a quick no-op, because
+                # the new node is already on the path.
         
         except garlicsim.misc.WorldEnded:
             self.tree.make_end(current_node, step_profile)
@@ -360,17 +373,42 @@ class Project(object):
         
         state = node.state
                 
-        iterator = self.simpack_grokker.get_step_iterator(state, step_profile)
+        iterator = self.get_step_iterator(state, step_profile)
         finite_iterator = cute_iter_tools.shorten(iterator, iterations)
         
+        batch_size = garlicsim.asynchronous_crunching.CRUNCHER_BATCH_SIZE
+        
         current_node = node
+        states = []
+        '''States we crunched and didn't add to the tree yet.'''
+        
+        def add_states_to_tree():
+            '''Add the `states` to the tree after `current_node`, together.'''
+            if states:
+                new_nodes = self.tree.add_states(states, parent=current_node,
+                                                 step_profile=step_profile)
+                del states[:]
+                return new_nodes[-1]
+            return current_node
+        
+        # We add the states in batches, so we'd get the speed of
+        # `Tree.add_states` without piling up all the states of a long
+        # simulation before the tree gets them. (For example, a tree with
+        # `.store_deltas` on keeps most of them only as deltas.)
+        
+        world_ended = False
         
         try:
             for current_state in finite_iterator:
-                current_node = self.tree.add_state(current_state,
-                                                   parent=current_node,
-                                                   step_profile=step_profile)
+                states.append(current_state)
+                if len(states) >= batch_size:
+                    current_node = add_states_to_tree()
         except garlicsim.misc.WorldEnded:
+            world_ended = True
+            
+        current_node = add_states_to_tree()
+        
+        if world_ended:
             self.tree.make_end(current_node, step_profile)
             
         return current_node
@@ -425,8 +463,7 @@ class Project(object):
             tail_node=node
         )
         
-        iterator = self.simpack_grokker.get_step_iterator(history_browser,
-                                                          step_profile)
+        iterator = self.get_step_iterator(history_browser, step_profile)
         finite_iterator = cute_iter_tools.shorten(iterator, iterations)
         finite_iterator_with_lock = cute_iter_tools.iter_with(
             finite_iterator,
@@ -445,16 +482,14 @@ class Project(object):
                                                    step_profile=step_profile)
                 
                 history_browser.tail_node = current_node
-                history_browser.path = current_node.make_containing_path()
+                history_browser.path.modify_to_include_node(current_node)
                 # Similarly to the `__history_dependent_simulate` method, here
-                # we also need to recreate the path. But in this case we need
-                # to do it not only on the first run, but on *each* run of the
-                # loop, because this is a generator, and the user may wreak
-                # havoc with the tree between `yield`s, causing our original
-                # path not to lead to the `tail_node` anymore.
-                
-                # todo optimize: The fact we recreate a path every time might
-                # be costly.
+                # we also need to make sure the path leads to the new node. In
+                # this case it's not only important on the first run, because
+                # this is a generator, and the user may wreak havoc with the
+                # tree between `yield`s, causing our original path not to lead
+                # to the `tail_node` anymore. When nothing like that happened,
+                # this is a quick no-op.
                     
                 yield current_node
         
@@ -480,7 +515,7 @@ class Project(object):
 
         state = node.state
                 
-        iterator = self.simpack_grokker.get_step_iterator(state, step_profile)
+        iterator = self.get_step_iterator(state, step_profile)
         finite_iterator = cute_iter_tools.shorten(iterator, iterations)
         finite_iterator_with_lock = cute_iter_tools.iter_with(
             finite_iterator,
@@ -491,6 +526,10 @@ class Project(object):
         
         yield current_node
         
+        # We add the nodes one by one rather than with `Tree.add_states`,
+        # because the user expects each node to be in the tree when it's
+        # yielded, and no further states to be crunched until it asks for them.
+        
         try:
             for current_state in finite_iterator_with_lock:
                 current_node = self.tree.add_state(current_state,
@@ -502,11 +541,28 @@ class Project(object):
             self.tree.make_end(current_node, step_profile)
             
     
+    def get_step_iterator(self, state_or_history_browser, step_profile):
+        '''
+        Get a step iterator for crunching states of the simulation.
+        
+        This is like `SimpackGrokker.get_step_iterator`, except it uses our
+        `.transition_cache`. The project and its crunchers get their step
+        iterators from here.
+        '''
+        return self.simpack_grokker.get_step_iterator(
+            state_or_history_browser,
+            step_profile,
+            transition_cache=self.transition_cache
+        )
+    
+    
     def __getstate__(self):
         project_vars = dict(vars(self))
         
         del project_vars['crunching_manager']
         del project_vars['simpack_grokker']
+        del project_vars['scalar_evaluator']
+        del project_vars['transition_cache']
         
         project_vars['___cruncher_type_of_crunching_manager'] = \
             self.crunching_manager.cruncher_type
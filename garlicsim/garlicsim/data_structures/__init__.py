@@ -19,6 +19,7 @@ from .tree_member import TreeMember
 from .node import Node, NodeError
 from .block import Block, BlockError
 from .end import End
+from .cycle import Cycle
 
 from .node_range import NodeRange
 from .node_selection import NodeSelection
@@ -29,6 +30,6 @@ from .path import Path, PathError, PathLookupError, PathOutOfRangeError
 
 
 __all__ = ['TreeMember', 'State', 'Tree', 'Path', 'Node', 'Block', 'End',
-           'NodeRange', 'NodeSelection'] + \
+           'Cycle', 'NodeRange', 'NodeSelection'] + \
           ['BlockError', 'PathError', 'PathLookupError', 'PathOutOfRangeError',
             'TreeError', 'NodeError']
\ No newline at end of file
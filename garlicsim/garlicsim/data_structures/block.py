@@ -61,9 +61,29 @@ class Block(TreeMember):
         '''Step profile with which all the nodes in the block were crunched.'''
         
         self.__node_list = []
+        '''
+        The nodes of the block, in order.
+        
+        Every node in the block also carries a `_Block__position` attribute.
+        Positions are consecutive integers which grow along the block, so the
+        index of a node is its position minus the position of the first node.
+        This lets us find a node's index in O(1) instead of scanning the list.
+        '''
+        
         self.add_node_list(node_list)
 
         
+    def __note_structure_change(self):
+        '''
+        Tell the tree that its structure is changing.
+        
+        This should be called before any change to the block other than adding
+        nodes to its tail, so paths will know to rebuild their index.
+        '''
+        if self.__node_list:
+            self.__node_list[0].tree._structure_version += 1
+            
+            
     def soft_get_block(self):
         '''Get the block.'''
         return self
@@ -84,6 +104,7 @@ class Block(TreeMember):
             # If the node list is `[]`, let's make it `[node]`.
             self.__node_list.append(node)
             node.block = self
+            node.__position = 0
             self.step_profile = node.step_profile
             return
         
@@ -98,13 +119,16 @@ class Block(TreeMember):
             # We're appending the node to the tail of the block.
             self.__node_list.append(node)
             node.block = self
+            node.__position = last_in_block.__position + 1
             return
         
         first_in_block = self.__node_list[0]
         if node == first_in_block.parent:
             # We're appending the node to the head of the block.
+            self.__note_structure_change()
             self.__node_list.insert(0, node)
             node.block = self
+            node.__position = first_in_block.__position - 1
             return
         
         raise BlockError('Tried to add a node which is not a direct '
@@ -162,20 +186,24 @@ class Block(TreeMember):
         if not self.__node_list:
             # If the node list is empty, our job is simple.
             self.__node_list = list(node_list)
-            for node in node_list:
-                node.block = self
+            first_position = 0
             self.step_profile = sample_step_profile
-            return
-        
-        if node_list[0].parent == self.__node_list[-1]:
-            self.__node_list = self.__node_list + node_list
+            
+        elif node_list[0].parent == self.__node_list[-1]:
+            first_position = self.__node_list[-1].__position + 1
+            self.__node_list.extend(node_list)
+            
         elif self.__node_list[0].parent == node_list[-1]:
-            self.__node_list = node_list + self.__node_list
+            self.__note_structure_change()
+            first_position = self.__node_list[0].__position - len(node_list)
+            self.__node_list = list(node_list) + self.__node_list
+            
         else:
             raise BlockError('List of nodes is not adjacent to existing nodes.')
 
-        for node in node_list:
+        for (i, node) in enumerate(node_list):
             node.block = self
+            node.__position = first_position + i
 
             
     def split(self, node):
@@ -188,7 +216,8 @@ class Block(TreeMember):
         '''
         assert self.alive
         assert node in self
-        i = self.__node_list.index(node)
+        self.__note_structure_change()
+        i = self.index(node)
         second_list = self.__node_list[i+1:]
         self.__node_list = self.__node_list[:i+1]
         if len(second_list) >= 2:
@@ -203,6 +232,7 @@ class Block(TreeMember):
     def delete(self):
         '''Delete the block, leaving all its nodes without a block.'''
         assert self.alive
+        self.__note_structure_change()
         for node in self:
             node.block = None
         self.__node_list = []
@@ -229,6 +259,7 @@ class Block(TreeMember):
         if isinstance(i, int):
             if (i == 0) or (i == -1) or \
                (i == len(self) - 1) or (i == -len(self)):
+                self.__note_structure_change()
                 self.__node_list[i].block = None
                 return self.__node_list.__delitem__(i)
             elif (-len(self) < i < len(self) - 1):
@@ -295,9 +326,15 @@ class Block(TreeMember):
 
     
     def index(self, node):
-        '''Get the index number of the specified node in the block.'''
+        '''
+        Get the index number of the specified node in the block.
+        
+        This takes constant time, regardless of the length of the block.
+        '''
         assert self.alive
-        return self.__node_list.index(node)
+        if node.block is not self:
+            raise ValueError('%s is not in the block.' % node)
+        return node.__position - self.__node_list[0].__position
     
     
     def is_overlapping(self, tree_member):
@@ -0,0 +1,87 @@
+# Copyright 2009-2011 Ram Rachum.
+# This program is distributed under the LGPL2.1 license.
+
+'''
+Defines the `Cycle` class.
+
+See its documentation for more information.
+'''
+
+from __future__ import division
+
+import math
+
+from garlicsim.general_misc import address_tools
+
+from .end import End
+
+
+class Cycle(End):
+    '''
+    A cycle that the simulation entered, after which it repeats itself.
+
+    When a deterministic simulation gets back to a state it had before, it
+    will repeat the states that came after it forever. So a cruncher that
+    finds this stops crunching, and a `Cycle` is added to the `.ends` of the
+    last node. (See `CycleDetector`.)
+
+    Like any end, a cycle means that there's nothing more to crunch on its
+    timeline. But the simulation doesn't end; the states it would have later
+    are already in the tree, so they can be found by `get_equivalent_clock`.
+    '''
+
+    def __init__(self, tree, parent, step_profile=None, period=1):
+        End.__init__(self, tree, parent, step_profile)
+
+        assert period >= 1
+        self.period = period
+        '''
+        The number of nodes in the cycle.
+
+        The node that many generations above the parent node has the same
+        state as the parent node, apart from the clock.
+        '''
+
+        self.clock_period = \
+            parent.state.clock - self.get_first_node().state.clock
+        '''The time it takes the simulation to go around the cycle once.'''
+
+
+    def get_first_node(self):
+        '''Get the node whose state the parent node's state repeats.'''
+        return self.parent.get_ancestor(self.period)
+
+
+    def get_equivalent_clock(self, clock):
+        '''
+        Get the clock in the cycle at which the state is the same as at `clock`.
+
+        If `clock` is after the parent node's clock, returns a clock which is
+        a whole number of cycles earlier, and no later than the parent node's
+        clock. Otherwise returns `clock`.
+        '''
+        last_clock = self.parent.state.clock
+        if clock <= last_clock or not self.clock_period:
+            return clock
+        n_cycles = math.ceil((clock - last_clock) / self.clock_period)
+        return clock - n_cycles * self.clock_period
+
+
+    def __repr__(self):
+        '''
+        Get a string representation of the cycle.
+
+        Example output:
+        <garlicsim.data_structures.Cycle of 2 nodes to state with clock 6,
+        crunched with life.State.step(<state>), at 0x1ffde70>
+        '''
+
+        return '<%s of %s nodes to state with clock %s, crunched with %s, ' \
+               'at %s>' % \
+            (
+                address_tools.describe(type(self), shorten=True),
+                self.period,
+                self.parent.state.clock,
+                self.step_profile,
+                hex(id(self))
+            )
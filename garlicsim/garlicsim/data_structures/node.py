@@ -7,6 +7,8 @@ Defines the `Node` class and related exceptions.
 See documentation of `Node` for more information.
 '''
 
+from __future__ import with_statement
+
 from garlicsim.general_misc.infinity import infinity
 from garlicsim.general_misc import misc_tools
 from garlicsim.general_misc import address_tools
@@ -22,6 +24,17 @@ from .tree_member import TreeMember
 __all__ = ['Node', 'NodeError', 'NodeLookupError']
 
 
+DELTA_KEYFRAME_INTERVAL = 20
+'''
+How often a node on a natural timeline keeps its full state.
+
+When a tree's `.store_deltas` is on, natural nodes in blocks store their state
+as a delta from their parent's state if the simpack supports it, (see
+`State.diff`,) except that every this many nodes there's a node that keeps its
+full state. So getting a node's state takes at most this many patches.
+'''
+
+
 class NodeError(GarlicSimException):
     '''Node-related Exception.'''
 
@@ -42,6 +55,14 @@ class Node(TreeMember):
     '''
     # todo: Maybe node should not reference tree?
     
+    __slots__ = ('tree', '_Node__state', '_Node__state_delta',
+                 '_Node__delta_depth', 'parent', 'step_profile', 'touched',
+                 'block', 'children', 'derived_nodes', 'still_in_editing',
+                 'ends', '_Block__position', '__weakref__')
+    # Using `__slots__` because a long simulation has a huge number of nodes,
+    # and a `__dict__` for each one takes a lot of memory. `_Block__position`
+    # is set by the block that the node is in; See `Block.__node_list`.
+    
     def __init__(self, tree, state, parent=None, step_profile=None,
                  touched=False):
         '''
@@ -59,7 +80,6 @@ class Node(TreeMember):
         '''The tree in which this node resides.'''
         
         self.state = state
-        '''The state contained in the node.'''
         
         self.parent = parent
         '''The parent node of this node.'''
@@ -114,11 +134,96 @@ class Node(TreeMember):
         '''
   
         
+    def __get_state(self):
+        '''Get the state, rebuilding it from deltas if needed.'''
+        if self.__state is not None:
+            return self.__state
+        return self.__materialize_state()
+        
+    
+    def __set_state(self, state):
+        '''Set the state, storing it in full.'''
+        self.__state = state
+        self.__state_delta = None
+        self.__delta_depth = 0
+        
+    state = property(
+        __get_state,
+        __set_state,
+        doc='''
+        The state contained in the node.
+        
+        Natural nodes may store their state as a delta from their parent's
+        state, if the tree's `.store_deltas` is on; (see
+        `._store_state_as_delta`;) In that case it's rebuilt on
+        access, and kept in the tree's cache of recently used states.
+        '''
+    )
+    
+    
+    def _store_state_as_delta(self):
+        '''
+        Store the state as a delta from the parent's state, to save memory.
+        
+        This is called by the tree for natural nodes in blocks, when its
+        `.store_deltas` is on and the state type has the `diff` and `patch`
+        hooks. Every `DELTA_KEYFRAME_INTERVAL` nodes we keep the full state
+        instead, so the chain of deltas we'd need to patch to rebuild a state
+        stays short.
+        '''
+        depth = self.parent.__delta_depth + 1
+        if depth >= DELTA_KEYFRAME_INTERVAL:
+            return
+        state = self.__state
+        self.__state_delta = (state.diff(self.parent.state), state.clock)
+        self.__state = None
+        self.__delta_depth = depth
+        with self.tree._state_cache_lock:
+            self.tree._cache_state(self, state)
+        
+        
+    def __materialize_state(self):
+        '''Rebuild the state by patching the states of our ancestors.'''
+        tree = self.tree
+        with tree._state_cache_lock:
+            nodes_to_patch = []
+            node = self
+            while True:
+                state = node.__state
+                if state is not None:
+                    break
+                state = tree._get_cached_state(node)
+                if state is not None:
+                    break
+                nodes_to_patch.append(node)
+                node = node.parent
+            for node in reversed(nodes_to_patch):
+                (delta, clock) = node.__state_delta
+                state = state.patch(delta)
+                state.clock = clock
+                tree._cache_state(node, state)
+            return state
+        
+        
     def __len__(self):
         '''Just return 1. This is useful because of blocks.'''
         return 1
 
     
+    def __getstate__(self):
+        '''Get the node's attributes as a dict, for pickling.'''
+        return dict(
+            (name, getattr(self, name)) for name in self.__slots__ if
+            (name != '__weakref__') and hasattr(self, name)
+        )
+    
+    
+    def __setstate__(self, node_state):
+        '''Restore the node's attributes from a dict, for unpickling.'''
+        for (name, value) in node_state.iteritems():
+            setattr(self, name, value)
+
+    
     def finalize(self):
         '''
         Finalize the node, assuming it's in currectly in editing mode.
@@ -372,12 +477,12 @@ class Node(TreeMember):
     
     def is_last_on_block(self):
         '''Return whether the node the last one on its block.'''
-        return self.block and (self.block.index(self) == len(self.block) - 1)
+        return self.block and (self.block[-1] is self)
 
     
     def is_first_on_block(self):
         '''Return whether the node the first one on its block.'''
-        return self.block and (self.block.index(self) == 0)
+        return self.block and (self.block[0] is self)
 
     
     def is_overlapping(self, tree_member):
@@ -9,6 +9,7 @@ See its documentation for more information.
 
 import copy as copy_module # Avoiding name clash.
 import __builtin__
+import bisect
 
 from garlicsim.general_misc import binary_search
 from garlicsim.general_misc import misc_tools
@@ -19,6 +20,7 @@ from garlicsim.misc import GarlicSimException
 
 from .node import Node
 from .block import Block
+from .cycle import Cycle
 # from .tree import Tree (at bottom of the file)
 
 
@@ -95,6 +97,101 @@ class Path(object):
          # todo: Use shallow copy instead of dict.__init__. Will allow
          # dictoids.
 
+        self.__members = []
+        '''
+        The members of the path, i.e. its blocks and blockless nodes, in order.
+        
+        This is a lazily-built index of the path, used to give quick random
+        access to its nodes. It's kept together with `.__starts` and
+        `.__member_positions`, and is updated by `.__update_index`.
+        '''
+        
+        self.__starts = []
+        '''List of the index numbers in the path of each member's first node.'''
+        
+        self.__member_positions = {}
+        '''Dict mapping each member of the path to its index in `.__members`.'''
+        
+        self.__index_root = None
+        '''The root from which the index was built.'''
+        
+        self.__index_version = None
+        '''The tree's `._structure_version` at the time the index was built.'''
+
+        
+    def __update_index(self):
+        '''
+        Bring the index of the path's members up to date.
+        
+        If the tree's structure was changed since the index was built, (i.e. a
+        block was split, or nodes were deleted,) or the path itself was
+        changed, the index is built from scratch. Otherwise, it's only extended
+        to cover the nodes that were added after the end of the path, which
+        takes time proportional to the number of new members.
+        '''
+        members = self.__members
+        starts = self.__starts
+        member_positions = self.__member_positions
+        
+        if (self.__index_root is not self.root) or \
+           (self.__index_version != self.tree._structure_version):
+            del members[:]
+            del starts[:]
+            member_positions.clear()
+            self.__index_root = self.root
+            self.__index_version = self.tree._structure_version
+            if self.root is None:
+                return
+            head = self.root
+            
+        else: # The index is still good, we may only need to extend it.
+            if not members:
+                return
+            last_member = members[-1]
+            if isinstance(last_member, Node) and \
+               last_member.block is not None:
+                # The last node got a child, and the two were wrapped in a new
+                # block. We'll throw the node out of the index and add the
+                # block in its place.
+                head = last_member
+                del member_positions[members.pop()]
+                starts.pop()
+            else:
+                real_last_node = last_member if isinstance(last_member, Node) \
+                                 else last_member[-1]
+                if not real_last_node.children:
+                    return
+                head = self.next_node(last_member)
+
+        assert head.block is None or head.is_first_on_block()
+        
+        length = (starts[-1] + len(members[-1])) if members else 0
+        for member in self.iterate_blockwise(head=head):
+            member_positions[member] = len(members)
+            members.append(member)
+            starts.append(length)
+            length += len(member)
+                
+            
+    def __get_index_of_node(self, node):
+        '''
+        Get the index number of `node` in the path, using the index.
+        
+        Returns `None` if the node is not on the path. The index must be up to
+        date when calling this.
+        '''
+        if node.block is not None:
+            member_position = self.__member_positions.get(node.block, None)
+            if member_position is None:
+                return None
+            return self.__starts[member_position] + node.block.index(node)
+        else: # node.block is None
+            member_position = self.__member_positions.get(node, None)
+            if member_position is None:
+                return None
+            return self.__starts[member_position]
+        
+
          
     def __len__(self, head=None, tail=None):
         '''
@@ -105,7 +202,25 @@ class Path(object):
         '''
         if head is None and self.root is None:
             return 0
-            
+        
+        if head is None and tail is None:
+            self.__update_index()
+            return self.__starts[-1] + len(self.__members[-1])
+        
+        self.__update_index()
+        head_index = 0 if head is None else self.__get_index_of_node(
+            head if isinstance(head, Node) else head[0]
+        )
+        tail_index = len(self) - 1 if tail is None else \
+            self.__get_index_of_node(tail if isinstance(tail, Node) else
+                                     tail[-1])
+        if (head_index is not None) and (tail_index is not None) and \
+           (head_index <= tail_index):
+            return tail_index - head_index + 1
+        
+        # If the flow reached here, `head` or `tail` are not on the path (or
+        # out of order,) and we let `iterate_blockwise` raise the appropriate
+        # exception.
         return sum(len(thing) for thing in 
                    self.iterate_blockwise(head=head, tail=tail))
 
@@ -296,6 +411,13 @@ class Path(object):
         '''
         
         assert isinstance(thing, Node) or isinstance(thing, Block)
+        
+        if head is None and tail is None:
+            self.__update_index()
+            if isinstance(thing, Block):
+                return thing in self.__member_positions
+            else: # isinstance(thing, Node)
+                return self.__get_index_of_node(thing) is not None
 
         for candidate in self.iterate_blockwise(head=head, tail=tail):
             if candidate is thing:
@@ -349,6 +471,29 @@ class Path(object):
         #todo: generalize `tail` to blocks
         assert isinstance(index, int)
         
+        if tail is None or isinstance(tail, Node):
+            self.__update_index()
+            if not self.__members:
+                raise PathOutOfRangeError
+            if tail is None:
+                last_index = self.__starts[-1] + len(self.__members[-1]) - 1
+            else: # isinstance(tail, Node)
+                last_index = self.__get_index_of_node(tail)
+            if last_index is not None:
+                if index < 0:
+                    index += last_index + 1
+                if not (0 <= index <= last_index):
+                    raise PathOutOfRangeError
+                member_position = bisect.bisect_right(self.__starts, index) - 1
+                member = self.__members[member_position]
+                if isinstance(member, Block):
+                    return member[index - self.__starts[member_position]]
+                else: # isinstance(member, Node)
+                    return member
+            
+        # If the flow reached here, `tail` is a block or it's not on the path,
+        # so we do it the slow way.
+        
         if index >= 0:
             return self.__get_item_positive(index, tail=tail)
         else:
@@ -426,11 +571,16 @@ class Path(object):
         You may optionally specify `head`, which may be either a node or block.
         '''
 
-        # Setting to `None` before loop, so we know if loop was empty:
-        thing = None 
-        
-        for thing in self.iterate_blockwise(head=head):
-            pass
+        if head is None:
+            self.__update_index()
+            thing = self.__members[-1] if self.__members else None
+            
+        else: # head is not None
+            # Setting to `None` before loop, so we know if loop was empty:
+            thing = None 
+            
+            for thing in self.iterate_blockwise(head=head):
+                pass
 
         if isinstance(thing, Block):
             return thing[-1]
@@ -456,8 +606,19 @@ class Path(object):
         rounding options.
         
         You may optionally specify a `tail_node`.
+        
+        If the path ends in a `Cycle`, for clocks after its end you get the
+        node in the cycle whose state the simulation will have at that time.
+        (Its clock is earlier, by a whole number of cycles.)
         '''
         
+        if tail_node is None and self.root is not None:
+            last_node = self.get_last_node()
+            for end in last_node.ends:
+                if isinstance(end, Cycle):
+                    clock = end.get_equivalent_clock(clock)
+                    break
+        
         my_function = lambda node: node.state.clock
         return self.get_node_by_monotonic_function(function=my_function,
                                                    value=clock,
@@ -508,9 +669,10 @@ class Path(object):
         
         The rounding option used is `binary_search.BOTH`.
         
-        Note that this function does not let you specify a tail node. Currently
-        we're not optimizing for the case where you have a tail node and this
-        function might waste resources exploring beyond it.
+        This uses the path's index to do a binary search over the path's
+        members, so it takes a logarithmic number of calls to `function`.
+        
+        Note that this function does not let you specify a tail node.
         '''
         
         root = self.root
@@ -527,76 +689,62 @@ class Path(object):
         # Now we've established that the first node in the path has a strictly
         # lower value than what we're looking for.
         
-        # A rule we will strictly obey in this function: `low` will always be a
-        # member whose value is lower than the desired value. (Strictly lower,
-        # meaning not lower-or-equal.)
-        
-        low = self.root
+        self.__update_index()
+        members = self.__members
+        first_node_of = lambda member: \
+            member if isinstance(member, Node) else member[0]
+        
+        # We do a binary search on the members of the path, looking for the
+        # last member whose first node has a value strictly lower than the
+        # desired value. We know the first member qualifies.
+        
+        low_position, high_position = 0, len(members)
+        while high_position - low_position > 1:
+            medium_position = (low_position + high_position) // 2
+            if function(first_node_of(members[medium_position])) < value:
+                low_position = medium_position
+            else:
+                high_position = medium_position
+                
+        member = members[low_position]
         
-        for thing in self.iterate_blockwise():
+        if isinstance(member, Block):
             
-            # Rule: Every time we inspect a new node/block, `low` will be the
-            # node that is its immediate parent. i.e. The highest node possible
-            # from those that we have previously examined.
+            block = member
+            last = block[-1]
             
-            if isinstance(thing, Block):
-                
-                block = thing
-                
-                first = block[0]
-
-                cmp_first = cmp(function(first), value)
-                
-                if cmp_first == -1: # function(first) < value
-                    low = first
-                
-                elif cmp_first == 0: # function(first) == value
-                    return (first, first)
-                    
-                else: # cmp_first == 1 and function(first) > value
-                    return (low, first)
-                    
-                
-                # At this point we know that the first node in the block has a
-                # strictly lower value than the target value.
-                
-                last = block[-1]
-                
-                cmp_last = cmp(function(last), value)
-                
-                if cmp_last == -1: # function(last) < value
-                    low = last
-                    continue
-                
-                elif cmp_last == 0: # function(last) == value                
-                    return (last, last)
-                
-                else: # cmp_last == 1 and function(last) > value
-                    # The two final results are both in the block.
-                    return binary_search.binary_search(
-                        block, function, value, rounding=binary_search.BOTH
-                    )
-                    
-                
-            else: # thing is a Node
-                
-                node = thing
-                
-                cmp_node = cmp(function(node), value)
-                                
-                if cmp_node == -1: # function(node) < value
-                    low = node
-                    continue
-                elif cmp_node == 0: # function(node) == value
-                    return (node, node)
-                else: # function(node) > value
-                    return (low, node)
+            cmp_last = cmp(function(last), value)
+            
+            if cmp_last == 0: # function(last) == value
+                return (last, last)
+            
+            elif cmp_last == 1: # function(last) > value
+                # The two final results are both in the block.
+                return binary_search.binary_search(
+                    block, function, value, rounding=binary_search.BOTH
+                )
+            
+            assert cmp_last == -1 # and function(last) < value
+            low = last
+            
+        else: # isinstance(member, Node)
+            low = member
+            
+        # At this point we know that `low` is the last node in its member, and
+        # has a strictly lower value than the target value. The answer is
+        # between it and the first node of the next member, if one exists.
         
-
-        # If the flow reached here, that means that even the last node in the
-        # path has lower value than the value we're looking for.
+        if high_position == len(members):
+            # Even the last node in the path has lower value than the value
+            # we're looking for.
+            return (low, None)
         
-        return (low, None)
+        high = first_node_of(members[high_position])
+        
+        if function(high) == value:
+            return (high, high)
+        else: # function(high) > value
+            return (low, high)
             
     
     def get_node_occupying_timepoint(self, timepoint):
@@ -641,13 +789,20 @@ class Path(object):
         '''
         Modify the path to include the specified node.
         
+        If the node is already on the path, (like when it was just added after
+        the path's last node,) this takes amortized constant time, and the
+        path's index is kept. Otherwise the path is rebuilt up to the node.
+        
         Optimization note: Don't try to check whether `node in path` before
         calling this method. It's more efficient to just call this method
         without checking first.
         '''
+        if node in self:
+            return
         new_path = node.make_past_path()
         self.root = new_path.root
         self.decisions.update(new_path.decisions)
+        self.__index_version = None # Decisions might have changed.
     
     
     def states(self):
@@ -52,6 +52,53 @@ class State(object):
     create_root = None
     create_messy_root = None
     
+    dump_payload = None
+    load_payload = None
+    # Optional hooks that let `ProcessCruncher` send big states through shared
+    # memory instead of pickling them. (See `SharedMemoryRing`.) To use them,
+    # implement `dump_payload(self)` to return a tuple `(payload, rest)`, where
+    # `payload` is a string with the bulk of the state's data and `rest` is
+    # a small pickleable object with everything else. Then implement the
+    # class method `load_payload(cls, payload, rest)` to build an equal state
+    # from them. (There's no need to handle `.clock`, it's taken care of.)
+    # The `payload` given to `load_payload` is a `buffer` into the shared
+    # memory, which gets reused as soon as `load_payload` returns, so copy out
+    # of it anything you keep.
+    
+    diff = None
+    patch = None
+    # Optional hooks that let the tree store states as deltas, which saves a
+    # lot of memory when consecutive states are mostly the same. The tree
+    # uses them only if its `.store_deltas` is on. (See `Node.state`.) To use
+    # them, implement `diff(self, old_state)` to return a delta describing how
+    # to get from `old_state` to this state, and `patch(self, delta)` to
+    # return a new state, equal to the one the delta was made from. Don't
+    # change `self` in either of them. (There's no need to handle `.clock`,
+    # it's taken care of.)
+    
+    __state_copy__ = None
+    # Optional hook that makes `state_deepcopy` faster, which step iterators
+    # use to copy states for inplace step functions. If you know what your
+    # state is made of, implement `__state_copy__(self, memo)` to return a
+    # copy of the state that shares nothing that may change with it, like
+    # `state_deepcopy` would, but without going through `deepcopy`. `memo` is
+    # a `StateCopy`, to pass to `deepcopy` for any parts you don't copy
+    # yourself. Objects that never change, and `Persistent` objects, may be
+    # shared between the state and its copy. (See `copy_attributes` in
+    # `garlicsim.misc.state_deepcopy` for a helper.) States that inherit from
+    # `CopyOnWrite` get this hook from it.
+    
+    __state_key__ = None
+    # Optional hook that makes detecting cycles faster. When a deterministic
+    # simulation is crunched, every state gets a key, (see `state_key` in
+    # `garlicsim.misc.state_key`,) and when a state has the same key as an
+    # earlier one, the crunching stops, because the simulation will repeat
+    # itself from then on. By default the key is the pickled attributes of the
+    # state. If you can make a key quicker, implement `__state_key__(self)` to
+    # return a hashable object that's equal for two states only if they're
+    # the same world state. Leave out `.clock`, but if the step function looks
+    # at the clock, put in the key what it uses.
+    
     # Python 2.5 doesn't have `type.__eq__`, so we supply one:
     __eq__ = lambda self, other: (id(self) == id(other))
     
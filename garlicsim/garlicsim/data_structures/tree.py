@@ -7,24 +7,35 @@ Defines the `Tree` class and the related `TreeError` exception.
 See their documentation for more information.
 '''
 
+from __future__ import division
+
 import copy
+import threading
 
 from garlicsim.general_misc import misc_tools
 from garlicsim.general_misc import address_tools
-from garlicsim.general_misc.nifty_collections import OrderedSet
+from garlicsim.general_misc.nifty_collections import OrderedSet, OrderedDict
 
 import garlicsim.misc
 from garlicsim.misc import GarlicSimException
+from garlicsim.misc.state_key import state_key
 
 # In bottom of file:
 # `from .node import Node`
 # `from .block import Block`
 # `from .end import End`
+# `from .cycle import Cycle`
 
 
 __all__ = ["Tree", "TreeError"]
 
 
+STATE_CACHE_SIZE = 100
+'''
+How many states rebuilt from deltas each tree keeps. (See `Node.state`.)
+'''
+
+
 class TreeError(GarlicSimException):
     '''Tree-related exception.'''
 
@@ -50,12 +61,86 @@ class Tree(object):
     '''
     def __init__(self):
         
-        self.nodes = []
-        '''List of nodes that belong to the tree.'''
+        self.nodes = OrderedSet()
+        '''
+        Ordered set of nodes that belong to the tree, in order of creation.
+        
+        This is a set and not a list so that removing nodes would be O(1).
+        '''
         
         self.roots = []
         '''List of roots (parentless nodes) of the tree.'''
         
+        self._structure_version = 0
+        '''
+        Counter that's increased whenever the tree's structure changes.
+        
+        "Changes" here means changes other than adding nodes at the end of
+        existing lines: Splitting blocks, deleting nodes, etc. Paths use this
+        to know when they need to rebuild their index.
+        '''
+        
+        self._state_cache = OrderedDict()
+        '''
+        Recently used states of nodes that store their state as a delta.
+        
+        This is a least-recently-used cache, mapping nodes to their states.
+        '''
+        
+        self._state_cache_lock = threading.Lock()
+        '''Lock guarding `._state_cache`, which readers may use concurrently.'''
+        
+        self.store_deltas = False
+        '''
+        Whether natural nodes should store their states as deltas.
+        
+        When this is on, and the simpack's state type has the `diff` and
+        `patch` hooks, natural nodes in blocks store their state as a delta
+        from their parent's state. (See `Node.state`.) This saves a lot of
+        memory when consecutive states are mostly the same, but getting the
+        state of a node whose state isn't in the tree's cache means patching
+        up to `DELTA_KEYFRAME_INTERVAL` deltas, which is much slower than
+        getting a state that's kept in full.
+        '''
+        
+        self.intern_states = False
+        '''
+        Whether natural nodes with equal states should share one state object.
+        
+        When this is on, every state that's added to the tree in a natural node
+        is looked up by its clock and its key, (see `state_key`,) and if an
+        equal state is already in the tree, the node gets that state object
+        instead. This saves memory when many forks of a deterministic
+        simulation go through the same states. Nodes with interned states keep
+        them in full, and don't store deltas. (See `.store_deltas`.)
+        
+        States in the tree must not be changed anyway, but with this on it's
+        even more important, since a state may belong to many nodes. (Edit a
+        state only in a node made with `fork_to_edit`, whose state is a copy.)
+        '''
+        
+        self.n_interned_states = 0
+        '''The number of states that were looked up for sharing.'''
+        
+        self.n_shared_states = 0
+        '''The number of those that got an equal state which was in the tree.'''
+        
+        self._interned_states = {}
+        '''
+        Dict from `(clock, state_key)` to a state in the tree, for interning.
+        
+        The values are lists of `[state, n_holders, key]`, where `n_holders` is
+        the number of nodes that hold the state. When they're all deleted, the
+        state is dropped from here.
+        '''
+        
+        self._interned_entries = {}
+        '''
+        Dict mapping each node with an interned state to its entry.
+        
+        The entry is the value for the state in `._interned_states`.
+        '''
+        
         self.lock = garlicsim.general_misc.read_write_lock.ReadWriteLock()
         '''
         A read-write lock that guards access to the tree.
@@ -79,8 +164,20 @@ class Tree(object):
         
         Returns the node.
         '''
-        new_state = \
-            garlicsim.misc.state_deepcopy.state_deepcopy(template_node.state)
+        template_state = template_node.state
+        if isinstance(template_state, garlicsim.misc.CopyOnWrite):
+            # A lazy copy would share everything with the template's state
+            # until it's changed through `get_writable`, but the user may
+            # change the new state with plain attribute assignments. So we
+            # make a full copy, which shares nothing. (See
+            # `CopyOnWrite.__deepcopy__`.)
+            new_state = copy.deepcopy(
+                template_state,
+                garlicsim.misc.state_deepcopy.StateCopy()
+            )
+        else:
+            new_state = \
+                garlicsim.misc.state_deepcopy.state_deepcopy(template_state)
 
         parent = template_node.parent
         new_step_profile = copy.copy(template_node.step_profile)
@@ -100,17 +197,182 @@ class Tree(object):
         '''
         touched = (parent is None) or (template_node is not None)
         
+        entry = None
+        if self.intern_states and (not touched) and hasattr(state, 'clock'):
+            entry = self.__intern_state(state)
+            state = entry[0]
+        
+        if (not touched) and (parent.step_profile == step_profile):
+            # Nodes on a natural timeline share one step profile object, which
+            # saves a lot of memory on long simulations. (Step profiles are
+            # immutable, so sharing them is safe.)
+            step_profile = parent.step_profile
+        else:
+            step_profile = copy.copy(step_profile)
+        
         my_node = Node(
             self,
             state,
-            step_profile=copy.copy(step_profile),
+            step_profile=step_profile,
             touched=touched
         )
         
         self.__add_node(my_node, parent, template_node)
+        
+        if entry is not None:
+            self._interned_entries[my_node] = entry
+        elif self.store_deltas and my_node.block is not None and \
+             self.__supports_deltas(state):
+            my_node._store_state_as_delta()
+            
         return my_node
 
 
+    def add_states(self, states, parent, step_profile):
+        '''
+        Wrap a succession of states in natural nodes and add them to the tree.
+
+        The first state will be a child of `parent`, and each subsequent state
+        will be a child of the one before it, all crunched with `step_profile`.
+        This is equivalent to calling `add_state` for each state in turn, but
+        the nodes are added to a block in one operation.
+
+        Returns a list of the new nodes.
+        '''
+        if parent is None:
+            raise TreeError("Can't add a succession of states without a "
+                            "parent; Use `add_state` to add a root.")
+
+        if not states:
+            return []
+
+        if parent.step_profile == step_profile:
+            step_profile = parent.step_profile
+        else:
+            step_profile = copy.copy(step_profile)
+
+        new_nodes = []
+        current_node = parent
+        for state in states:
+            if not hasattr(state, 'clock'):
+                state.clock = current_node.state.clock + 1
+            entry = None
+            if self.intern_states:
+                entry = self.__intern_state(state)
+                state = entry[0]
+            node = Node(self, state, parent=current_node,
+                        step_profile=step_profile)
+            current_node.children.append(node)
+            new_nodes.append(node)
+            if entry is not None:
+                self._interned_entries[node] = entry
+            current_node = node
+
+        self.nodes |= new_nodes
+
+        joins_parent = (len(parent.children) == 1) and \
+                       (not parent.touched) and \
+                       (parent.step_profile == step_profile)
+
+        if parent.block:
+            if joins_parent:
+                parent.block.add_node_list(new_nodes)
+            else:
+                if not (parent is parent.block[-1]):
+                    parent.block.split(parent)
+                if len(new_nodes) >= 2:
+                    Block(new_nodes)
+        else: # parent.block is None
+            if joins_parent:
+                Block([parent] + new_nodes)
+            elif len(new_nodes) >= 2:
+                Block(new_nodes)
+                
+        if self.store_deltas and self.__supports_deltas(states[0]):
+            for node in new_nodes:
+                if node.block is not None and \
+                   node not in self._interned_entries:
+                    node._store_state_as_delta()
+
+        return new_nodes
+    
+    
+    @staticmethod
+    def __supports_deltas(state):
+        '''Return whether the state can be stored as a delta in a node.'''
+        return (type(state).diff is not None) and \
+               (type(state).patch is not None)
+    
+    
+    def __intern_state(self, state):
+        '''
+        Get the state that a new natural node should hold instead of `state`.
+        
+        Returns the state's entry in `._interned_states`, whose first item is
+        the state to use; it may be an equal state that's already in the tree.
+        (See `.intern_states`.) The caller must put the new node in
+        `._interned_entries` with the entry.
+        '''
+        self.n_interned_states += 1
+        key = (state.clock, state_key(state))
+        entry = self._interned_states.get(key)
+        if entry is not None:
+            self.n_shared_states += 1
+            entry[1] += 1
+        else:
+            entry = self._interned_states[key] = [state, 1, key]
+        return entry
+    
+    
+    def __release_interned_state(self, node):
+        '''Forget that a node that's being deleted holds an interned state.'''
+        entry = self._interned_entries.pop(node, None)
+        if entry is None:
+            return
+        entry[1] -= 1
+        if not entry[1]:
+            del self._interned_states[entry[2]]
+    
+    
+    def get_sharing_ratio(self):
+        '''
+        Get how many states were interned per state object that was kept.
+        
+        This is the number of states that were looked up for sharing, divided
+        by the number of them that weren't equal to a state in the tree. For
+        example, 2 means the interned states took half the memory they would
+        take without sharing. Returns 1 when no states were interned. (See
+        `.intern_states`.)
+        '''
+        n_kept_states = self.n_interned_states - self.n_shared_states
+        if not n_kept_states:
+            return 1
+        return self.n_interned_states / n_kept_states
+    
+    
+    def _get_cached_state(self, node):
+        '''
+        Get the node's state from the state cache, or `None` if it's not there.
+        
+        Must be called with `._state_cache_lock` held.
+        '''
+        state = self._state_cache.get(node)
+        if state is not None:
+            self._state_cache.move_to_end(node)
+        return state
+    
+    
+    def _cache_state(self, node, state):
+        '''
+        Put the node's state in the state cache.
+        
+        Must be called with `._state_cache_lock` held.
+        '''
+        self._state_cache[node] = state
+        if len(self._state_cache) > STATE_CACHE_SIZE:
+            self._state_cache.popitem(last=False)
+
+
     def __add_node(self, node, parent=None, template_node=None):
         '''
         Add a node to the tree.
@@ -130,7 +392,7 @@ class Tree(object):
             template_node.derived_nodes.append(node)
             
 
-        self.nodes.append(node)
+        self.nodes.add(node)
 
         if parent:
             if not hasattr(node.state, 'clock'):
@@ -180,6 +442,18 @@ class Tree(object):
         end = End(self, node, step_profile)
         return end
     
+    
+    def make_cycle(self, node, step_profile, period):
+        '''
+        Create a cycle after the specified node.
+        
+        This marks that the simulation repeats itself after `node`, with the
+        `period` nodes up to it. Must specify a step profile with which this
+        cycle was reached.
+        '''
+        cycle = Cycle(self, node, step_profile, period)
+        return cycle
+    
 
     def all_possible_paths(self):
         '''Return all the possible paths this tree may entertain.'''
@@ -264,6 +538,8 @@ class Tree(object):
         # stitched to the new parent, but I'm currently forcing it to be
         # `False` because I haven't decided yet how I will handle stitching.
         
+        self._structure_version += 1
+        
         head_node = node_range.head if isinstance(node_range.head, Node) \
                      else node_range.head[0]
         
@@ -278,9 +554,15 @@ class Tree(object):
             big_parent.children.remove(head_node)
         
         outside_children = node_range.get_outside_children()
+        
+        for node in outside_children:
+            # The states of these nodes may be stored as deltas from nodes
+            # we're deleting, so we store them in full:
+            node.state = node.state
             
         for node in node_range:
             self.nodes.remove(node)
+            self.__release_interned_state(node)
 
         current_block = None
         last_block_change = None
@@ -334,15 +616,38 @@ class Tree(object):
     def __getstate__(self):
         my_dict = dict(self.__dict__)
         del my_dict['lock']
+        del my_dict['_state_cache']
+        del my_dict['_state_cache_lock']
+        del my_dict['_interned_states']
+        del my_dict['_interned_entries']
+        # The interning tables are keyed by state keys, which may be big, so
+        # we pickle only the nodes that hold interned states, and rebuild the
+        # tables from them when unpickling:
+        my_dict['_interned_nodes'] = list(self._interned_entries)
         return my_dict
     
     
     def __setstate__(self, pickled_tree_state):
         self.__init__()
+        pickled_tree_state = dict(pickled_tree_state)
+        interned_nodes = pickled_tree_state.pop('_interned_nodes', ())
         self.__dict__.update(pickled_tree_state)
+        if not isinstance(self.nodes, OrderedSet):
+            # Trees pickled by older versions kept their nodes in a list.
+            self.nodes = OrderedSet(self.nodes)
+        for node in interned_nodes:
+            state = node.state
+            key = (state.clock, state_key(state))
+            entry = self._interned_states.get(key)
+            if entry is not None and entry[0] is state:
+                entry[1] += 1
+            else:
+                entry = self._interned_states[key] = [state, 1, key]
+            self._interned_entries[node] = entry
         
         
     
 from .node import Node
 from .block import Block
 from .end import End
+from .cycle import Cycle
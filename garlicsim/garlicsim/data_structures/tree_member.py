@@ -20,6 +20,8 @@ class TreeMember(object):
     # todo: add .step_profile as abstract
     
     __metaclass__ = abc.ABCMeta
+    
+    __slots__ = () # So subclasses may use `__slots__` if they want to.
   
     @abc.abstractmethod
     def __len__(self):
@@ -19,7 +19,7 @@ class OrderedSet(abcs_collection.MutableSet):
     A set with an order.
     
     You can also think of this as a list which doesn't allow duplicate items
-    and whose `__contains__` method is O(1).
+    and whose `__contains__` and `discard` methods are O(1).
     '''
 
     def __init__(self, iterable=None):
@@ -89,7 +89,7 @@ class OrderedSet(abcs_collection.MutableSet):
             return len(self) == len(other) and list(self) == list(other)
         return set(self) == set(other)
 
-    def __del__(self):
-        self.clear()                    # remove circular references
-        # todo: is this really needed? i'm worried about this making the gc not
-        # drop circulary-referencing objects.
+    def __reduce__(self):
+        # Pickling the items as a flat list; Pickling the linked list itself
+        # would recurse once per item and blow the stack on big sets.
+        return (type(self), (list(self),))
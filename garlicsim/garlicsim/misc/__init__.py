@@ -13,6 +13,11 @@ from . import state_deepcopy
 from .exceptions import (InvalidSimpack, SimpackError, GarlicSimWarning,
                          GarlicSimException, WorldEnded)
 from .auto_clock_generator import AutoClockGenerator
+from .copy_on_write import CopyOnWrite, CopyOnWriteError
+from .state_key import state_key
+from .cycle_detector import CycleDetector
+from .transition_cache import TransitionCache
+from .scalar_evaluator import ScalarEvaluator
 from .base_history_browser import BaseHistoryBrowser
 from .base_step_iterator import BaseStepIterator
 from . import step_iterators
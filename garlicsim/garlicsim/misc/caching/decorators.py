@@ -35,6 +35,26 @@ def history_cache(function, *args, **kwargs):
     On any subsequent calls to the function given the same node, the
     pre-calcluated value will be given from the cache instead of calculating it
     again.
+    
+    If the value at a node can be calculated from the value at its parent and
+    the node's state, you may declare that with the decorated function's
+    `.incremental`, like this:
+    
+        @garlicsim.misc.caching.history_cache
+        def total_live_cells(history_browser):
+            return sum(history_browser[i].get_n_live_cells() for i in
+                       xrange(len(history_browser)))
+        
+        @total_live_cells.incremental
+        def total_live_cells(parent_value, state):
+            return parent_value + state.get_n_live_cells()
+        
+    Then the raw function is used only for roots. For any other node, we find
+    the nearest ancestor whose value is in the cache, and go forward from it
+    to the node in one sweep, using the incremental function and caching the
+    value of every node on the way. So getting the values over a path of N
+    nodes takes N calls to the incremental function, instead of building N
+    history browsers.
     '''
     if hasattr(function, 'node_cache'):
         return function
@@ -43,21 +63,69 @@ def history_cache(function, *args, **kwargs):
         assert isinstance(node, garlicsim.data_structures.Node)
         if node in cached.node_cache:
             return cached.node_cache[node]
+        elif cached.incremental_function is not None:
+            return _sweep(cached, node)
         else:
-            path = node.make_containing_path()
-            with node.tree.lock.read:
-                history_browser = \
-                    garlicsim.synchronous_crunching.HistoryBrowser(
-                        path=path,
-                        tail_node=node
-                    )
-            value = function(history_browser)
+            value = _call_with_history_browser(function, node)
             cached.node_cache[node] = value
             return value
             
+    def incremental(incremental_function):
+        '''
+        Declare the incremental form of the function.
+        
+        `incremental_function` takes the value at a node's parent and the
+        node's state, and returns the value at the node. Returns the decorated
+        function, so this can be used as a decorator.
+        '''
+        cached.incremental_function = incremental_function
+        return cached
+            
     cached.node_cache = weakref.WeakKeyDictionary()
+    cached.incremental_function = None
+    cached.incremental = incremental
     
     functools.update_wrapper(cached, function)
     cached.__wrapped__ = function
     
     return cached
+
+
+def _call_with_history_browser(function, node):
+    '''Call `function` with a history browser whose last node is `node`.'''
+    path = node.make_containing_path()
+    with node.tree.lock.read:
+        history_browser = \
+            garlicsim.synchronous_crunching.HistoryBrowser(
+                path=path,
+                tail_node=node
+            )
+    return function(history_browser)
+
+
+def _sweep(cached, node):
+    '''
+    Get the value at `node` by going forward from its nearest cached ancestor.
+    
+    The values of all the nodes on the way get cached. If no ancestor is
+    cached, the sweep starts from the root, with the raw function.
+    '''
+    node_cache = cached.node_cache
+    incremental_function = cached.incremental_function
+    with node.tree.lock.read:
+        nodes_to_sweep = []
+        current_node = node
+        while current_node not in node_cache:
+            if current_node.parent is None:
+                node_cache[current_node] = _call_with_history_browser(
+                    cached.__wrapped__,
+                    current_node
+                )
+                break
+            nodes_to_sweep.append(current_node)
+            current_node = current_node.parent
+        value = node_cache[current_node]
+        for current_node in reversed(nodes_to_sweep):
+            value = incremental_function(value, current_node.state)
+            node_cache[current_node] = value
+    return value
@@ -0,0 +1,191 @@
+# Copyright 2009-2011 Ram Rachum.
+# This program is distributed under the LGPL2.1 license.
+
+'''
+This module defines the `CopyOnWrite` class.
+
+See its documentation for more information.
+'''
+
+import copy
+
+from garlicsim.general_misc import caching
+
+from .exceptions import GarlicSimException
+
+
+class CopyOnWriteError(GarlicSimException):
+    '''A copy-on-write object was changed while it was shared.'''
+
+
+class _Generation(object):
+    '''
+    A token shared by copy-on-write objects that may be changed together.
+
+    When a state is copied, the generation of its objects gets frozen, because
+    they're now shared by the state and its copy.
+    '''
+    def __init__(self):
+        self.frozen = False
+        '''Flag saying whether the objects are shared, and mustn't change.'''
+
+
+def _copy_container(container):
+    '''Copy a list, dict, deque or another container, shallowly.'''
+    if type(container) is list:
+        return container[:]
+    elif type(container) is dict:
+        return container.copy()
+    else:
+        return copy.copy(container)
+
+
+class CopyOnWrite(object):
+    '''
+    An object that's shared by a state and its copies until it's changed.
+
+    Inherit your state, and the objects it's made of, from this class to make
+    copying the state take constant time: `lazy_copy` copies only the state
+    object itself, and everything under it is shared with the copy. (It's also
+    used as the state's `__state_copy__`, so step iterators use it instead of
+    `deepcopy`.) When a step changes an object, that object is copied then,
+    so a step costs in proportion to what it changes rather than to the size
+    of the world.
+
+    For this to work, the objects must form a tree: Each object has one parent
+    that refers to it, either by an attribute or from a container such as a
+    list or a dict, and objects don't refer back to their parents. Pass
+    objects that a method needs as arguments instead.
+
+    Before changing an object or a container, get it from its parent with
+    `get_writable` or `get_writable_item`. These are the write barriers: They
+    copy the object if it's shared, put the copy in the parent, and return it.
+    The parent itself must be writable, so start from the state and go down.
+    Changing the attributes of a shared object raises `CopyOnWriteError`, but
+    changes to shared containers can't be detected, so always get containers
+    with `get_writable` before changing them.
+    '''
+
+    def __init__(self):
+        self.__dict__['_CopyOnWrite__generation'] = _Generation()
+        self.__dict__['_CopyOnWrite__own_names'] = set()
+
+
+    def __setattr__(self, name, value):
+        if self.__generation.frozen and not \
+           isinstance(getattr(type(self), name, None), caching.CachedProperty):
+            raise CopyOnWriteError(
+                "Can't change %s, because it's shared with a copy. Get it "
+                "through `get_writable` of its parent." % repr(self)
+            )
+        object.__setattr__(self, name, value)
+        self.__own_names.add(name)
+
+
+    def __copy_for(self, generation):
+        '''Copy this object, to be changed in `generation`.'''
+        klass = type(self)
+        new_thing = klass.__new__(klass)
+        new_dict = new_thing.__dict__
+        new_dict.update(self.__dict__)
+        new_dict['_CopyOnWrite__generation'] = generation
+        new_dict['_CopyOnWrite__own_names'] = set()
+        return new_thing
+
+
+    def __check_writable(self):
+        '''Raise `CopyOnWriteError` if this object is shared.'''
+        if self.__generation.frozen:
+            raise CopyOnWriteError(
+                "%s is shared with a copy, so it can't give writable "
+                "objects. Get it through `get_writable` of its parent." %
+                repr(self)
+            )
+
+
+    def get_writable(self, name):
+        '''
+        Get the attribute `name`, making sure it's safe to change.
+
+        If it's a `CopyOnWrite` object or a container that's shared with a
+        copy, it's copied and the copy is put in the attribute.
+        '''
+        self.__check_writable()
+        value = getattr(self, name)
+        generation = self.__generation
+        if isinstance(value, CopyOnWrite):
+            if value.__generation is not generation:
+                if name in self.__own_names and \
+                   not value.__generation.frozen:
+                    # It's a new object that was put here since we were last
+                    # copied, so it's not shared; adopting it:
+                    value.__dict__['_CopyOnWrite__generation'] = generation
+                else:
+                    value = value.__copy_for(generation)
+                    object.__setattr__(self, name, value)
+        elif name not in self.__own_names:
+            value = _copy_container(value)
+            object.__setattr__(self, name, value)
+            self.__own_names.add(name)
+        return value
+
+
+    def get_writable_item(self, name, key):
+        '''
+        Get `getattr(self, name)[key]`, making sure it's safe to change.
+
+        The container is made writable like in `get_writable`, and if the item
+        is a `CopyOnWrite` object that's shared with a copy, it's copied and
+        the copy is put in the container.
+        '''
+        container = self.get_writable(name)
+        item = container[key]
+        generation = self.__generation
+        if isinstance(item, CopyOnWrite) and \
+           item.__generation is not generation:
+            item = item.__copy_for(generation)
+            container[key] = item
+        return item
+
+
+    def lazy_copy(self):
+        '''
+        Copy this object, sharing everything under it until it's changed.
+
+        After this, both this object and its copy are writable, and everything
+        under them is shared.
+        '''
+        self.__generation.frozen = True
+        self.__dict__['_CopyOnWrite__generation'] = _Generation()
+        self.__dict__['_CopyOnWrite__own_names'] = set()
+        return self.__copy_for(_Generation())
+
+
+    def __deepcopy__(self, memo):
+        '''
+        Copy this object and everything under it, sharing nothing.
+
+        All of the copy is writable, even with plain attribute assignments,
+        until it's copied lazily. (`Tree.fork_to_edit` copies states this way,
+        so they could be edited freely.)
+        '''
+        generation = memo.get(_Generation)
+        if generation is None:
+            # The objects of the copy can be changed together, so they get one
+            # generation, which we keep in the memo:
+            generation = memo[_Generation] = _Generation()
+        klass = type(self)
+        new_thing = klass.__new__(klass)
+        memo[id(self)] = new_thing
+        new_dict = new_thing.__dict__
+        for (name, value) in self.__dict__.iteritems():
+            new_dict[name] = copy.deepcopy(value, memo)
+        new_dict['_CopyOnWrite__generation'] = generation
+        new_dict['_CopyOnWrite__own_names'] = set(new_dict)
+        return new_thing
+
+
+    def __state_copy__(self, memo):
+        '''Copy the state lazily. (See `State.__state_copy__`.)'''
+        return self.lazy_copy()
+
@@ -0,0 +1,62 @@
+# Copyright 2009-2011 Ram Rachum.
+# This program is distributed under the LGPL2.1 license.
+
+'''
+This module defines the `CycleDetector` class.
+
+See its documentation for more information.
+'''
+
+from .state_key import state_key
+
+
+class CycleDetector(object):
+    '''
+    Detects that a deterministic simulation reached a state it had before.
+
+    When a deterministic simulation reaches a state that it had before, (apart
+    from the clock,) it will repeat the states that came after it forever:
+    It's either a still life, which repeats one state, or an oscillator. A
+    cruncher gives every state it produces to `check`, which tells it when the
+    simulation started repeating, so it can stop crunching.
+
+    This uses Brent's algorithm, so it keeps the key of only one earlier
+    state, (see `state_key`,) and finds any cycle within a few times its
+    length after the simulation got into it. The simulation must not be
+    history-dependent.
+    '''
+
+    def __init__(self, initial_state):
+        '''
+        Constructor.
+
+        `initial_state` is the state from which the simulation is crunched.
+        '''
+
+        self.checkpoint_key = state_key(initial_state)
+        '''The key of the earlier state that we compare states to.'''
+
+        self.distance = 0
+        '''The number of states that were produced after the checkpoint.'''
+
+        self.max_distance = 1
+        '''The distance at which we move the checkpoint to the last state.'''
+
+
+    def check(self, state):
+        '''
+        Check the next state produced in the simulation.
+
+        If the state is the same as one that came before it, returns the
+        length of the cycle, i.e. the number of states from that state to this
+        one. Otherwise returns `None`.
+        '''
+        key = state_key(state)
+        self.distance += 1
+        if key == self.checkpoint_key:
+            return self.distance
+        if self.distance == self.max_distance:
+            self.checkpoint_key = key
+            self.distance = 0
+            self.max_distance *= 2
+        return None
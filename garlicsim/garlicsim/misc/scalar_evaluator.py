@@ -0,0 +1,271 @@
+# Copyright 2009-2011 Ram Rachum.
+# This program is distributed under the LGPL2.1 license.
+
+'''
+This module defines the `ScalarEvaluator` class.
+
+See its documentation for more information.
+'''
+
+from __future__ import with_statement
+
+import array
+import weakref
+import threading
+
+from garlicsim.general_misc import binary_search
+from garlicsim.general_misc.nifty_collections import OrderedDict
+
+import garlicsim
+
+
+class _BlockColumns(object):
+    '''The values of the scalar functions for the nodes of a block.'''
+
+    def __init__(self, first_node, n_columns):
+
+        self.first_node = first_node
+        '''
+        The first node of the block when the values were calculated.
+
+        If the block now starts with another node, (i.e. nodes were added
+        before it,) the values are calculated again.
+        '''
+
+        self.last_node = None
+        '''The node of the last values, or `None` if there are none yet.'''
+
+        self.columns = [array.array('d') for i in xrange(n_columns)]
+        '''
+        An array of values for each column, one value for each node.
+
+        The values are of the first nodes of the block; when the block grows,
+        values for the new nodes are appended.
+        '''
+
+
+class ScalarEvaluator(object):
+    '''
+    Evaluates scalar functions over the nodes of paths, into NumPy arrays.
+
+    Scalar state functions take a state and return a real number, and scalar
+    history functions take a node and return a real number. (See
+    `Settings.SCALAR_STATE_FUNCTIONS` and `Settings.SCALAR_HISTORY_FUNCTIONS`.)
+    A project has a scalar evaluator for the ones that its simpack declares, as
+    `Project.scalar_evaluator`.
+
+    The values for the nodes of each block are kept, and when the block grows
+    only the new nodes are evaluated. So evaluating over a path again, after
+    more of it was crunched, calls the functions only for the new nodes, and
+    the rest is copied from memory.
+
+    Functions that return `None` get NaN in the array. This requires NumPy.
+    '''
+
+    def __init__(self, state_functions=(), history_functions=()):
+
+        self.state_functions = list(state_functions)
+        '''The scalar state functions that we evaluate.'''
+
+        self.history_functions = list(history_functions)
+        '''The scalar history functions that we evaluate.'''
+
+        self.names = ['clock'] + \
+            [function.__name__ for function in self.state_functions] + \
+            [function.__name__ for function in self.history_functions]
+        '''
+        The names of the columns that we give.
+
+        The first is `'clock'`, for the clocks of the states, and after it
+        come the names of the functions.
+        '''
+
+        self.__block_columns = weakref.WeakKeyDictionary()
+        '''Dict mapping each block that we evaluated to its `_BlockColumns`.'''
+
+        self.__split_columns = weakref.WeakKeyDictionary()
+        '''
+        Columns of nodes that were split off a block, by their last node.
+
+        When a block is split, its first part keeps its columns, and the
+        values of the rest are kept here, until the second part is evaluated.
+        '''
+
+        self.__node_values = weakref.WeakKeyDictionary()
+        '''Dict mapping each blockless node that we evaluated to its values.'''
+
+        self.__lock = threading.Lock()
+        '''Lock for evaluating from several threads at once.'''
+
+
+    def __evaluate_node(self, node):
+        '''Get a tuple with the value of every column for `node`.'''
+        state = node.state
+        values = [state.clock]
+        values += [function(state) for function in self.state_functions]
+        values += [function(node) for function in self.history_functions]
+        return tuple(
+            (float('nan') if value is None else value) for value in values
+        )
+
+
+    def __get_block_columns(self, block):
+        '''Get the columns for all the nodes of `block`, evaluating new ones.'''
+        block_columns = self.__block_columns.get(block)
+        if block_columns is None or block_columns.first_node is not block[0]:
+            block_columns = self.__adopt_split_columns(block) or \
+                            _BlockColumns(block[0], len(self.names))
+            self.__block_columns[block] = block_columns
+        self.__trim_block_columns(block, block_columns)
+        columns = block_columns.columns
+        n_values = len(columns[0])
+        if n_values < len(block):
+            for node in block[n_values:]:
+                for (column, value) in zip(columns,
+                                           self.__evaluate_node(node)):
+                    column.append(value)
+            block_columns.last_node = block[-1]
+        return columns
+
+
+    def __trim_block_columns(self, block, block_columns):
+        '''
+        Drop values of nodes that are no longer in `block`.
+
+        This happens when the block was split; it keeps its first nodes, and
+        the values of the rest are kept for the block that was split off.
+        '''
+        columns = block_columns.columns
+        if len(columns[0]) > len(block):
+            self.__split_columns[block_columns.last_node] = \
+                [column[len(block):] for column in columns]
+            for column in columns:
+                del column[len(block):]
+            block_columns.last_node = block[-1]
+
+
+    def __adopt_split_columns(self, block):
+        '''
+        Get the columns that were split off another block for `block`.
+
+        Returns a `_BlockColumns`, or `None` if there aren't any for it.
+        '''
+        for (last_node, columns) in self.__split_columns.items():
+            if last_node.block is block and \
+               block.index(last_node) == len(columns[0]) - 1:
+                del self.__split_columns[last_node]
+                block_columns = _BlockColumns(block[0], 0)
+                block_columns.columns = columns
+                block_columns.last_node = last_node
+                return block_columns
+        return None
+
+
+    def __get_node_values(self, node):
+        '''Get the values of every column for a blockless node.'''
+        values = self.__node_values.get(node)
+        if values is None:
+            values = self.__node_values[node] = self.__evaluate_node(node)
+        return values
+
+
+    def evaluate(self, path, head=None, tail=None):
+        '''
+        Evaluate the scalar functions over the nodes of `path`.
+
+        You may specify `head` and/or `tail` nodes to evaluate only over the
+        nodes between them, including both.
+
+        Returns an ordered dict mapping each of the `.names` to a NumPy array
+        with a value for every node.
+        '''
+        import numpy
+
+        result = OrderedDict()
+        with path.tree.lock.read:
+            with self.__lock:
+                chunks = self.__get_chunks(path, head, tail) if \
+                         path.root is not None else []
+                # Copying while we hold the lock, because the arrays of the
+                # chunks may be changed when blocks are evaluated again:
+                for (i, name) in enumerate(self.names):
+                    result[name] = numpy.concatenate(
+                        [numpy.frombuffer(chunk[i], dtype=float) if
+                         isinstance(chunk[i], array.array) else
+                         numpy.array(chunk[i], dtype=float) for chunk in
+                         chunks] or [numpy.zeros(0)]
+                    )
+        return result
+
+
+    def __get_chunks(self, path, head, tail):
+        '''
+        Get the columns for the members of `path` between `head` and `tail`.
+
+        Returns a list with the columns of each member, in order.
+        '''
+        head_member = head.soft_get_block() if head is not None else None
+        tail_member = tail.soft_get_block() if tail is not None else None
+
+        chunks = []
+        started = head is None
+        for member in path.iterate_blockwise():
+            if member is head_member:
+                started = True
+            if not started:
+                block_columns = self.__block_columns.get(member)
+                if block_columns is not None and \
+                   block_columns.first_node is member[0]:
+                    self.__trim_block_columns(member, block_columns)
+            else:
+                if isinstance(member, garlicsim.data_structures.Block):
+                    columns = self.__get_block_columns(member)
+                    start = member.index(head) if member is head_member else 0
+                    stop = member.index(tail) + 1 if member is tail_member \
+                           else len(columns[0])
+                    if (start, stop) != (0, len(columns[0])):
+                        columns = [column[start:stop] for column in columns]
+                    chunks.append(columns)
+                else:
+                    values = self.__get_node_values(member)
+                    chunks.append([(value,) for value in values])
+            if member is tail_member:
+                break
+        return chunks
+
+
+    def evaluate_clock_window(self, path, start_clock=None, end_clock=None):
+        '''
+        Evaluate the scalar functions over the nodes of `path` in a time window.
+
+        The nodes are the ones whose clocks are between `start_clock` and
+        `end_clock`, including both. Either may be `None` for no limit.
+
+        Returns an ordered dict like `evaluate`.
+        '''
+        get_clock = lambda node: node.state.clock
+        head = tail = None
+        if path.root is not None:
+            if start_clock is not None:
+                head = path.get_node_by_monotonic_function(
+                    get_clock, start_clock, rounding=binary_search.HIGH
+                )
+            if end_clock is not None:
+                tail = path.get_node_by_monotonic_function(
+                    get_clock, end_clock, rounding=binary_search.LOW
+                )
+        if (start_clock is not None and head is None) or \
+           (end_clock is not None and tail is None) or \
+           (head is not None and tail is not None and
+            head.state.clock > tail.state.clock):
+            # The window doesn't have any nodes.
+            return self.evaluate(garlicsim.data_structures.Path(path.tree))
+        return self.evaluate(path, head, tail)
+
+
+    def clear(self):
+        '''Forget all the values that were evaluated.'''
+        with self.__lock:
+            self.__block_columns.clear()
+            self.__split_columns.clear()
+            self.__node_values.clear()
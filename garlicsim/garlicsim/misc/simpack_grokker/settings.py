@@ -37,7 +37,7 @@ class Settings(object):
         
         This is useful because it allows `garlicsim` to detect if a simulation
         has reached a repititive state, so it can stop the crunching right
-        there and avoid wasting resources.
+        there and avoid wasting resources. (See `CycleDetector`.)
 
         Note that this function does not return `True` or `False`: It returns a
         `DeterminismSetting` class. For details about those, see documentation
@@ -46,6 +46,18 @@ class Settings(object):
         The function will return `None` if it's unknown whether the step
         profile is deterministic.
         '''
+        
+        self.CLOCK_INDEPENDENT = False
+        '''
+        Flag saying that the step function doesn't depend on the clock.
+        
+        Set this to `True` if the states that the step function returns don't
+        depend on the `.clock` of the states it's given. Only then, for
+        deterministic step profiles, `garlicsim` tells states apart by their
+        keys, which ignore the clock, (see `state_key`,) to stop crunching when
+        the simulation reaches a state it had before, (see `CycleDetector`,)
+        and to take steps from a project's `.transition_cache`.
+        '''
 
         self.SCALAR_STATE_FUNCTIONS = []
         '''
@@ -54,6 +66,8 @@ class Settings(object):
         A scalar state function is a function from a state to a real number.
         It's recommended to decorate these with
         `garlicsim.general_misc.caching.cache`
+        
+        A project evaluates these over paths with its `.scalar_evaluator`.
         '''
         
         self.SCALAR_HISTORY_FUNCTIONS = []
@@ -62,5 +76,8 @@ class Settings(object):
         
         A scalar history function is a function from a history browser to a
         real number. These should be decorated by
-        `garlicsim.misc.cached.history_cache`.
+        `garlicsim.misc.caching.history_cache`.
+        
+        A project evaluates these over paths with its `.scalar_evaluator`,
+        giving them nodes.
         '''
\ No newline at end of file
@@ -42,6 +42,7 @@ class SimpackGrokker(object):
     
     def __init__(self, simpack):
         self.simpack = simpack
+        
         self.__init_analysis()
         self.__init_analysis_settings()
         self.__init_analysis_cruncher_types()
@@ -340,17 +341,27 @@ class SimpackGrokker(object):
         return step_iterator.next()
     
             
-    def get_step_iterator(self, state_or_history_browser, step_profile):
+    def get_step_iterator(self, state_or_history_browser, step_profile,
+                          transition_cache=None):
         '''
         Get a step iterator for crunching states of the simulation.
         
         The step profile will specify which parameters to pass to the simpack's
-        step function.
+        step function. If a `TransitionCache` is given, the step iterator takes
+        steps from it when it can. (See `is_transition_cache_used`.)
         '''
         
         step_function = step_profile.step_function
         step_type = StepType.get_step_type(step_function)
         
+        if self.is_transition_cache_used(step_profile, transition_cache):
+            return step_iterators_module.CachingStepIterator(
+                state_or_history_browser,
+                step_profile,
+                transition_cache,
+                step_type.step_iterator_class
+            )
+        
         return step_type.step_iterator_class(state_or_history_browser,
                                              step_profile)
         
@@ -396,6 +407,32 @@ class SimpackGrokker(object):
                               step_types.InplaceStepGenerator))
         
     
+    def can_detect_cycles(self, step_profile):
+        '''
+        Return whether to detect cycles when crunching with `step_profile`.
+        
+        This is done when the simulation is deterministic with this step
+        profile, according to the simpack's `DETERMINISM_FUNCTION` setting,
+        isn't history-dependent, and the simpack's `CLOCK_INDEPENDENT` setting
+        is on. (See `CycleDetector`.)
+        '''
+        return (not self.history_dependent) and \
+               self.settings.CLOCK_INDEPENDENT and \
+               self.settings.DETERMINISM_FUNCTION(step_profile) is \
+               garlicsim.misc.settings_constants.DETERMINISTIC
+        
+    
+    def is_transition_cache_used(self, step_profile, transition_cache):
+        '''
+        Return whether step iterators for `step_profile` would use the cache.
+        
+        That's when `transition_cache` isn't `None`, and cycles can be
+        detected with this step profile. (See `can_detect_cycles`.)
+        '''
+        return transition_cache is not None and \
+               self.can_detect_cycles(step_profile)
+        
+    
 
     def build_step_profile(self, *args, **kwargs):
         '''
@@ -52,10 +52,11 @@ class HistoryStepGenerator(BaseStep):
     This combines the advantages of a history step function and a step
     generator; it works as a generator which can be more convenient and it can
     look at the simulation history which is necessary for some simulations.
-    
-    (1.1.2011 - Not yet implemented, sorry.)
+    Since the generator keeps running between states, it can keep track of
+    things about the history, like running sums, instead of going over the
+    history on every step.
     '''
-    step_iterator_class = NotImplemented
+    step_iterator_class = step_iterators.HistoryStepGeneratorIterator
     name_identifier = 'history_step_generator'
     verbose_name = 'history step generator'
     
@@ -10,7 +10,7 @@ See their documentation for more information.
 import copy
 
 from garlicsim.general_misc.copy_mode import CopyMode
-from garlicsim.general_misc.persistent import DontCopyPersistent
+from garlicsim.general_misc.persistent import Persistent, DontCopyPersistent
 
 
 class StateCopy(DontCopyPersistent, CopyMode):
@@ -30,6 +30,38 @@ def state_deepcopy(state):
     
     One of the differences between this and plain `deepcopy` is that this
     function makes sure not to copy `Persistent` objects.
+    
+    If the state defines the `__state_copy__` hook, (see `State`,) it's used
+    instead of `deepcopy`, which is usually much faster.
+    '''
+    memo = StateCopy()
+    state_copy = getattr(state, '__state_copy__', None)
+    if state_copy is not None:
+        return state_copy(memo)
+    return copy.deepcopy(state, memo)
+
+
+_immutable_types = frozenset((bool, int, long, float, complex, str, unicode,
+                              type(None), type))
+'''Types whose instances can be shared between a state and its copy.'''
+
+
+def copy_attributes(thing, memo):
+    '''
+    Copy an object, sharing the values of its attributes that never change.
+    
+    Attributes that are numbers, strings, `None`, types or `Persistent`
+    objects are shared with the new copy, and the rest are deepcopied with
+    `memo`. This is a helper for implementing `State.__state_copy__`, for
+    objects whose attributes are mostly simple values.
     '''
-    return copy.deepcopy(state,
-                         StateCopy())
\ No newline at end of file
+    klass = thing.__class__
+    new_thing = klass.__new__(klass)
+    memo[id(thing)] = new_thing
+    new_dict = new_thing.__dict__
+    for (name, value) in vars(thing).iteritems():
+        if type(value) in _immutable_types or isinstance(value, Persistent):
+            new_dict[name] = value
+        else:
+            new_dict[name] = copy.deepcopy(value, memo)
+    return new_thing
@@ -0,0 +1,33 @@
+# Copyright 2009-2011 Ram Rachum.
+# This program is distributed under the LGPL2.1 license.
+
+'''
+This module defines the `state_key` function.
+
+See its documentation for more information.
+'''
+
+import cPickle
+
+
+def state_key(state):
+    '''
+    Get a key that tells whether two states are the same world state.
+
+    Two states get equal keys only if they're the same world state, apart from
+    their clocks. (States that are the same may still get different keys, but
+    that's rare.) Keys are hashable, and are used for detecting that a
+    deterministic simulation reached a state it had before. (See
+    `CycleDetector`.)
+
+    If the state defines the `__state_key__` hook, (see `State`,) it's used.
+    Otherwise the key is the pickled attributes of the state, except `.clock`.
+    '''
+    state_key_hook = getattr(state, '__state_key__', None)
+    if state_key_hook is not None:
+        return state_key_hook()
+    items = sorted(
+        (name, value) for (name, value) in vars(state).iteritems() if
+        name != 'clock'
+    )
+    return (type(state), cPickle.dumps(items, 2))
@@ -10,8 +10,10 @@ See documentation of `garlicsim.misc.BaseStepIterator` for more details.
 from .step_iterator import StepIterator
 from .step_generator_iterator import StepGeneratorIterator
 from .history_step_iterator import HistoryStepIterator
+from .history_step_generator_iterator import HistoryStepGeneratorIterator
 from .duplicating_step_iterator import DuplicatingStepIterator
 from .duplicating_step_generator_iterator import \
     DuplicatingStepGeneratorIterator
 from .inplace_step_iterator import InplaceStepIterator
-from .inplace_step_generator_iterator import InplaceStepGeneratorIterator
\ No newline at end of file
+from .inplace_step_generator_iterator import InplaceStepGeneratorIterator
+from .caching_step_iterator import CachingStepIterator
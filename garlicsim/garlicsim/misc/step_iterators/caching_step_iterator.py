@@ -0,0 +1,80 @@
+# Copyright 2009-2011 Ram Rachum.
+# This program is distributed under the LGPL2.1 license.
+
+'''
+This module defines the `CachingStepIterator` class.
+
+See its documentation for more information.
+'''
+
+from garlicsim.misc import BaseStepIterator
+from garlicsim.misc.state_key import state_key
+
+
+class CachingStepIterator(BaseStepIterator):
+    '''
+    A step iterator that takes states from a `TransitionCache` when it can.
+    
+    Before every step, it looks for the current state in the cache. If it's
+    there, the next state is taken from the cache; if not, it's crunched with
+    a step iterator of `step_iterator_class`, and put in the cache.
+    
+    The step iterator under the hood is built from the current state whenever
+    we need it after taking states from the cache, so this may be used only
+    with deterministic step profiles.
+    '''
+    
+    def __init__(self, state, step_profile, transition_cache,
+                 step_iterator_class):
+        
+        self.current_state = state
+        '''
+        The current state that will be crunched from on the next iteration.
+        '''
+        
+        self.step_profile = step_profile
+        '''
+        The step profile which contains the arguments given to step function.
+        '''
+        
+        self.transition_cache = transition_cache
+        '''The cache in which we look for steps, and put the steps we take.'''
+        
+        self.step_iterator_class = step_iterator_class
+        '''The class of step iterator that we use to crunch new steps.'''
+        
+        self.step_iterator = None
+        '''
+        The step iterator that crunches from the current state, or `None`.
+        
+        It's `None` when the current state was taken from the cache.
+        '''
+        
+        
+    def next(self):
+        '''Crunch the next state, or take it from the cache.'''
+        current_state = self.current_state
+        if getattr(current_state, 'clock', None) is None:
+            # We can't give states from the cache the right clocks.
+            key = None
+            next_state = None
+        else:
+            key = state_key(current_state)
+            next_state = self.transition_cache.get(key, self.step_profile,
+                                                   current_state)
+            
+        if next_state is None:
+            if self.step_iterator is None:
+                self.step_iterator = self.step_iterator_class(
+                    current_state,
+                    self.step_profile
+                )
+            next_state = self.step_iterator.next()
+            if key is not None:
+                self.transition_cache.add(key, self.step_profile,
+                                          current_state, next_state)
+        else:
+            self.step_iterator = None
+            
+        self.current_state = next_state
+        return next_state
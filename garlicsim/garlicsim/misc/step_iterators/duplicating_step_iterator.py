@@ -19,7 +19,9 @@ class DuplicatingStepIterator(BaseStepIterator):
     
     Despite the fact that this iterator uses an *inplace* step function under
     the hood, it produces a new distinct state on every iteration. It does that
-    by deepcopying the state on every iteration.
+    by deepcopying the state on every iteration, with `state_deepcopy`. (States
+    that inherit from `CopyOnWrite` are copied lazily instead, so only the
+    objects that the step changes get copied.)
     
     The step iterator automatically increments the state's `.clock` by 1 if the
     original step function doesn't change the `.clock` itself.
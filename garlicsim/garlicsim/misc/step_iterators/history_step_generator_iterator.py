@@ -0,0 +1,85 @@
+# Copyright 2009-2011 Ram Rachum.
+# This program is distributed under the LGPL2.1 license.
+
+'''
+This module defines the `HistoryStepGeneratorIterator` class.
+
+See its documentation for more information.
+'''
+
+import garlicsim
+from garlicsim.misc import BaseStepIterator, SimpackError, AutoClockGenerator
+
+
+class HistoryStepGeneratorIterator(BaseStepIterator):
+    '''
+    An iterator that uses a simpack's history step generator to produce states.
+    
+    The history step generator is started once with the history browser, and
+    then it keeps yielding states. Since it keeps running between states, it
+    can keep what it learned about the history, (for example a running sum
+    over the last few states,) instead of going over the history again on
+    every step like a history step function has to. Every state it yields is
+    added to the history before the generator is resumed, so when it resumes,
+    the history browser's last state is the state it yielded last.
+    
+    The step iterator automatically adds `.clock` readings if the states
+    produced by the step generator are missing them.
+    
+    If the simpack's history step generator will terminate, this iterator will
+    make a fresh one without alerting the user.
+    '''
+    
+    def __init__(self, history_browser, step_profile):
+        
+        assert isinstance(history_browser, garlicsim.misc.BaseHistoryBrowser)
+        self.history_browser = history_browser
+        '''The history browser that the history step generator will use.'''
+        
+        self.history_step_generator = step_profile.step_function
+        '''The history step generator that will `yield` states for us.'''
+        
+        self.step_profile = step_profile
+        '''
+        The step profile which contains the arguments given to step function.
+        '''
+           
+        self.auto_clock_generator = AutoClockGenerator()
+        '''Auto-clock generator which ensures all states have `.clock`.'''
+        
+        self.auto_clock_generator.make_clock(
+            self.history_browser.get_last_state()
+        )
+        
+        self.__build_raw_generator()
+        
+            
+    def __build_raw_generator(self):
+        '''Build a raw generator which will provide the states for us.'''
+        self.raw_generator = self.history_step_generator(
+            self.history_browser,
+            *self.step_profile.args,
+            **self.step_profile.kwargs
+        )
+        
+    
+    def next(self):
+        '''Crunch the next state.'''
+        try:        
+            try:
+                state = self.raw_generator.next()
+            except StopIteration:
+                self.__build_raw_generator()
+                state = self.raw_generator.next()
+        except StopIteration:
+                raise SimpackError('The history step generator %s raised '
+                                   '`StopIteration` without yielding even one '
+                                   'state.' % self.history_step_generator)
+                
+        self._auto_clock(state)
+        return state
+    
+        
+    def _auto_clock(self, state):
+        '''If the state has no clock reading, give it one automatically.'''
+        state.clock = self.auto_clock_generator.make_clock(state)
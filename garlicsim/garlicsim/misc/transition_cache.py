@@ -0,0 +1,130 @@
+# Copyright 2009-2011 Ram Rachum.
+# This program is distributed under the LGPL2.1 license.
+
+'''
+This module defines the `TransitionCache` class.
+
+See its documentation for more information.
+'''
+
+from __future__ import with_statement
+
+import threading
+
+from garlicsim.general_misc.nifty_collections import OrderedDict
+
+from .state_deepcopy import state_deepcopy
+
+
+class TransitionCache(object):
+    '''
+    A cache of the steps of a deterministic simulation.
+
+    It remembers which state the step function returned for a state with a
+    given step profile, so when a step is taken from the same state again,
+    (e.g. when the same state is crunched on two forks, or an edit was made and
+    reverted,) the next state is taken from the cache instead of calling the
+    step function. States are told apart by their keys. (See `state_key`.)
+
+    It's opt-in: Set it as the `.transition_cache` of a project, and then the
+    step iterators of the project and its crunchers use it for deterministic
+    step profiles. You can also give it to `simulate` as its
+    `transition_cache` argument. (See `SimpackGrokker.get_step_iterator`,
+    which takes the cache as an argument.) A `ProcessCruncher` uses a copy of
+    the cache that's given to its process when it starts, and its own steps
+    don't get into the project's cache.
+
+    The cache keeps up to `max_size` steps. When it's full, the step that was
+    used least recently is dropped. It's thread-safe.
+    '''
+
+    def __init__(self, max_size=1000):
+
+        self.max_size = max_size
+        '''The maximal number of steps that the cache keeps.'''
+
+        self.n_hits = 0
+        '''The number of steps that were found in the cache.'''
+
+        self.n_misses = 0
+        '''The number of steps that weren't in the cache.'''
+
+        self.__transitions = OrderedDict()
+        '''
+        Dict from `(state_key, step_profile)` to `(next_state, clock_delta)`.
+
+        The steps are in order of use, the least recently used first.
+        '''
+
+        self.__lock = threading.Lock()
+        '''Lock for changing the cache from several crunchers at once.'''
+
+
+    def get(self, key, step_profile, state):
+        '''
+        Get the state that comes after `state`, whose key is `key`.
+
+        The state we give is a copy of the cached one, with a clock that's as
+        much after `state`'s clock as it was in the step that we remember.
+        Returns `None` if the step is not in the cache.
+        '''
+        transition_key = (key, step_profile)
+        with self.__lock:
+            try:
+                transition = self.__transitions[transition_key]
+            except KeyError:
+                self.n_misses += 1
+                return None
+            self.__transitions.move_to_end(transition_key)
+            self.n_hits += 1
+        (next_state, clock_delta) = transition
+        next_state = state_deepcopy(next_state)
+        next_state.clock = state.clock + clock_delta
+        return next_state
+
+
+    def add(self, key, step_profile, state, next_state):
+        '''Remember that `next_state` came after `state`, whose key is `key`.'''
+        # Keeping a copy, in case someone changes the state we were given:
+        transition = (state_deepcopy(next_state),
+                      next_state.clock - state.clock)
+        with self.__lock:
+            self.__transitions[(key, step_profile)] = transition
+            while len(self.__transitions) > self.max_size:
+                del self.__transitions[iter(self.__transitions).next()]
+
+
+    def clear(self):
+        '''Forget all the steps in the cache.'''
+        with self.__lock:
+            self.__transitions.clear()
+
+
+    def __getstate__(self):
+        '''Get the state of the cache for pickling, without its lock.'''
+        state = self.__dict__.copy()
+        del state['_TransitionCache__lock']
+        return state
+    
+    
+    def __setstate__(self, state):
+        '''Set the state of the cache after unpickling, with a new lock.'''
+        self.__dict__.update(state)
+        self.__lock = threading.Lock()
+    
+    
+    def __len__(self):
+        '''Get the number of steps in the cache.'''
+        return len(self.__transitions)
+
+
+    def __repr__(self):
+        '''
+        Get a string representation of the transition cache.
+
+        Example output:
+        <TransitionCache with 73 steps of 1000, 12 hits, 73 misses>
+        '''
+        return '<%s with %s steps of %s, %s hits, %s misses>' % \
+               (type(self).__name__, len(self), self.max_size, self.n_hits,
+                self.n_misses)
@@ -30,7 +30,7 @@ import garlicsim
 #
 # This is useful because it allows garlicsim to detect if a simulation has
 # reached a repititive state, so it can stop the crunching right there and
-# avoid wasting resources. (01.01.2011 - Still not implemented, sorry.)
+# avoid wasting resources. (See `State.__state_key__` for making this faster.)
 #
 # Note that this function does not return `True` or `False`: It returns a
 # `DeterminismSetting` class. For details about those, see documentation in
@@ -102,15 +102,16 @@ def _non_history_list_simulate(simpack_grokker, state, iterations,
     iterator = simpack_grokker.get_step_iterator(state, step_profile)
     finite_iterator = cute_iter_tools.shorten(iterator, iterations)
     
-    current_node = root
-    current_state = current_node.state
+    states = []
     
     world_ended = False
     try:
         for current_state in finite_iterator:
-            current_node = tree.add_state(current_state, parent=current_node)
+            states.append(current_state)
     except garlicsim.misc.WorldEnded:
         world_ended = True
+        
+    tree.add_states(states, parent=root, step_profile=step_profile)
 
     # Not doing anything with `world_ended` yet
     
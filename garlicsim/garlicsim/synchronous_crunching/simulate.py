@@ -28,8 +28,14 @@ def simulate(state, iterations=1, *args, **kwargs):
     function either as the first positional argument or the `step_function`
     keyword argument.) You may also pass in an existing step profile.
     
+    You may pass a `TransitionCache` as the `transition_cache` keyword
+    argument, to take deterministic steps from it when they were taken before
+    and to remember the new ones in it.
+    
     Returns the final state of the simulation.
     '''
+    transition_cache = kwargs.pop('transition_cache', None)
+    
     simpack_grokker = garlicsim.misc.SimpackGrokker.create_from_state(state)
     
     parse_arguments_to_step_profile = garlicsim.misc.StepProfile.build_parser(
@@ -45,13 +51,14 @@ def simulate(state, iterations=1, *args, **kwargs):
     
     if simpack_grokker.history_dependent:
         return __history_simulate(simpack_grokker, state, iterations,
-                                  step_profile)
+                                  step_profile, transition_cache)
     else: # It's a non-history-dependent simpack
         return __non_history_simulate(simpack_grokker, state, iterations,
-                                      step_profile)
+                                      step_profile, transition_cache)
 
     
-def __history_simulate(simpack_grokker, state, iterations, step_profile):
+def __history_simulate(simpack_grokker, state, iterations, step_profile,
+                       transition_cache=None):
     '''    
     Simulate from the given state for the given number of iterations.
     
@@ -65,7 +72,11 @@ def __history_simulate(simpack_grokker, state, iterations, step_profile):
     path = root.make_containing_path()
     history_browser = history_browser_module.HistoryBrowser(path)
     
-    iterator = simpack_grokker.get_step_iterator(history_browser, step_profile)
+    iterator = simpack_grokker.get_step_iterator(
+        history_browser,
+        step_profile,
+        transition_cache=transition_cache
+    )
     finite_iterator = cute_iter_tools.shorten(iterator, iterations)
     
     current_node = root
@@ -83,7 +94,8 @@ def __history_simulate(simpack_grokker, state, iterations, step_profile):
     return final_state
 
 
-def __non_history_simulate(simpack_grokker, state, iterations, step_profile):
+def __non_history_simulate(simpack_grokker, state, iterations, step_profile,
+                           transition_cache=None):
     '''
     Simulate from the given state for the given number of iterations.
     
@@ -97,14 +109,21 @@ def __non_history_simulate(simpack_grokker, state, iterations, step_profile):
     # `__non_history_simulate` is because this function gives the user only the
     # final state, without keeping any states in between. Therefore we can
     # afford doing the steps inplace, and we get better performance because we
-    # don't deepcopy states.
-    if simpack_grokker.is_inplace_iterator_available(step_profile) is True:
+    # don't deepcopy states. (Unless we're using a transition cache, which
+    # needs the states in between.)
+    if simpack_grokker.is_inplace_iterator_available(step_profile) is True \
+       and not simpack_grokker.is_transition_cache_used(step_profile,
+                                                        transition_cache):
         state_copy = garlicsim.misc.state_deepcopy.state_deepcopy(state)
         iterator = \
             simpack_grokker.get_inplace_step_iterator(state_copy, step_profile)
         
     else: # Inplace iterator is not available
-        iterator = simpack_grokker.get_step_iterator(state, step_profile)
+        iterator = simpack_grokker.get_step_iterator(
+            state,
+            step_profile,
+            transition_cache=transition_cache
+        )
     
     finite_iterator = cute_iter_tools.shorten(iterator, iterations)
     current_state = state
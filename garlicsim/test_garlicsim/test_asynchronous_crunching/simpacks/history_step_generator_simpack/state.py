@@ -0,0 +1,33 @@
+import garlicsim.data_structures
+
+
+class State(garlicsim.data_structures.State):
+    
+    def __init__(self, n_states):
+        self.n_states = n_states
+    
+    @staticmethod
+    def history_step_generator(history_browser):
+        assert isinstance(
+            history_browser,
+            garlicsim.misc.base_history_browser.BaseHistoryBrowser
+        )
+        # Counting the states as we go, instead of looking at the history on
+        # every step:
+        n_states = len(history_browser)
+        last_state = history_browser.get_last_state()
+        assert last_state.n_states == n_states
+        while True:
+            new_state = State(n_states + 1)
+            yield new_state
+            # The state we yielded should have been added to the history:
+            assert history_browser.get_last_state() is new_state
+            assert history_browser[-2] is last_state
+            assert len(history_browser) == new_state.n_states
+            middle = new_state.n_states // 2
+            assert history_browser[middle].n_states == middle + 1
+            (last_state, n_states) = (new_state, n_states + 1)
+        
+    @staticmethod
+    def create_root():
+        return State(1)
@@ -0,0 +1 @@
+from .state import State
\ No newline at end of file
@@ -0,0 +1,9 @@
+import garlicsim
+
+
+def determinism_function(step_profile):
+    '''Say that every step profile is deterministic.'''
+    return garlicsim.misc.settings_constants.DETERMINISTIC
+
+
+DETERMINISM_FUNCTION = determinism_function
@@ -0,0 +1,19 @@
+import garlicsim.data_structures
+
+
+class State(garlicsim.data_structures.State):
+    
+    def __init__(self, switched_on=False):
+        self.switched_on = switched_on
+    
+    def step(self):
+        '''Switch on at clock 10, so the first states are all the same.'''
+        new_state = State(switched_on=(self.clock >= 10))
+        new_state.clock = self.clock + 1
+        return new_state
+        
+    @staticmethod
+    def create_root():
+        state = State()
+        state.clock = 0
+        return state
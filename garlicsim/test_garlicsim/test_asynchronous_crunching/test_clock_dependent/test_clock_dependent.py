@@ -0,0 +1,37 @@
+# Copyright 2009-2011 Ram Rachum.
+# This program is distributed under the LGPL2.1 license.
+
+'''Testing module for deterministic simpacks whose steps read the clock.'''
+
+import time
+
+import garlicsim
+from garlicsim_lib.simpacks import life
+
+from . import clock_dependent_simpack
+
+
+def test():
+    '''Test that states which differ only by clock aren't taken as a cycle.'''
+    simpack_grokker = garlicsim.misc.SimpackGrokker(clock_dependent_simpack)
+    step_profile = garlicsim.misc.StepProfile(
+        simpack_grokker.default_step_function
+    )
+    assert not simpack_grokker.can_detect_cycles(step_profile)
+    assert garlicsim.misc.SimpackGrokker(life).can_detect_cycles(
+        garlicsim.misc.StepProfile(life.State.step)
+    )
+    
+    project = garlicsim.Project(clock_dependent_simpack)
+    project.transition_cache = garlicsim.misc.TransitionCache()
+    root = project.root_this_state(clock_dependent_simpack.State.create_root())
+    project.begin_crunching(root, 20)
+    while project.crunching_manager.jobs:
+        time.sleep(0.05)
+        project.sync_crunchers()
+        
+    (leaf,) = root.get_all_leaves()
+    assert leaf.state.clock >= 20
+    assert not leaf.ends
+    assert leaf.state.switched_on
+    assert len(project.transition_cache) == 0
@@ -0,0 +1,89 @@
+# Copyright 2009-2011 Ram Rachum.
+# This program is distributed under the LGPL2.1 license.
+
+'''Testing module for `ProcessPoolCruncher`.'''
+
+import gc
+import time
+import weakref
+
+import garlicsim
+from garlicsim.asynchronous_crunching.crunchers import ProcessPoolCruncher
+from garlicsim_lib.simpacks import life
+
+
+def _crunch_all_jobs(project):
+    '''Sync the crunchers until all the jobs are done.'''
+    while project.crunching_manager.jobs:
+        time.sleep(0.05)
+        project.sync_crunchers()
+
+
+def test_reusing_processes():
+    '''Test that jobs with different step profiles reuse the same processes.'''
+    garlicsim.asynchronous_crunching.PROCESS_POOL_SIZE = 2
+    try:
+        project = garlicsim.Project(life)
+        project.crunching_manager.cruncher_type = ProcessPoolCruncher
+        root = project.root_this_state(life.State.create_messy_root(4, 4))
+
+        project.begin_crunching(root, 5)
+        _crunch_all_jobs(project)
+
+        (cruncher,) = project.crunching_manager.step_profiles.keys()
+        worker_pool = cruncher.worker_pool
+        assert worker_pool.size == 2
+        workers = worker_pool.free_workers + worker_pool.released_workers
+        assert len(workers) == 2
+        processes = set(worker.process for worker in workers)
+
+        project.begin_crunching(root, 5, randomness=0.5)
+        project.begin_crunching(root, 5)
+        _crunch_all_jobs(project)
+
+        assert len(root.children) == 3
+        for kid in root.children:
+            path = kid.make_containing_path()
+            # A small board may get into a cycle before the clock target, and
+            # then crunching stops there:
+            assert path[-1].state.clock >= 5 or \
+                   [end for end in path[-1].ends if
+                    isinstance(end, garlicsim.data_structures.Cycle)]
+
+        workers = worker_pool.free_workers + worker_pool.released_workers
+        assert set(worker.process for worker in workers) == processes
+        assert len(worker_pool.job_start_latencies) == 3
+
+    finally:
+        garlicsim.asynchronous_crunching.PROCESS_POOL_SIZE = None
+
+
+def test_releasing_pool():
+    '''Test that the pool shuts down when its project is deleted.'''
+    garlicsim.asynchronous_crunching.PROCESS_POOL_SIZE = 2
+    try:
+        project = garlicsim.Project(life)
+        project.crunching_manager.cruncher_type = ProcessPoolCruncher
+        project.transition_cache = garlicsim.misc.TransitionCache()
+        root = project.root_this_state(life.State.create_messy_root(4, 4))
+        project.begin_crunching(root, 5)
+        _crunch_all_jobs(project)
+        
+        (cruncher,) = project.crunching_manager.step_profiles.keys()
+        worker_pool_ref = weakref.ref(cruncher.worker_pool)
+        processes = [worker.process for worker in
+                     cruncher.worker_pool.free_workers +
+                     cruncher.worker_pool.released_workers]
+        assert processes
+        assert all(process.is_alive() for process in processes)
+        
+        del project, root, cruncher
+        gc.collect()
+        
+        assert worker_pool_ref() is None
+        for process in processes:
+            process.join(10)
+            assert not process.is_alive()
+        
+    finally:
+        garlicsim.asynchronous_crunching.PROCESS_POOL_SIZE = None
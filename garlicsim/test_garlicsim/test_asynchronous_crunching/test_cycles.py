@@ -0,0 +1,71 @@
+# Copyright 2009-2011 Ram Rachum.
+# This program is distributed under the LGPL2.1 license.
+
+'''Testing module for stopping the crunching of simulations that cycle.'''
+
+import time
+
+import garlicsim
+from garlicsim.data_structures import Cycle
+from garlicsim_lib.simpacks import life
+
+
+def _crunch_all_jobs(project):
+    '''Sync the crunchers until all the jobs are done.'''
+    while project.crunching_manager.jobs:
+        time.sleep(0.05)
+        project.sync_crunchers()
+
+
+def _create_blinker_state():
+    '''Create a Life state with a blinker, which repeats every 2 steps.'''
+    state = life.State.create_root(10, 10)
+    for x in (4, 5, 6):
+        state.board.set(x, 4, True)
+    return state
+
+
+def test():
+    '''Test crunching a blinker with all the cruncher types.'''
+    cruncher_types = \
+        garlicsim.misc.SimpackGrokker(life).available_cruncher_types
+    for cruncher_type in cruncher_types:
+        yield check, cruncher_type
+
+
+def check(cruncher_type):
+    '''Check that the cruncher stops at the cycle, and the cycle is used.'''
+    project = garlicsim.Project(life)
+    project.crunching_manager.cruncher_type = cruncher_type
+    root = project.root_this_state(_create_blinker_state())
+
+    project.begin_crunching(root, 1000)
+    _crunch_all_jobs(project)
+
+    path = root.make_containing_path()
+    leaf = path[-1]
+    (cycle,) = leaf.ends
+    assert isinstance(cycle, Cycle)
+    assert cycle.period == 2
+    assert cycle.clock_period == 2
+    assert cycle.get_first_node().state == leaf.state
+    assert leaf.state.clock < 10
+
+    for clock in (leaf.state.clock + 1, 51, 100):
+        node = path.get_node_by_clock(clock)
+        assert node.state.clock <= leaf.state.clock
+        assert (clock - node.state.clock) % 2 == 0
+        assert node.state == garlicsim.simulate(root.state, clock)
+
+    # There's nothing more to crunch:
+    project.ensure_buffer(root, 2000)
+    assert not project.crunching_manager.jobs
+
+    # A random step profile isn't deterministic, so it's crunched all the way:
+    project.begin_crunching(root, 10, randomness=0.1)
+    _crunch_all_jobs(project)
+    (random_kid,) = [kid for kid in root.children if
+                     kid.step_profile['randomness']]
+    random_leaf = random_kid.make_containing_path()[-1]
+    assert random_leaf.state.clock >= 10
+    assert not random_leaf.ends
@@ -0,0 +1,69 @@
+import time
+import traceback
+
+import garlicsim.data_structures
+from garlicsim.general_misc import binary_search
+
+
+observations = []
+'''
+What the history browser looked like on each step.
+
+Items are tuples of `(n_nodes, n_states)`, where `n_nodes` is the number of
+states the history browser had in nodes of the tree, and `n_states` is the
+length of the timeline.
+'''
+
+errors = []
+'''Tracebacks of checks that failed in the cruncher's thread.'''
+
+
+def check_history_browser(history_browser):
+    '''Check the history browser around the border of nodes and states.'''
+    n_states = len(history_browser)
+    n_nodes = len(history_browser._HistoryBrowser__get_nodes())
+    observations.append((n_nodes, n_states))
+    get_number = lambda state: state.number
+    for index in set((0, n_nodes - 2, n_nodes - 1, n_nodes, n_nodes + 1,
+                      n_states - 1)):
+        if not 0 <= index < n_states:
+            continue
+        assert history_browser[index].number == index
+        assert history_browser[index - n_states].number == index
+        assert history_browser.get_state_by_monotonic_function(
+            get_number, index
+        ).number == index
+        assert history_browser.get_state_by_monotonic_function(
+            get_number, index + 0.5, rounding=binary_search.LOW
+        ).number == index
+        assert history_browser.get_state_by_monotonic_function(
+            get_number, index - 0.5, rounding=binary_search.HIGH
+        ).number == index
+    assert history_browser.get_last_state().number == n_states - 1
+    
+
+class State(garlicsim.data_structures.State):
+    
+    def __init__(self, number):
+        self.number = number
+    
+    @staticmethod
+    def history_step(history_browser):
+        try:
+            check_history_browser(history_browser)
+        except Exception:
+            errors.append(traceback.format_exc())
+            raise
+        # Giving the main thread time to add our states to the tree, so we'll
+        # see nodes added while we crunch:
+        time.sleep(0.002)
+        last_state = history_browser.get_last_state()
+        new_state = State(last_state.number + 1)
+        new_state.clock = last_state.clock + 1
+        return new_state
+        
+    @staticmethod
+    def create_root():
+        state = State(0)
+        state.clock = 0
+        return state
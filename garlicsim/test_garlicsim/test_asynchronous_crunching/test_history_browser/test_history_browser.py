@@ -0,0 +1,50 @@
+# Copyright 2009-2011 Ram Rachum.
+# This program is distributed under the LGPL2.1 license.
+
+'''Testing module for the asynchronous `HistoryBrowser`.'''
+
+import time
+
+import garlicsim
+
+from . import history_browser_simpack
+
+
+TIMEOUT = 30
+'''How many seconds we let the crunching take before we fail.'''
+
+
+def test():
+    '''Test the history browser on the border of the tree and the states.'''
+    simpack_state_module = history_browser_simpack.state
+    simpack_state_module.observations[:] = []
+    simpack_state_module.errors[:] = []
+    
+    project = garlicsim.Project(history_browser_simpack)
+    root = project.root_this_state(history_browser_simpack.State.create_root())
+    n_steps = 300
+    project.begin_crunching(root, n_steps)
+    
+    start_time = time.time()
+    while project.crunching_manager.jobs:
+        assert not simpack_state_module.errors, \
+               simpack_state_module.errors[0]
+        assert time.time() - start_time < TIMEOUT, \
+               "Crunching didn't finish in %s seconds." % TIMEOUT
+        time.sleep(0.01)
+        project.sync_crunchers()
+    assert not simpack_state_module.errors, simpack_state_module.errors[0]
+    
+    (leaf,) = root.get_all_leaves()
+    path = leaf.make_containing_path()
+    assert [node.state.number for node in path] == range(n_steps + 1)
+    
+    observations = simpack_state_module.observations
+    assert len(observations) >= n_steps
+    # The crunching manager added nodes while the cruncher was crunching, and
+    # the cruncher then had states that weren't in the tree yet:
+    assert any((1 < n_nodes < n_states) for (n_nodes, n_states) in
+               observations)
+    # The nodes only grow:
+    assert [n_nodes for (n_nodes, n_states) in observations] == \
+           sorted(n_nodes for (n_nodes, n_states) in observations)
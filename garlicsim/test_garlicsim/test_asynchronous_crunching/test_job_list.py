@@ -0,0 +1,90 @@
+# Copyright 2009-2011 Ram Rachum.
+# This program is distributed under the LGPL2.1 license.
+
+'''Testing module for `JobList` and the crunching manager's reverse indexes.'''
+
+import time
+
+import garlicsim
+from garlicsim.asynchronous_crunching import Job, JobList, CrunchingProfile
+from garlicsim.asynchronous_crunching.crunchers import ThreadCruncher
+from garlicsim_lib.simpacks import life
+
+
+def _check_index(job_list):
+    '''Check that `job_list.jobs_by_node` agrees with the list itself.'''
+    jobs_by_node = {}
+    for job in job_list:
+        jobs_by_node.setdefault(job.node, set()).add(job)
+    assert dict((node, set(jobs)) for (node, jobs) in
+                job_list.jobs_by_node.items()) == jobs_by_node
+
+
+def test_job_list():
+    '''Test that `JobList` keeps its index through all kinds of changes.'''
+    project = garlicsim.Project(life)
+    root = project.root_this_state(life.State.create_messy_root(4, 4))
+    (node_1, node_2) = [project.tree.add_state(root.state.step(),
+                                               parent=root)
+                        for i in range(2)]
+    step_profile = project.build_step_profile()
+    jobs = [Job(node, CrunchingProfile(10, step_profile)) for node in
+            (root, node_1, node_1, node_2, root)]
+
+    job_list = JobList(jobs[:2])
+    _check_index(job_list)
+    job_list.append(jobs[2])
+    job_list.extend(jobs[3:4])
+    job_list += jobs[4:]
+    _check_index(job_list)
+    assert job_list.get_jobs_by_node(node_1) == jobs[1:3]
+    assert job_list.get_jobs_by_node(root) == [jobs[0], jobs[4]]
+    assert all(job in job_list for job in jobs)
+
+    job_list.move_job(jobs[1], node_2)
+    assert job_list.get_jobs_by_node(node_2) == [jobs[3], jobs[1]]
+    _check_index(job_list)
+
+    job_list.remove(jobs[3])
+    assert jobs[3] not in job_list
+    assert job_list.pop() is jobs[4]
+    del job_list[0]
+    _check_index(job_list)
+    assert job_list.get_jobs_by_node(root) == []
+
+    job_list[0] = jobs[0]
+    job_list[1:] = jobs[3:]
+    job_list.insert(0, jobs[2])
+    _check_index(job_list)
+    assert list(job_list) == [jobs[2], jobs[0], jobs[3], jobs[4]]
+
+    del job_list[:]
+    assert not job_list.jobs_by_node
+    assert all(job not in job_list for job in jobs)
+
+
+def test_crunching_manager():
+    '''Test the crunching manager's reverse indexes while crunching forks.'''
+    project = garlicsim.Project(life)
+    project.crunching_manager.cruncher_type = ThreadCruncher
+    crunching_manager = project.crunching_manager
+    root = project.root_this_state(life.State.create_messy_root(4, 4))
+
+    jobs = [project.begin_crunching(root, 20) for i in range(3)]
+    assert crunching_manager.get_jobs_by_node(root) == jobs
+
+    while crunching_manager.jobs:
+        project.sync_crunchers()
+        _check_index(crunching_manager.jobs)
+        for job in crunching_manager.jobs:
+            assert crunching_manager.get_jobs_by_node(job.node).count(job) == 1
+        jobs_by_cruncher = dict(
+            (cruncher, job) for (job, cruncher) in
+            crunching_manager.crunchers.items()
+        )
+        assert crunching_manager.jobs_by_cruncher == jobs_by_cruncher
+        time.sleep(0.05)
+
+    assert not crunching_manager.crunchers
+    assert not crunching_manager.jobs_by_cruncher
+    assert len(root.children) == 3
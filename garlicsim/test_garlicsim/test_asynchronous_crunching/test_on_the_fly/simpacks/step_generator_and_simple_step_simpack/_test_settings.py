@@ -16,7 +16,8 @@ VALID = True
 CRUNCHERS_LIST = \
     [garlicsim.asynchronous_crunching.crunchers.ThreadCruncher] + \
     (
-        [garlicsim.asynchronous_crunching.crunchers.ProcessCruncher] if 
+        [garlicsim.asynchronous_crunching.crunchers.ProcessCruncher,
+         garlicsim.asynchronous_crunching.crunchers.ProcessPoolCruncher] if 
         import_tools.exists('multiprocessing')
         else []
     )
\ No newline at end of file
@@ -0,0 +1,77 @@
+# Copyright 2009-2011 Ram Rachum.
+# This program is distributed under the LGPL2.1 license.
+
+'''Testing module for `SharedMemoryRing`.'''
+
+import multiprocessing
+
+import garlicsim
+from garlicsim.asynchronous_crunching.misc import SharedMemoryRing, \
+                                                  StatePayload
+
+
+class StringState(garlicsim.data_structures.State):
+    '''A state whose data is a string, which it sends through shared memory.'''
+
+    def __init__(self, data, tag=None):
+        self.data = data
+        self.tag = tag
+
+    def dump_payload(self):
+        '''Get the data as the payload, and the tag as the rest.'''
+        return (self.data, self.tag)
+
+    @classmethod
+    def load_payload(cls, payload, tag):
+        '''Create a state from the output of `dump_payload`.'''
+        return cls(str(payload), tag)
+
+
+def _send_states(ring, queue, n_states):
+    '''Pack states in a process and send them through the queue.'''
+    for i in xrange(n_states):
+        state = StringState(str(i) * 20, tag=i)
+        state.clock = i
+        queue.put(ring.pack(state))
+
+
+def test():
+    '''Test packing and loading states, with wrapping and overflowing.'''
+    ring = SharedMemoryRing(100)
+    states = [StringState(letter * 30, tag=letter) for letter in 'abcd']
+    states[0].clock = 7
+
+    payloads = [ring.pack(state) for state in states[:3]]
+    assert all(isinstance(payload, StatePayload) for payload in payloads)
+
+    # No more room, so we get the state itself:
+    assert ring.pack(states[3]) is states[3]
+
+    first_state = payloads[0].load()
+    assert (first_state.data, first_state.tag) == ('a' * 30, 'a')
+    assert first_state.clock == 7
+
+    # The payload wraps to the start of the ring:
+    payloads.append(ring.pack(states[3]))
+    assert isinstance(payloads[3], StatePayload)
+    assert payloads[3].offset == 0
+
+    loaded_states = [payload.load() for payload in payloads[1:]]
+    assert [state.data for state in loaded_states] == \
+           [state.data for state in states[1:]]
+    assert not hasattr(loaded_states[0], 'clock')
+
+
+def test_process():
+    '''Test sending states from another process.'''
+    ring = SharedMemoryRing(1000)
+    queue = multiprocessing.Queue()
+    process = multiprocessing.Process(target=_send_states,
+                                      args=(ring, queue, 200))
+    process.start()
+    for i in xrange(200):
+        thing = queue.get(timeout=10)
+        state = thing.load() if isinstance(thing, StatePayload) else thing
+        assert (state.data, state.tag, state.clock) == (str(i) * 20, i, i)
+    process.join()
+
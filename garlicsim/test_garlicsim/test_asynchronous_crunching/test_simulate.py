@@ -0,0 +1,36 @@
+# Copyright 2009-2011 Ram Rachum.
+# This program is distributed under the LGPL2.1 license.
+
+'''Testing module for `Project.simulate`.'''
+
+import garlicsim
+from garlicsim_lib.simpacks import life
+
+
+def test_batches():
+    '''Test that a long simulation is added to the tree in batches.'''
+    batch_size = garlicsim.asynchronous_crunching.CRUNCHER_BATCH_SIZE
+    project = garlicsim.Project(life)
+    root = project.root_this_state(life.State.create_messy_root(6, 6))
+    
+    batch_lengths = []
+    add_states = project.tree.add_states
+    def add_states_recording_lengths(states, *args, **kwargs):
+        batch_lengths.append(len(states))
+        return add_states(states, *args, **kwargs)
+    project.tree.add_states = add_states_recording_lengths
+    
+    n_steps = 2 * batch_size + batch_size // 2
+    leaf = project.simulate(root, n_steps)
+    
+    assert batch_lengths == [batch_size, batch_size, batch_size // 2]
+    
+    path = leaf.make_containing_path()
+    assert len(path) == n_steps + 1
+    assert [node.state for node in path] == \
+           garlicsim.list_simulate(root.state, n_steps)
+    assert [node.state.clock for node in path] == range(n_steps + 1)
+    step_profile = leaf.step_profile
+    assert all((node.step_profile == step_profile) for node in path
+               if node is not root)
+    assert len(root.children) == 1
@@ -0,0 +1,63 @@
+# Copyright 2009-2011 Ram Rachum.
+# This program is distributed under the LGPL2.1 license.
+
+'''Testing module for `WorkBatcher`.'''
+
+import time
+import Queue
+
+from garlicsim.general_misc import queue_tools
+
+from garlicsim.asynchronous_crunching.misc import WorkBatcher
+
+
+def _get_sent_work(work_queue):
+    '''Get everything that was put in the work queue so far.'''
+    return list(queue_tools.iterate(work_queue))
+
+
+def test_slow_steps():
+    '''Test that states slower than the interval are sent right away.'''
+    work_queue = Queue.Queue()
+    work_batcher = WorkBatcher(work_queue, max_size=100, max_interval=0.05)
+    for i in xrange(4):
+        work_batcher.add(i)
+        assert _get_sent_work(work_queue) == [[i]]
+        time.sleep(0.06)
+    work_batcher.flush()
+    assert _get_sent_work(work_queue) == []
+    
+    
+def test_fast_steps():
+    '''Test that fast states are sent in batches.'''
+    work_queue = Queue.Queue()
+    work_batcher = WorkBatcher(work_queue, max_size=3, max_interval=0.05)
+    
+    # The first state is sent right away:
+    work_batcher.add(0)
+    assert _get_sent_work(work_queue) == [[0]]
+    
+    for i in (1, 2):
+        work_batcher.add(i)
+    assert _get_sent_work(work_queue) == []
+    work_batcher.add(3)
+    assert _get_sent_work(work_queue) == [[1, 2, 3]]
+    
+    work_batcher.add(4)
+    assert _get_sent_work(work_queue) == []
+    time.sleep(0.06)
+    work_batcher.add(5)
+    assert _get_sent_work(work_queue) == [[4, 5]]
+    
+    work_batcher.add(6)
+    work_batcher.flush()
+    assert _get_sent_work(work_queue) == [[6]]
+    
+    
+def test_no_batches():
+    '''Test that with a `max_size` of 1, the states aren't put in lists.'''
+    work_queue = Queue.Queue()
+    work_batcher = WorkBatcher(work_queue, max_size=1, max_interval=0.05)
+    for i in xrange(3):
+        work_batcher.add(i)
+    assert _get_sent_work(work_queue) == [0, 1, 2]
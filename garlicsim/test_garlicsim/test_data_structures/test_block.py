@@ -0,0 +1,82 @@
+# Copyright 2009-2011 Ram Rachum.
+# This program is distributed under the LGPL2.1 license.
+
+'''Tests for `Block`.'''
+
+import nose
+
+import garlicsim
+from garlicsim import data_structures as ds
+from garlicsim_lib.simpacks import life
+
+
+def _make_natural_chain(tree, length):
+    '''Make a root with a chain of `length` untouched nodes after it.'''
+    step_profile = garlicsim.misc.StepProfile(life.State.step)
+    root = tree.add_state(life.State.create_root(3, 3))
+    nodes = []
+    current_node = root
+    for i in xrange(length):
+        current_node = tree.add_state(life.State.create_root(3, 3),
+                                      parent=current_node,
+                                      step_profile=step_profile)
+        nodes.append(current_node)
+    return (root, nodes)
+
+
+def _assert_indices_consistent(block):
+    '''Assert that `block.index` agrees with the block's actual order.'''
+    for (i, node) in enumerate(block):
+        assert block.index(node) == i
+        assert block[i] is node
+        assert node.is_first_on_block() == (i == 0)
+        assert node.is_last_on_block() == (i == len(block) - 1)
+
+
+def test_index():
+    '''Test that `Block.index` survives appending, splitting and deleting.'''
+    tree = ds.Tree()
+    (root, nodes) = _make_natural_chain(tree, 20)
+
+    block = nodes[0].block
+    assert isinstance(block, ds.Block)
+    assert list(block) == nodes
+    _assert_indices_consistent(block)
+
+    nose.tools.assert_raises(ValueError, lambda: block.index(root))
+
+    # Splitting the block by forking from its middle:
+    tree.add_state(life.State.create_root(3, 3), parent=nodes[9],
+                   step_profile=nodes[9].step_profile)
+    first_block, second_block = nodes[0].block, nodes[10].block
+    assert first_block is block
+    assert list(first_block) == nodes[:10]
+    assert list(second_block) == nodes[10:]
+    _assert_indices_consistent(first_block)
+    _assert_indices_consistent(second_block)
+    assert nodes[15].get_ancestor(5) is nodes[10]
+    assert nodes[15].get_ancestor(7) is nodes[8]
+
+    # Removing edge nodes:
+    del second_block[0]
+    assert nodes[10].block is None
+    del second_block[-1]
+    assert nodes[-1].block is None
+    assert list(second_block) == nodes[11:-1]
+    _assert_indices_consistent(second_block)
+
+    # Inserting at the head:
+    second_block.delete()
+    new_block = ds.Block(nodes[12:15])
+    new_block.append_node(nodes[11])
+    new_block.add_node_list(nodes[15:17])
+    new_block.append_node(nodes[17])
+    assert list(new_block) == nodes[11:18]
+    _assert_indices_consistent(new_block)
+
+    new_block.delete()
+    newer_block = ds.Block(nodes[15:18])
+    newer_block.add_node_list(nodes[11:15])
+    assert list(newer_block) == nodes[11:18]
+    _assert_indices_consistent(newer_block)
+
@@ -0,0 +1,95 @@
+# Copyright 2009-2011 Ram Rachum.
+# This program is distributed under the LGPL2.1 license.
+
+'''Tests for `Path`.'''
+
+import garlicsim
+from garlicsim.general_misc import binary_search
+from garlicsim import data_structures as ds
+from garlicsim_lib.simpacks import life
+
+
+def _add_chain(tree, parent, length, step_profile):
+    '''Add a chain of `length` untouched nodes after `parent`.'''
+    nodes = []
+    current_node = parent
+    for i in xrange(length):
+        current_node = tree.add_state(life.State.create_root(3, 3),
+                                      parent=current_node,
+                                      step_profile=step_profile)
+        nodes.append(current_node)
+    return nodes
+
+
+def _check_path(path):
+    '''Check the path's indexed lookups against simply walking it.'''
+    nodes = list(path) # `__iter__` walks the path without using the index.
+    assert len(path) == len(nodes)
+    assert path.get_last_node() is nodes[-1]
+    for (i, node) in enumerate(nodes):
+        assert path[i] is node
+        assert path[i - len(nodes)] is node
+        assert node in path
+    for tail in (nodes[0], nodes[len(nodes) // 2]):
+        assert path.__getitem__(-1, tail=tail) is tail
+        assert path.__len__(tail=tail) == nodes.index(tail) + 1
+    for node in nodes[::7]:
+        clock = node.state.clock
+        assert path.get_node_by_clock(clock) is node
+        assert path.get_node_by_clock(clock - 0.5,
+                                      rounding=binary_search.BOTH) == \
+               (node.parent if node is not nodes[0] else None, node)
+    assert path.get_node_by_clock(nodes[-1].state.clock + 0.5,
+                                  rounding=binary_search.BOTH) == \
+           (nodes[-1], None)
+    
+    
+def test_index():
+    '''Test that the path's index stays right when the tree changes.'''
+    tree = ds.Tree()
+    step_profile = garlicsim.misc.StepProfile(life.State.step)
+    root = tree.add_state(life.State.create_root(3, 3))
+    nodes = _add_chain(tree, root, 30, step_profile)
+    
+    path = root.make_containing_path()
+    _check_path(path)
+    
+    # Growing the path at its end:
+    nodes += _add_chain(tree, nodes[-1], 30, step_profile)
+    _check_path(path)
+    assert len(path) == 61
+    path.modify_to_include_node(nodes[-1])
+    _check_path(path)
+    assert len(path) == 61
+    
+    # Adding a node with a different step profile at the end, and then
+    # natural nodes after it:
+    other_node = tree.add_state(life.State.create_root(3, 3),
+                                parent=nodes[-1])
+    assert other_node.block is None
+    _check_path(path)
+    _add_chain(tree, other_node, 1, step_profile)
+    _check_path(path)
+    _add_chain(tree, other_node.children[0], 10, step_profile)
+    assert other_node.children[0].block is not None
+    _check_path(path)
+    assert len(path) == 73
+    
+    # Forking in the middle of a block, which splits it:
+    fork_nodes = _add_chain(tree, nodes[20], 5, step_profile)
+    _check_path(path)
+    assert len(path) == 73
+    assert fork_nodes[0] not in path
+    
+    path.modify_to_include_node(fork_nodes[-1])
+    _check_path(path)
+    assert len(path) == 27
+    assert fork_nodes[-1] in path
+    assert nodes[30] not in path
+    
+    # Deleting nodes:
+    path = nodes[-1].make_containing_path()
+    tree.delete_node_range(ds.NodeRange(nodes[40], nodes[50]))
+    _check_path(path)
+    assert len(path) == 41
+    
@@ -0,0 +1,271 @@
+# Copyright 2009-2011 Ram Rachum.
+# This program is distributed under the LGPL2.1 license.
+
+'''Tests for `Tree`.'''
+
+from __future__ import division
+
+import cPickle as pickle
+
+import nose
+
+import garlicsim
+from garlicsim import data_structures as ds
+from garlicsim.misc.state_deepcopy import state_deepcopy
+from garlicsim_lib.simpacks import life
+
+
+def _describe_tree(tree):
+    '''
+    Describe the structure of a tree, in a way comparable between trees.
+    
+    Nodes are described by their index in `tree.nodes`.
+    '''
+    indices = dict((node, i) for (i, node) in enumerate(tree.nodes))
+    describe_member = lambda member: \
+        tuple(indices[node] for node in member) if \
+        isinstance(member, ds.Block) else indices[member]
+    return (
+        [indices.get(node.parent) for node in tree.nodes],
+        [node.state.clock for node in tree.nodes],
+        [describe_member(node.soft_get_block()) for node in tree.nodes],
+    )
+
+
+def test_add_states():
+    '''Test that `Tree.add_states` works like calling `add_state` repeatedly.'''
+    step_profile = garlicsim.misc.StepProfile(life.State.step)
+    other_step_profile = garlicsim.misc.StepProfile(life.State.step,
+                                                    some_argument=3)
+    
+    def build_tree(use_add_states):
+        tree = ds.Tree()
+        
+        def add(n_states, parent, step_profile=step_profile):
+            states = [life.State.create_root(2, 2) for i in xrange(n_states)]
+            if use_add_states:
+                return tree.add_states(states, parent, step_profile)
+            else:
+                nodes = []
+                for state in states:
+                    parent = tree.add_state(state, parent=parent,
+                                            step_profile=step_profile)
+                    nodes.append(parent)
+                return nodes
+            
+        root = tree.add_state(life.State.create_root(2, 2))
+        nodes = add(10, root) # After a touched root
+        nodes += add(5, nodes[-1]) # After the last node in a block
+        add(1, nodes[-1]) # A single node after a block
+        add(3, nodes[4]) # Fork from the middle of a block
+        add(4, nodes[4]) # Fork from the end of a block
+        add(3, nodes[-1], other_step_profile) # A different step profile
+        lonely_node = add(1, root)[0]
+        add(1, lonely_node) # After a blockless, untouched node
+        assert add(0, lonely_node) == []
+        return tree
+    
+    assert _describe_tree(build_tree(True)) == _describe_tree(build_tree(False))
+    
+    tree = ds.Tree()
+    nose.tools.assert_raises(ds.TreeError, tree.add_states,
+                             [life.State.create_root(2, 2)], None,
+                             step_profile)
+    
+    
+    
+def test_delete_node_range():
+    '''Test deleting a branch with `Tree.delete_node_range`.'''
+    step_profile = garlicsim.misc.StepProfile(life.State.step)
+    tree = ds.Tree()
+    root = tree.add_state(life.State.create_root(2, 2))
+    add = lambda n_states, parent: tree.add_states(
+        [life.State.create_root(2, 2) for i in xrange(n_states)],
+        parent,
+        step_profile
+    )
+    trunk = add(10, root)
+    branch = add(10, trunk[4])
+    sub_branch = add(3, branch[6])
+    
+    tree.delete_node_range(ds.NodeRange(branch[2], branch[8]))
+    
+    assert list(tree.nodes) == \
+           [root] + trunk + branch[:2] + [branch[9]] + sub_branch
+    assert set(tree.roots) == set((root, branch[9], sub_branch[0]))
+    assert branch[9].parent is sub_branch[0].parent is None
+    assert branch[1].children == []
+    assert list(branch[0].block) == branch[:2]
+    assert list(sub_branch[0].block) == sub_branch
+    
+    
+def test_delta_storage():
+    '''Test storing the states of natural nodes as deltas.'''
+    step_profile = garlicsim.misc.StepProfile(life.State.step)
+    tree = ds.Tree()
+    tree.store_deltas = True
+    root = tree.add_state(life.State.create_messy_root(6, 6))
+    
+    states = [root.state]
+    for i in xrange(60):
+        state = states[-1].step()
+        state.clock = i + 1
+        states.append(state)
+        
+    nodes = [root] + tree.add_states(states[1:31], root, step_profile)
+    current_node = nodes[-1]
+    for state in states[31:]:
+        current_node = tree.add_state(state, current_node, step_profile)
+        nodes.append(current_node)
+        
+    full_state_nodes = [node for node in nodes if
+                        node._Node__state is not None]
+    assert full_state_nodes == nodes[::ds.node.DELTA_KEYFRAME_INTERVAL]
+    
+    def assert_states_correct(first_index=0):
+        tree._state_cache.clear()
+        for i in reversed(xrange(first_index, len(nodes))):
+            assert nodes[i].state == states[i]
+            assert nodes[i].state.clock == i
+            
+    assert_states_correct()
+    
+    # Forking, which splits the block:
+    fork = tree.add_state(states[10].step(), nodes[10], step_profile)
+    assert fork.state == states[11]
+    assert_states_correct()
+    
+    # Deleting nodes that later nodes' deltas depend on:
+    tree.delete_node_range(ds.NodeRange(nodes[5], nodes[25]))
+    assert nodes[26].parent is None
+    assert_states_correct(26)
+    
+    unpickled_tree = pickle.loads(pickle.dumps(tree, protocol=2))
+    (unpickled_node,) = [node for node in unpickled_tree.nodes if
+                         node.state.clock == 45]
+    assert unpickled_node.state == states[45]
+    
+    # By default, states are kept in full:
+    tree = ds.Tree()
+    nodes = [tree.add_state(states[0])]
+    nodes += tree.add_states(states[1:], nodes[0], step_profile)
+    assert all(node._Node__state is states[i] for (i, node) in
+               enumerate(nodes))
+    
+    
+def test_intern_states():
+    '''Test that natural nodes with equal states share one state object.'''
+    step_profile = garlicsim.misc.StepProfile(life.State.step)
+    tree = ds.Tree()
+    tree.intern_states = True
+    root = tree.add_state(life.State.create_messy_root(6, 6))
+    
+    def crunch(n_states, use_add_states):
+        states = [root.state]
+        for i in xrange(n_states):
+            state = states[-1].step()
+            state.clock = i + 1
+            states.append(state)
+        if use_add_states:
+            return tree.add_states(states[1:], root, step_profile)
+        nodes = []
+        current_node = root
+        for state in states[1:]:
+            current_node = tree.add_state(state, current_node, step_profile)
+            nodes.append(current_node)
+        return nodes
+    
+    first_branch = crunch(30, use_add_states=True)
+    assert tree.get_sharing_ratio() == 1
+    second_branch = crunch(30, use_add_states=False)
+    third_branch = crunch(10, use_add_states=True)
+    
+    for branch in (second_branch, third_branch):
+        for (node, first_node) in zip(branch, first_branch):
+            assert node.state is first_node.state
+    assert (tree.n_interned_states, tree.n_shared_states) == (70, 40)
+    assert tree.get_sharing_ratio() == 70 / 30
+    
+    # Touched nodes get their own state:
+    edited_node = tree.fork_to_edit(first_branch[5])
+    assert edited_node.state is not first_branch[5].state
+    assert tree.n_interned_states == 70
+    
+    unpickled_tree = pickle.loads(pickle.dumps(tree, protocol=2))
+    assert unpickled_tree.intern_states
+    unpickled_states = [node.state for node in unpickled_tree.nodes if
+                        node.state.clock == 3 and not node.touched]
+    assert len(unpickled_states) == 3
+    assert unpickled_states[0] is unpickled_states[1] is unpickled_states[2]
+    
+    # The unpickled tree matches new states against the ones it has, and
+    # counts the nodes that hold each of them:
+    (unpickled_root,) = unpickled_tree.roots
+    state = unpickled_root.state.step()
+    state.clock = 1
+    new_node = unpickled_tree.add_state(state, unpickled_root, step_profile)
+    (old_state,) = set(node.state for node in unpickled_tree.nodes if
+                       node.state.clock == 1 and node is not new_node)
+    assert new_node.state is old_state
+    assert unpickled_tree._interned_entries[new_node][1] == 4
+    assert len(unpickled_tree._interned_states) == 30
+    
+    
+def test_intern_states_on_long_forks():
+    '''Test interning on forks that are longer than the state cache.'''
+    step_profile = garlicsim.misc.StepProfile(life.State.step)
+    tree = ds.Tree()
+    tree.intern_states = True
+    tree.store_deltas = True
+    root = tree.add_state(life.State.create_messy_root(6, 6))
+    
+    n_states = ds.tree.STATE_CACHE_SIZE * 3
+    states = [root.state]
+    for i in xrange(n_states):
+        state = states[-1].step()
+        state.clock = i + 1
+        states.append(state)
+    
+    forks = []
+    for i in xrange(4):
+        fork_states = [state_deepcopy(state) for state in states[1:]]
+        forks.append(tree.add_states(fork_states, root, step_profile))
+    assert tree.get_sharing_ratio() == 4
+    tree._state_cache.clear()
+    for fork in forks[1:]:
+        for (node, first_node) in zip(fork, forks[0]):
+            assert node.state is first_node.state
+    
+    # Deleting forks, even the first one, keeps the rest sharing:
+    for fork in forks[:2]:
+        tree.delete_node_range(ds.NodeRange(fork[0], fork[-1]))
+    new_fork = tree.add_states(
+        [state_deepcopy(state) for state in states[1:]], root, step_profile
+    )
+    for (node, old_node) in zip(new_fork, forks[2]):
+        assert node.state is old_node.state
+    assert len(tree._interned_states) == n_states
+    
+    for fork in forks[2:] + [new_fork]:
+        tree.delete_node_range(ds.NodeRange(fork[0], fork[-1]))
+    assert not tree._interned_states
+    assert not tree._interned_entries
+    
+    
+def test_fork_to_edit_copies():
+    '''Test that `fork_to_edit` copies states with their `__state_copy__`.'''
+    tree = ds.Tree()
+    root = tree.add_state(life.State.create_messy_root(6, 6))
+    copied_states = []
+    original_state_copy = life.State.__state_copy__
+    def state_copy(state, memo):
+        copied_states.append(state)
+        return original_state_copy(state, memo)
+    life.State.__state_copy__ = state_copy
+    try:
+        edited_node = tree.fork_to_edit(root)
+    finally:
+        life.State.__state_copy__ = original_state_copy
+    assert copied_states == [root.state]
+    assert edited_node.state == root.state
+    assert edited_node.state.board is not root.state.board
@@ -0,0 +1,6 @@
+# Copyright 2009-2011 Ram Rachum.
+# This program is distributed under the LGPL2.1 license.
+
+'''
+Testing module for `garlicsim.general_misc.nifty_collections.OrderedSet`.
+'''
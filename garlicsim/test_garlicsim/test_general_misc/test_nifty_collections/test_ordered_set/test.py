@@ -0,0 +1,33 @@
+# Copyright 2009-2011 Ram Rachum.
+# This program is distributed under the LGPL2.1 license.
+
+'''Testing module for `nifty_collections.ordered_set.OrderedSet`.'''
+
+import cPickle as pickle
+
+from garlicsim.general_misc.nifty_collections import OrderedSet
+
+
+def test():
+    '''Test the basic workings of `OrderedSet`.'''
+    ordered_set = OrderedSet(xrange(10))
+    ordered_set.add(3)
+    assert list(ordered_set) == range(10)
+    ordered_set.discard(4)
+    ordered_set.remove(7)
+    ordered_set |= [20, 0, 10]
+    assert list(ordered_set) == [0, 1, 2, 3, 5, 6, 8, 9, 20, 10]
+    assert list(reversed(ordered_set)) == list(ordered_set)[::-1]
+    assert 5 in ordered_set
+    assert 7 not in ordered_set
+    assert len(ordered_set) == 10
+    
+    
+def test_pickling():
+    '''Test pickling a big `OrderedSet`, which shouldn't recurse deeply.'''
+    ordered_set = OrderedSet(xrange(100000))
+    for protocol in (0, 2):
+        unpickled_ordered_set = \
+            pickle.loads(pickle.dumps(ordered_set, protocol=protocol))
+        assert isinstance(unpickled_ordered_set, OrderedSet)
+        assert unpickled_ordered_set == ordered_set
@@ -118,3 +118,47 @@ def test_cached_history_function():
     assert result_1 == result_2
     
 
+    
+    
+def test_incremental_history_function():
+    
+    def total_live_cells(history_browser):
+        '''Return how many cells were alive, summed over the history.'''
+        total_live_cells.n_calls += 1
+        return sum(history_browser[i].get_n_live_cells() for i in
+                   xrange(len(history_browser)))
+    total_live_cells.n_calls = 0
+    
+    cached_total_live_cells = caching.history_cache(total_live_cells)
+    
+    def increment_total_live_cells(parent_value, state):
+        increment_total_live_cells.n_calls += 1
+        return parent_value + state.get_n_live_cells()
+    increment_total_live_cells.n_calls = 0
+    
+    assert cached_total_live_cells.incremental(increment_total_live_cells) \
+           is cached_total_live_cells
+    
+    p = garlicsim.Project(life)
+    r = p.root_this_state(life.State.create_messy_root(5, 5))
+    leaf = p.simulate(r, 30)
+    fork = p.simulate(leaf.make_containing_path()[10], 10)
+    path = leaf.make_containing_path()
+    fork_path = fork.make_containing_path()
+    
+    # Asking for the last node sweeps forward from the root, once:
+    cached_total_live_cells(path[-1])
+    assert total_live_cells.n_calls == 1
+    assert increment_total_live_cells.n_calls == 30
+    
+    result = [cached_total_live_cells(node) for node in path]
+    fork_result = [cached_total_live_cells(node) for node in fork_path]
+    assert total_live_cells.n_calls == 1
+    assert increment_total_live_cells.n_calls == 40
+    
+    HistoryBrowser = garlicsim.synchronous_crunching.HistoryBrowser
+    assert result == [total_live_cells(HistoryBrowser(path, tail_node=node))
+                      for node in path]
+    assert fork_result[:11] == result[:11]
+    assert fork_result[-1] == \
+           sum(state.get_n_live_cells() for state in fork_path.states())
@@ -0,0 +1,79 @@
+# Copyright 2009-2011 Ram Rachum.
+# This program is distributed under the LGPL2.1 license.
+
+'''Testing module for `CopyOnWrite`.'''
+
+import nose
+
+import garlicsim
+from garlicsim.misc import CopyOnWrite, CopyOnWriteError
+from garlicsim.misc.state_deepcopy import state_deepcopy
+
+
+class Leaf(CopyOnWrite):
+    '''A copy-on-write object with a value.'''
+    def __init__(self, value):
+        CopyOnWrite.__init__(self)
+        self.value = value
+        
+
+class Branch(CopyOnWrite):
+    '''A copy-on-write object with a leaf and a list of leaves.'''
+    def __init__(self):
+        CopyOnWrite.__init__(self)
+        self.leaf = Leaf(0)
+        self.leaves = [Leaf(i) for i in xrange(5)]
+
+        
+class LazyState(CopyOnWrite, garlicsim.data_structures.State):
+    '''A copy-on-write state.'''
+    def __init__(self):
+        CopyOnWrite.__init__(self)
+        self.branch = Branch()
+        self.numbers = [1, 2, 3]
+        
+        
+def test():
+    '''Test that objects are shared until they're gotten for writing.'''
+    state = LazyState()
+    state.get_writable('branch').get_writable('leaf').value = 1
+    
+    new_state = state_deepcopy(state)
+    assert new_state.branch is state.branch
+    assert new_state.numbers is state.numbers
+    nose.tools.assert_raises(CopyOnWriteError, setattr, state.branch, 'x', 1)
+    nose.tools.assert_raises(CopyOnWriteError, setattr, state.branch.leaf,
+                             'value', 2)
+    nose.tools.assert_raises(CopyOnWriteError, state.branch.get_writable,
+                             'leaf')
+    
+    branch = new_state.get_writable('branch')
+    assert branch is not state.branch
+    assert new_state.get_writable('branch') is branch
+    branch.get_writable_item('leaves', 3).value = 30
+    new_state.get_writable('numbers').append(4)
+    
+    assert [leaf.value for leaf in state.branch.leaves] == range(5)
+    assert [leaf.value for leaf in branch.leaves] == [0, 1, 2, 30, 4]
+    assert branch.leaves[2] is state.branch.leaves[2]
+    assert branch.leaf is state.branch.leaf
+    assert state.numbers == [1, 2, 3]
+    assert new_state.numbers == [1, 2, 3, 4]
+    
+    # The original state may still be changed, without touching the copy:
+    state.get_writable('branch').get_writable('leaf').value = 5
+    assert branch.leaf.value == 1
+    
+    
+def test_new_objects():
+    '''Test that objects made since the last copy aren't copied again.'''
+    state = LazyState()
+    new_state = state_deepcopy(state)
+    leaf = Leaf(7)
+    new_state.get_writable('branch').leaf = leaf
+    assert new_state.branch.get_writable('leaf') is leaf
+    leaf.value = 8
+    
+    newer_state = state_deepcopy(new_state)
+    assert newer_state.get_writable('branch').get_writable('leaf') is not leaf
+    nose.tools.assert_raises(CopyOnWriteError, setattr, leaf, 'value', 9)
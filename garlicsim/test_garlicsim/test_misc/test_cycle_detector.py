@@ -0,0 +1,75 @@
+# Copyright 2009-2011 Ram Rachum.
+# This program is distributed under the LGPL2.1 license.
+
+'''Testing module for `CycleDetector` and `state_key`.'''
+
+import garlicsim
+from garlicsim.misc import CycleDetector, state_key
+
+
+class CountingState(garlicsim.data_structures.State):
+    '''A state that counts up to a number and then loops back to another.'''
+    def __init__(self, number, lead_in, period):
+        self.number = number
+        self.lead_in = lead_in
+        self.period = period
+    def step(self):
+        number = self.number + 1
+        if number == self.lead_in + self.period:
+            number = self.lead_in
+        state = CountingState(number, self.lead_in, self.period)
+        state.clock = self.clock + 1
+        return state
+
+
+class KeyedCountingState(CountingState):
+    '''A counting state that counts its steps too, but not in its key.'''
+    def __init__(self, number, lead_in, period):
+        CountingState.__init__(self, number, lead_in, period)
+        self.n_steps = 0
+    def step(self):
+        state = CountingState.step(self)
+        state.__class__ = KeyedCountingState
+        state.n_steps = self.n_steps + 1
+        return state
+    def __state_key__(self):
+        return self.number
+
+
+def test_state_key():
+    '''Test that keys of states ignore the clock, and use `__state_key__`.'''
+    state = CountingState(3, 0, 10)
+    state.clock = 0
+    other_state = CountingState(3, 0, 10)
+    other_state.clock = 7
+    assert state_key(state) == state_key(other_state)
+    assert hash(state_key(state)) == hash(state_key(other_state))
+    other_state.number = 4
+    assert state_key(state) != state_key(other_state)
+
+    keyed_state = KeyedCountingState(3, 0, 10)
+    assert state_key(keyed_state) == 3
+
+
+def check(state_type, lead_in, period):
+    '''Check that the detector finds the cycle soon enough.'''
+    state = state_type(0, lead_in, period)
+    state.clock = 0
+    cycle_detector = CycleDetector(state)
+    for i in xrange(1, 4 * (lead_in + period) + 2):
+        state = state.step()
+        found_period = cycle_detector.check(state)
+        if found_period:
+            break
+    else:
+        assert False, 'The cycle was not found.'
+    assert found_period == period
+    assert i >= lead_in + period
+
+
+def test_cycle_detector():
+    '''Test detecting cycles of different lengths, after different lead-ins.'''
+    for state_type in (CountingState, KeyedCountingState):
+        for lead_in in (0, 1, 5, 100):
+            for period in (1, 2, 3, 17, 64):
+                yield check, state_type, lead_in, period
@@ -0,0 +1,85 @@
+# Copyright 2009-2011 Ram Rachum.
+# This program is distributed under the LGPL2.1 license.
+
+'''Testing module for `ScalarEvaluator`.'''
+
+import cPickle
+
+import garlicsim
+from garlicsim.misc import ScalarEvaluator
+from garlicsim_lib.simpacks import life
+
+
+def test():
+    '''Test evaluating over paths, calling the functions only for new nodes.'''
+    calls = []
+    def n_live_cells(state):
+        calls.append(state.clock)
+        return state.get_n_live_cells()
+    def parity(node):
+        if node.parent is None:
+            return None
+        return node.state.clock % 2
+    scalar_evaluator = ScalarEvaluator([n_live_cells], [parity])
+    assert scalar_evaluator.names == ['clock', 'n_live_cells', 'parity']
+    
+    project = garlicsim.Project(life)
+    root = project.root_this_state(life.State.create_messy_root(8, 8))
+    path = project.simulate(root, 20).make_containing_path()
+    
+    def check(result, nodes):
+        assert result.keys() == scalar_evaluator.names
+        assert list(result['clock']) == [node.state.clock for node in nodes]
+        assert list(result['n_live_cells']) == \
+               [node.state.get_n_live_cells() for node in nodes]
+        assert result['parity'][0] != result['parity'][0] # NaN for root
+        assert list(result['parity'][1:]) == \
+               [node.state.clock % 2 for node in nodes[1:]]
+            
+    check(scalar_evaluator.evaluate(path), list(path))
+    assert calls == range(21)
+    check(scalar_evaluator.evaluate(path), list(path))
+    assert len(calls) == 21
+    
+    # After crunching more, only the new nodes are evaluated:
+    project.simulate(path[-1], 10)
+    check(scalar_evaluator.evaluate(path), list(path))
+    assert calls == range(31)
+    
+    # Forking splits the block, but its first part is still used:
+    fork = project.simulate(path[15], 5)
+    check(scalar_evaluator.evaluate(path), list(path))
+    fork_path = fork.make_containing_path()
+    check(scalar_evaluator.evaluate(fork_path), list(fork_path))
+    assert calls == range(31) + range(16, 21)
+    
+    result = scalar_evaluator.evaluate(path, head=path[3], tail=path[17])
+    assert list(result['clock']) == range(3, 18)
+    result = scalar_evaluator.evaluate_clock_window(path, 4.5, 27)
+    assert list(result['clock']) == range(5, 28)
+    result = scalar_evaluator.evaluate_clock_window(path, end_clock=2)
+    assert list(result['clock']) == range(3)
+    result = scalar_evaluator.evaluate_clock_window(path, 100, 200)
+    assert len(result['clock']) == 0
+    assert len(calls) == 36
+    
+    
+def test_project():
+    '''Test the project's scalar evaluator, with the simpack's functions.'''
+    project = garlicsim.Project(life)
+    assert project.scalar_evaluator.names == ['clock', 'get_n_live_cells']
+    root = project.root_this_state(life.State.create_messy_root(8, 8))
+    path = project.simulate(root, 10).make_containing_path()
+    result = project.scalar_evaluator.evaluate(path)
+    assert list(result['get_n_live_cells']) == \
+           [state.get_n_live_cells() for state in path.states()]
+    
+    unpickled_project = cPickle.loads(cPickle.dumps(project))
+    assert unpickled_project.scalar_evaluator is not project.scalar_evaluator
+    (unpickled_root,) = unpickled_project.tree.roots
+    (unpickled_leaf,) = unpickled_root.get_all_leaves()
+    unpickled_result = unpickled_project.scalar_evaluator.evaluate(
+        unpickled_leaf.make_containing_path()
+    )
+    assert list(unpickled_result['get_n_live_cells']) == \
+           list(result['get_n_live_cells'])
@@ -0,0 +1,52 @@
+# Copyright 2009-2011 Ram Rachum.
+# This program is distributed under the LGPL2.1 license.
+
+'''Testing module for `state_deepcopy`.'''
+
+import garlicsim
+from garlicsim.general_misc.persistent import CrossProcessPersistent
+from garlicsim.misc.state_deepcopy import state_deepcopy, copy_attributes, \
+                                          StateCopy
+
+
+class Thing(object):
+    '''An object with a few attributes, for copying.'''
+    def __init__(self):
+        self.number = 7
+        self.name = 'thing'
+        self.list = [1, 2]
+        self.persistent = CrossProcessPersistent()
+        
+        
+class FastCopyState(garlicsim.data_structures.State):
+    '''A state which copies itself with `copy_attributes`.'''
+    def __init__(self):
+        self.thing = Thing()
+        
+    def __state_copy__(self, memo):
+        assert isinstance(memo, StateCopy)
+        new_state = copy_attributes(self, memo)
+        new_state.copied_fast = True
+        return new_state
+
+
+def test():
+    '''Test that `state_deepcopy` uses `__state_copy__` when it's there.'''
+    state = FastCopyState()
+    state.clock = 3
+    new_state = state_deepcopy(state)
+    assert new_state.copied_fast
+    assert new_state.clock == 3
+    assert new_state.thing is not state.thing
+    
+    new_thing = copy_attributes(state.thing, StateCopy())
+    assert new_thing.name is state.thing.name
+    assert new_thing.persistent is state.thing.persistent
+    assert new_thing.list == state.thing.list
+    assert new_thing.list is not state.thing.list
+    
+    plain_state = garlicsim.data_structures.State()
+    plain_state.thing = Thing()
+    new_plain_state = state_deepcopy(plain_state)
+    assert new_plain_state.thing.persistent is plain_state.thing.persistent
+    assert new_plain_state.thing.list is not plain_state.thing.list
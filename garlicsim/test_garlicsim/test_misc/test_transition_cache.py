@@ -0,0 +1,139 @@
+# Copyright 2009-2011 Ram Rachum.
+# This program is distributed under the LGPL2.1 license.
+
+'''Testing module for `TransitionCache`.'''
+
+import time
+import cPickle
+
+import garlicsim
+from garlicsim.misc import TransitionCache, state_key
+from garlicsim_lib.simpacks import life
+
+
+class NumberState(garlicsim.data_structures.State):
+    '''A state with just a number.'''
+    def __init__(self, number, clock=0):
+        self.number = number
+        self.clock = clock
+    def step(self):
+        return NumberState(self.number + 1, self.clock + 1)
+
+
+def test_transition_cache():
+    '''Test getting steps from the cache, counting, and dropping old steps.'''
+    transition_cache = TransitionCache(max_size=2)
+    step_profile = garlicsim.misc.StepProfile(NumberState.step)
+    states = [NumberState(i, clock=i) for i in range(4)]
+    
+    assert transition_cache.get(state_key(states[0]), step_profile,
+                                states[0]) is None
+    for state, next_state in zip(states, states[1:]):
+        transition_cache.add(state_key(state), step_profile, state, next_state)
+    assert len(transition_cache) == 2
+    
+    # The first step was dropped:
+    assert transition_cache.get(state_key(states[0]), step_profile,
+                                states[0]) is None
+    
+    # We get a copy of the next state, with a clock that fits our state:
+    state = NumberState(1, clock=10)
+    next_state = transition_cache.get(state_key(state), step_profile, state)
+    assert next_state.number == 2
+    assert next_state.clock == 11
+    assert next_state is not states[2]
+    assert states[2].clock == 2
+    
+    # Now the step from 2 is the least recently used, so it's dropped:
+    transition_cache.add(state_key(states[3]), step_profile, states[3],
+                         NumberState(4, clock=4))
+    assert transition_cache.get(state_key(states[2]), step_profile,
+                                states[2]) is None
+    assert transition_cache.get(state_key(states[1]), step_profile,
+                                states[1]).number == 2
+    
+    assert (transition_cache.n_hits, transition_cache.n_misses) == (2, 3)
+    
+    unpickled_transition_cache = cPickle.loads(cPickle.dumps(transition_cache))
+    assert len(unpickled_transition_cache) == 2
+    
+    transition_cache.clear()
+    assert len(transition_cache) == 0
+    
+
+def test_project():
+    '''Test that forks of a project take steps from the project's cache.'''
+    project = garlicsim.Project(life)
+    assert project.transition_cache is None
+    project.transition_cache = transition_cache = TransitionCache()
+    root = project.root_this_state(life.State.create_messy_root(10, 10))
+    
+    project.simulate(root, 5)
+    assert (transition_cache.n_hits, transition_cache.n_misses) == (0, 5)
+    
+    # A fork from the same state takes its steps from the cache:
+    project.begin_crunching(root, 5)
+    while project.crunching_manager.jobs:
+        time.sleep(0.05)
+        project.sync_crunchers()
+    assert transition_cache.n_hits >= 5
+    (first_leaf, second_leaf) = root.get_all_leaves()
+    assert first_leaf.state == second_leaf.state
+    assert first_leaf.state.clock == second_leaf.state.clock == 5
+    
+    # A random step profile isn't deterministic, so it's not cached:
+    n_hits = transition_cache.n_hits
+    n_misses = transition_cache.n_misses
+    project.simulate(root, 3, randomness=0.1)
+    assert transition_cache.n_hits == n_hits
+    assert transition_cache.n_misses == n_misses
+    
+    # The cache belongs to the project, so `simulate` and other projects of
+    # the simpack don't use it unless they're given it:
+    state = garlicsim.simulate(root.state, 3)
+    assert state == root.make_containing_path()[3].state
+    assert transition_cache.n_hits == n_hits
+    state = garlicsim.simulate(root.state, 3,
+                               transition_cache=transition_cache)
+    assert state == root.make_containing_path()[3].state
+    assert transition_cache.n_hits == n_hits + 3
+    n_hits = transition_cache.n_hits
+    other_project = garlicsim.Project(life)
+    assert other_project.transition_cache is None
+    other_root = other_project.root_this_state(root.state)
+    other_project.simulate(other_root, 3)
+    assert transition_cache.n_hits == n_hits
+    assert transition_cache.n_misses == n_misses
+    assert not isinstance(
+        garlicsim.misc.SimpackGrokker(life).get_step_iterator(
+            root.state, project.build_step_profile()
+        ),
+        garlicsim.misc.step_iterators.CachingStepIterator
+    )
+    
+    
+def test_process_cruncher():
+    '''Test that a process cruncher gets the cache but not the project.'''
+    project = garlicsim.Project(life)
+    project.crunching_manager.cruncher_type = \
+        garlicsim.asynchronous_crunching.crunchers.ProcessCruncher
+    project.transition_cache = transition_cache = TransitionCache()
+    root = project.root_this_state(life.State.create_messy_root(10, 10))
+    project.simulate(root, 5)
+    
+    project.begin_crunching(root, 5)
+    project.sync_crunchers()
+    (cruncher,) = project.crunching_manager.step_profiles.keys()
+    process = cruncher.process
+    # These are all that the process gets, and they're pickleable without the
+    # project:
+    assert process.step_iterator_getter.im_self is project.simpack_grokker
+    assert process.transition_cache is transition_cache
+    unpickled_cache = cPickle.loads(cPickle.dumps(transition_cache, 2))
+    assert len(unpickled_cache) == len(transition_cache) == 5
+    
+    while project.crunching_manager.jobs:
+        time.sleep(0.05)
+        project.sync_crunchers()
+    (first_leaf, second_leaf) = root.get_all_leaves()
+    assert first_leaf.state == second_leaf.state
@@ -6,4 +6,6 @@
 
 from .state import determinism_function
 
-DETERMINISM_FUNCTION = determinism_function
\ No newline at end of file
+DETERMINISM_FUNCTION = determinism_function
+
+CLOCK_INDEPENDENT = True
\ No newline at end of file
@@ -4,6 +4,10 @@
 '''Settings module for the `life` simpack'''
 
 
-from .state import determinism_function
+from .state import State, determinism_function
 
-DETERMINISM_FUNCTION = determinism_function
\ No newline at end of file
+DETERMINISM_FUNCTION = determinism_function
+
+CLOCK_INDEPENDENT = True
+
+SCALAR_STATE_FUNCTIONS = [State.get_n_live_cells]
\ No newline at end of file
@@ -7,6 +7,8 @@ This module defines the `State` class.
 See its documentation for more information.
 '''
 
+import copy
+import array
 import random
 import itertools
 
@@ -17,7 +19,7 @@ class State(garlicsim.data_structures.State):
     '''World state. A frozen moment in time in the simulation world.'''
 
     @staticmethod
-    def create_diehard(width=45, height=25):
+    def create_diehard(width=45, height=25, board_type=None):
         '''
         Create the Diehard Metushelah.
         
@@ -27,28 +29,34 @@ class State(garlicsim.data_structures.State):
              ##
               #   ###
 
+        `board_type` is the type of board to use, by default `Board`. (See
+        `PackedBoard` for a smaller one and `numpy_board.NumpyBoard` for a
+        faster one.)
         '''
         state = State()
-        state.board = Board.create_diehard(width, height)
+        state.board = (board_type or Board).create_diehard(width, height)
         return state
 
     
     @staticmethod
-    def create_root(width=45, height=25, fill='empty'):
+    def create_root(width=45, height=25, fill='empty', board_type=None):
         '''
         Create a plain and featureless world state.
         
-        `fill` may be either 'empty', 'full', or 'random'.
+        `fill` may be either 'empty', 'full', or 'random'. `board_type` is the
+        type of board to use, by default `Board`. (See `PackedBoard` for a
+        smaller one and `numpy_board.NumpyBoard` for a faster one.)
         '''
         state = State()
-        state.board = Board(width, height, fill)
+        state.board = (board_type or Board)(width, height, fill)
         return state
 
     
     @staticmethod
-    def create_messy_root(width=45, height=25):
+    def create_messy_root(width=45, height=25, board_type=None):
         '''Create a state with a random board.'''
-        return State.create_root(width, height, fill='random')
+        return State.create_root(width, height, fill='random',
+                                 board_type=board_type)
     
 
     def step_generator(self, birth=[3], survival=[2, 3], randomness=0):
@@ -87,19 +95,63 @@ class State(garlicsim.data_structures.State):
         respectively.
         '''
         old_board = self.board
-        new_board = Board(parent=old_board,
-                          birth=birth,
-                          survival=survival,
-                          randomness=randomness)
+        new_board = type(old_board)(parent=old_board,
+                                    birth=birth,
+                                    survival=survival,
+                                    randomness=randomness)
         new_state = State()
         new_state.board = new_board
         return new_state
     
     
+    def diff(self, old_state):
+        '''
+        Get a delta saying which cells differ from `old_state`'s board.
+        
+        This lets the tree store states as deltas, (see `Tree.store_deltas`,)
+        since only a few cells change in each step.
+        '''
+        return self.board.diff(old_state.board)
+    
+    
+    def patch(self, delta):
+        '''Create a new state by flipping the cells listed in `delta`.'''
+        state = State()
+        state.board = self.board.patch(delta)
+        return state
+    
+    
+    def dump_payload(self):
+        '''
+        Get the board's cells as a payload for sending through shared memory.
+        
+        This lets `ProcessCruncher` send the state without pickling it. (See
+        `State`.)
+        '''
+        (payload, board_rest) = self.board.dump_payload()
+        return (payload, (type(self.board), board_rest))
+    
+    
+    @classmethod
+    def load_payload(cls, payload, rest):
+        '''Create a state from the output of `dump_payload`.'''
+        (board_type, board_rest) = rest
+        state = cls()
+        state.board = board_type.load_payload(payload, board_rest)
+        return state
+    
+    
+    def __state_copy__(self, memo):
+        '''Copy the state, copying only the board. (See `State`.)'''
+        new_state = copy.copy(self)
+        new_state.board = self.board.copy()
+        return new_state
+    
+    
     @garlicsim.general_misc.caching.cache()
     def get_n_live_cells(self):
         '''Return how many live cells there are in the board.'''
-        return self.board._Board__list.count(True)
+        return self.board.get_n_live_cells()
 
     def __repr__(self):
         return self.board.__repr__()
@@ -112,12 +164,7 @@ class State(garlicsim.data_structures.State):
     
     def __sub__(self, other): # todo: experimental, test
         if isinstance(other, State):
-            return sum(
-                (x-y) for (x, y) in itertools.izip(
-                    self.board._Board__list,
-                    other.board._Board__list
-                )
-            )
+            return self.get_n_live_cells() - other.get_n_live_cells()
                 
         else:
             return NotImplemented
@@ -180,6 +227,46 @@ class Board(object):
         self.__list[ (x%self.width) * self.height + (y%self.height) ] = value
 
         
+    def get_cells(self):
+        '''
+        Get a list of all the cells, by `x` and then by `y`.
+        
+        Don't change it.
+        '''
+        return self.__list
+    
+    
+    def get_n_live_cells(self):
+        '''Return how many live cells there are in the board.'''
+        return self.__list.count(True)
+    
+    
+    def diff(self, old_board):
+        '''Get the indices of the cells that differ from `old_board`.'''
+        return [
+            i for (i, (cell, old_cell)) in
+            enumerate(itertools.izip(self.__list, old_board.__list))
+            if cell != old_cell
+        ]
+    
+    
+    def copy(self):
+        '''Create a new board with the same cells.'''
+        board = Board.__new__(Board)
+        board.width, board.height = (self.width, self.height)
+        board.__list = self.__list[:]
+        return board
+    
+    
+    def patch(self, delta):
+        '''Create a new board by flipping the cells listed in `delta`.'''
+        board = self.copy()
+        cells = board.__list
+        for i in delta:
+            cells[i] = not cells[i]
+        return board
+        
+        
     def get_live_neighbors_count(self, x, y):
         '''Get the number of live neighbors a cell has.'''
         result = 0
@@ -219,15 +306,51 @@ class Board(object):
 
     
     def __eq__(self, other):
-        return isinstance(other, Board) and self.__list == other.__list
+        return isinstance(other, Board) and \
+               self.get_cells() == other.get_cells()
     
     
     def __ne__(self, other):
         return not self.__eq__(other)
     
+    
+    def dump_payload(self):
+        '''Get the cells packed in bits, and the size of the board.'''
+        return (_pack_cells(self.__list).tostring(), (self.width, self.height))
+    
+    
+    @classmethod
+    def load_payload(cls, payload, size):
+        '''Create a board from the output of `dump_payload`.'''
+        (width, height) = size
+        packed_cells = array.array('B')
+        packed_cells.fromstring(payload)
+        board = Board.__new__(Board)
+        board.width, board.height = (width, height)
+        board.__list = _unpack_cells(packed_cells, width * height)
+        return board
+    
+    
+    def __getstate__(self):
+        # Pickling the cells packed in bits, which makes them much smaller
+        # when sent to a cruncher process or saved with the project:
+        return {'width': self.width, 'height': self.height,
+                'packed_cells': _pack_cells(self.__list).tostring()}
+    
+    
+    def __setstate__(self, board_state):
+        board_state = dict(board_state)
+        if 'packed_cells' in board_state:
+            packed_cells = board_state.pop('packed_cells')
+            self.__dict__.update(board_state)
+            self.__list = _unpack_cells(array.array('B', packed_cells),
+                                        self.width * self.height)
+        else: # Pickled by an older version, with the cells in a list.
+            self.__dict__.update(board_state)
+    
             
-    @staticmethod
-    def create_diehard(width=45, height=25):
+    @classmethod
+    def create_diehard(cls, width=45, height=25):
         '''
         Create the Diehard Metushelah.
         
@@ -238,12 +361,163 @@ class Board(object):
               #   ###
 
         '''
-        board = Board(width, height)
+        board = cls(width, height)
         (x, y) = (width//2, height//2)
         for (i, j) in [(6, 0), (0, 1), (1, 1), (1, 2), (5, 2), (6, 2), (7, 2)]:
             board.set(x + i, y + j, True)
             
         return board
+    
+    
+class PackedBoard(Board):
+    '''
+    A Life board that keeps its cells packed in bits, to save memory.
+    
+    `Board` keeps its cells in a list, which takes 8 bytes per cell for the
+    pointers, while this board takes 1 bit per cell, so a 1000x1000 board
+    takes about 125 KB. Pass it as the `board_type` when creating a root state,
+    and all the states that descend from it will use it. Computing generations
+    takes about as long as with `Board`, since it unpacks the parent's cells
+    and computes the next generation like `Board` does.
+    '''
+    
+    def __init__(self, width=None, height=None, fill='empty', parent=None,
+                 birth=[3], survival=[2, 3], randomness=0):
+        '''
+        Constructor.
+        
+        If `parent` is specified, makes a board which is descendent from the
+        parent.
+        '''
+        if parent:
+            assert width == height == None
+            unpacked_parent = Board(parent.width, parent.height)
+            unpacked_parent._Board__list = parent.get_cells()
+            board = Board(parent=unpacked_parent, birth=birth,
+                          survival=survival, randomness=randomness)
+        else:
+            board = Board(width, height, fill)
+        
+        self.width, self.height = (board.width, board.height)
+        self.__packed_cells = _pack_cells(board.get_cells())
+        
+        
+    def get(self, x, y):
+        '''Get the value of cell `(x, y)` in the board.'''
+        i = (x % self.width) * self.height + (y % self.height)
+        return bool(self.__packed_cells[i >> 3] & (1 << (i & 7)))
+
+    
+    def set(self, x, y, value):
+        '''
+        Set the value of cell `(x, y)` in the board to the specified value.
+        '''
+        i = (x % self.width) * self.height + (y % self.height)
+        if value:
+            self.__packed_cells[i >> 3] |= 1 << (i & 7)
+        else:
+            self.__packed_cells[i >> 3] &= ~(1 << (i & 7)) & 0xff
+            
+            
+    def get_cells(self):
+        '''Get a list of all the cells, by `x` and then by `y`.'''
+        return _unpack_cells(self.__packed_cells, self.width * self.height)
+    
+    
+    def get_n_live_cells(self):
+        '''Return how many live cells there are in the board.'''
+        return sum(_n_bits_by_byte[byte] for byte in self.__packed_cells)
+    
+    
+    def diff(self, old_board):
+        '''Get the indices of the cells that differ from `old_board`.'''
+        delta = []
+        for (i, (byte, old_byte)) in enumerate(
+            itertools.izip(self.__packed_cells, old_board.__packed_cells)):
+            if byte != old_byte:
+                changed_bits = byte ^ old_byte
+                delta.extend(8 * i + j for j in xrange(8)
+                             if changed_bits & (1 << j))
+        return delta
+    
+    
+    def copy(self):
+        '''Create a new board with the same cells.'''
+        board = PackedBoard.__new__(PackedBoard)
+        board.width, board.height = (self.width, self.height)
+        board.__packed_cells = self.__packed_cells[:]
+        return board
+    
+    
+    def patch(self, delta):
+        '''Create a new board by flipping the cells listed in `delta`.'''
+        board = self.copy()
+        packed_cells = board.__packed_cells
+        for i in delta:
+            packed_cells[i >> 3] ^= 1 << (i & 7)
+        return board
+    
+    
+    def __eq__(self, other):
+        if isinstance(other, PackedBoard):
+            return self.__packed_cells == other.__packed_cells
+        return Board.__eq__(self, other)
+    
+    
+    def dump_payload(self):
+        '''Get the packed cells, and the size of the board.'''
+        return (self.__packed_cells.tostring(), (self.width, self.height))
+    
+    
+    @classmethod
+    def load_payload(cls, payload, size):
+        '''Create a board from the output of `dump_payload`.'''
+        (width, height) = size
+        board = PackedBoard.__new__(PackedBoard)
+        board.width, board.height = (width, height)
+        board.__packed_cells = array.array('B')
+        board.__packed_cells.fromstring(payload)
+        return board
+    
+    
+    def __getstate__(self):
+        return {'width': self.width, 'height': self.height,
+                'packed_cells': self.__packed_cells.tostring()}
+    
+    
+    def __setstate__(self, board_state):
+        self.width, self.height = (board_state['width'],
+                                   board_state['height'])
+        self.__packed_cells = array.array('B', board_state['packed_cells'])
+        
+        
+_bits_by_byte = [tuple(bool(byte & (1 << i)) for i in xrange(8))
+                 for byte in xrange(256)]
+'''The 8 cells that each byte value stands for, in the packed form.'''
+
+_bytes_by_bits = dict((bits, byte) for (byte, bits) in enumerate(_bits_by_byte))
+'''The byte value that stands for each 8 cells, in the packed form.'''
+
+_n_bits_by_byte = [bits.count(True) for bits in _bits_by_byte]
+'''The number of live cells that each byte value stands for.'''
+
+
+def _pack_cells(cells):
+    '''Pack a list of cells into an array of bytes, 8 cells in each byte.'''
+    padded_cells = itertools.chain(cells, [False] * (-len(cells) % 8))
+    return array.array(
+        'B',
+        [_bytes_by_bits[bits] for bits in itertools.izip(*[padded_cells] * 8)]
+    )
+
+
+def _unpack_cells(packed_cells, n_cells):
+    '''Unpack an array of bytes made by `_pack_cells` into a list of cells.'''
+    cells = list(itertools.chain(
+        *[_bits_by_byte[byte] for byte in packed_cells]
+    ))
+    del cells[n_cells:]
+    return cells
 
 
 
@@ -53,6 +53,16 @@ class BasePlayer(identities.HasIdentity):
         '''
         
     
+    make_moves = None
+    # Optional hook for playing in a `PlayerBatch`, which keeps a big population
+    # of players in arrays instead of as player objects. To use it, implement
+    # `make_moves(round, opponents_last_moves)` as a static method that decides
+    # the moves of many players of this type at once. `opponents_last_moves`
+    # is a NumPy array of booleans, the moves their opponents made in the last
+    # round, (meaningless on round 0,) and it should return an array of their
+    # moves, or a single boolean if they all make the same move.
+    
+    
     def other_player_played(self, move):
         '''
         The other player played `move` in the last round.
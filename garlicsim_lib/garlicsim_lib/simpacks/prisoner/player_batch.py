@@ -0,0 +1,142 @@
+# Copyright 2009-2011 Ram Rachum.
+# This program is distributed under the LGPL2.1 license.
+
+'''
+This module defines the `PlayerBatch` class.
+
+See its documentation for more information. This module requires NumPy.
+'''
+
+import copy
+
+import numpy
+
+from .players import player_types_list
+
+
+payoffs = numpy.array([[-1, 2],
+                       [-4, 1]])
+'''
+The points a player gets in a game, indexed by `[its_move, opponents_move]`.
+
+These are the same as in `BasePlayer.play_game`.
+'''
+
+
+class PlayerBatch(object):
+    '''
+    A big population of players, kept in NumPy arrays instead of as objects.
+
+    A state that has a player batch instead of a list of players plays all the
+    games of a round at once: Each player type decides the moves of all of its
+    players with one call to its `make_moves` hook, (see `BasePlayer`,) and
+    the points of all the games are found in one array operation. Each player
+    is known by its index in the arrays.
+
+    All the player types must implement `make_moves`.
+    '''
+
+    def __init__(self, n_players, random_types=False,
+                 player_types=player_types_list):
+        '''
+        Constructor.
+
+        The players' types are taken from `player_types` in turn, or at random
+        if `random_types` is set to `True`.
+        '''
+        assert all(player_type.make_moves is not None for player_type in
+                   player_types)
+        if n_players % 2 != 0:
+            raise Exception("Can't pair an odd number of players.")
+
+        self.player_types = list(player_types)
+        '''The player types, which the players' types are indices to.'''
+
+        if random_types:
+            type_indices = numpy.random.randint(0, len(player_types),
+                                                n_players)
+        else:
+            type_indices = numpy.arange(n_players) % len(player_types)
+
+        self.type_indices = type_indices
+        '''The index in `.player_types` of each player's type.'''
+
+        self.points = numpy.zeros(n_players, dtype=int)
+        '''The number of points that each player has.'''
+
+        self.opponents = numpy.arange(n_players)
+        '''The index of each player's opponent in the current match.'''
+
+        self.opponents_last_moves = numpy.ones(n_players, dtype=bool)
+        '''The move each player's opponent made in the last round.'''
+
+        self.players_by_type = None
+        '''
+        The indices of the players of each type, in order of `.player_types`.
+        '''
+
+
+    def copy(self):
+        '''Create a new player batch with the same players.'''
+        player_batch = copy.copy(self)
+        # The other arrays are replaced rather than changed, so they may be
+        # shared:
+        player_batch.type_indices = self.type_indices.copy()
+        player_batch.points = self.points.copy()
+        player_batch.opponents = self.opponents.copy()
+        return player_batch
+
+
+    def prepare_for_new_match(self, replace_loser=True):
+        '''
+        Pair the players randomly for a new match.
+
+        If `replace_loser` is set to `True`, the player with the least points
+        will be replaced with a player from a random player type.
+        '''
+        if replace_loser:
+            loser = self.get_player_with_least_points()
+            self.type_indices[loser] = \
+                numpy.random.randint(0, len(self.player_types))
+            self.points[loser] = 0
+
+        self.players_by_type = [
+            numpy.flatnonzero(self.type_indices == i) for i in
+            xrange(len(self.player_types))
+        ]
+
+        shuffled_players = numpy.random.permutation(len(self.points))
+        (first_players, second_players) = (shuffled_players[0::2],
+                                           shuffled_players[1::2])
+        self.opponents[first_players] = second_players
+        self.opponents[second_players] = first_players
+
+
+    def play_round(self, round):
+        '''Have all the players play a game against their opponents.'''
+        moves = numpy.empty(len(self.points), dtype=bool)
+        for (player_type, players) in zip(self.player_types,
+                                          self.players_by_type):
+            moves[players] = player_type.make_moves(
+                round,
+                self.opponents_last_moves[players]
+            )
+        opponents_moves = moves[self.opponents]
+        self.points += payoffs[moves.astype(int), opponents_moves.astype(int)]
+        self.opponents_last_moves = opponents_moves
+
+
+    def get_player_with_least_points(self):
+        '''Get the index of the player which has the lowest number of points.'''
+        return int(numpy.argmin(self.points))
+
+
+    def get_n_players_of_given_type(self, player_type):
+        '''Get the number of existing players of the type `player_type`.'''
+        n_players_by_type = numpy.bincount(self.type_indices,
+                                           minlength=len(self.player_types))
+        return int(sum(
+            n_players for (some_player_type, n_players) in
+            zip(self.player_types, n_players_by_type) if
+            issubclass(some_player_type, player_type)
+        ))
@@ -18,3 +18,9 @@ class Angel(BasePlayer):
     def make_move(self, round):
         '''Play nice.'''
         return True
+    
+    
+    @staticmethod
+    def make_moves(round, opponents_last_moves):
+        '''Play nice, for many players at once.'''
+        return True
@@ -17,4 +17,10 @@ class Devil(BasePlayer):
     
     def make_move(self, round):
         '''Play mean.'''
+        return False
+    
+    
+    @staticmethod
+    def make_moves(round, opponents_last_moves):
+        '''Play mean, for many players at once.'''
         return False
\ No newline at end of file
@@ -36,4 +36,13 @@ class TitForTat(BasePlayer):
     def other_player_played(self, move):
         '''Save the opponent's move so we can do the same on the next round.'''
         self.last_play = move
+        
+        
+    @staticmethod
+    def make_moves(round, opponents_last_moves):
+        '''Play nice on 1st round, afterwards imitate opponents, for many.'''
+        if round == 0:
+            return True
+        else:
+            return opponents_last_moves
 
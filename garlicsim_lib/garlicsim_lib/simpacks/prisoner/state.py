@@ -8,6 +8,7 @@ See its documentation for more information.
 '''
 
 
+import copy
 import random
 
 from garlicsim.general_misc import random_tools
@@ -15,6 +16,7 @@ from garlicsim.general_misc.infinity import infinity
 
 
 import garlicsim.data_structures
+from garlicsim.misc.state_deepcopy import copy_attributes
 
 from .player_type import PlayerType
 from .base_player import BasePlayer
@@ -29,9 +31,10 @@ class State(garlicsim.data_structures.State):
         Constructor.
         
         `players` is a list of players, i.e. instances of `BasePlayer`, that
-        will play against each other. `round` is the round number, with `-1`
-        being the preparation pseudo-round. `match` is the match number.
-        `n_rounds` is the number of rounds in a match.
+        will play against each other, or a `PlayerBatch` for big populations.
+        `round` is the round number, with `-1` being the preparation
+        pseudo-round. `match` is the match number. `n_rounds` is the number of
+        rounds in a match.
         '''
         
         assert -1 <= round <= (n_rounds - 1)
@@ -47,9 +50,19 @@ class State(garlicsim.data_structures.State):
         self.match = match
         '''The match number, going from `0` to infinity.'''
         
-        assert all(isinstance(player, BasePlayer) for player in players)
-        self.players = players
-        '''The list of players that play against each other.'''
+        is_batch = not isinstance(players, list)
+        assert is_batch or \
+               all(isinstance(player, BasePlayer) for player in players)
+        
+        self.players = None if is_batch else players
+        '''
+        The list of players that play against each other.
+        
+        This is `None` when the players are in `.player_batch`.
+        '''
+        
+        self.player_batch = players if is_batch else None
+        '''The `PlayerBatch` that plays instead of `.players`, if any.'''
         
         assert n_rounds >= 1
         self.n_rounds = n_rounds
@@ -57,25 +70,39 @@ class State(garlicsim.data_structures.State):
         
     
     @staticmethod
-    def create_root(n_players=70, n_rounds=7):
-        '''Create a plain and featureless world state.'''
-        state = State(
-            players=[player_types_list[i % len(player_types_list)]() for i
-                     in xrange(n_players)],
-            n_rounds=n_rounds
-        )
+    def create_root(n_players=70, n_rounds=7, batch=False):
+        '''
+        Create a plain and featureless world state.
+        
+        If `batch` is set to `True`, the players are kept in a `PlayerBatch`,
+        which is much faster for big populations but requires NumPy.
+        '''
+        if batch:
+            from .player_batch import PlayerBatch
+            players = PlayerBatch(n_players)
+        else:
+            players = [player_types_list[i % len(player_types_list)]() for i
+                       in xrange(n_players)]
+        state = State(players=players, n_rounds=n_rounds)
         state._prepare_for_new_match(replace_loser=False)
         return state
     
     
     @staticmethod
-    def create_messy_root(n_players=70, n_rounds=7):
-        '''Create a random and messy world state.'''
-        state = State(
-            players=[PlayerType.create_player_of_random_type() for i
-                     in xrange(n_players)],
-            n_rounds=n_rounds
-        )
+    def create_messy_root(n_players=70, n_rounds=7, batch=False):
+        '''
+        Create a random and messy world state.
+        
+        If `batch` is set to `True`, the players are kept in a `PlayerBatch`,
+        which is much faster for big populations but requires NumPy.
+        '''
+        if batch:
+            from .player_batch import PlayerBatch
+            players = PlayerBatch(n_players, random_types=True)
+        else:
+            players = [PlayerType.create_player_of_random_type() for i
+                       in xrange(n_players)]
+        state = State(players=players, n_rounds=n_rounds)
         state._prepare_for_new_match(replace_loser=False)
         return state
     
@@ -92,10 +119,31 @@ class State(garlicsim.data_structures.State):
             self._prepare_for_new_match()
             return
     
+        if self.player_batch is not None:
+            self.player_batch.play_round(self.round)
+            return
+            
         for player_1, player_2 in self.player_pairs:
             BasePlayer.play_game(player_1, player_2, self.round)
     
     
+    def __state_copy__(self, memo):
+        '''Copy the state, copying the players quickly. (See `State`.)'''
+        new_state = copy.copy(self)
+        if self.player_batch is not None:
+            new_state.player_batch = self.player_batch.copy()
+            return new_state
+        
+        new_players = dict((player, copy_attributes(player, memo)) for player
+                           in self.players)
+        new_state.players = [new_players[player] for player in self.players]
+        new_state.player_pairs = [
+            tuple(new_players[player] for player in player_pair) for
+            player_pair in self.player_pairs
+        ]
+        return new_state
+    
+    
     def _prepare_for_new_match(self, replace_loser=True):
         '''
         Prepare a state with a `.round` of `-1` for the new match.
@@ -110,6 +158,10 @@ class State(garlicsim.data_structures.State):
         '''
         assert self.round == -1
         
+        if self.player_batch is not None:
+            self.player_batch.prepare_for_new_match(replace_loser)
+            return
+        
         if replace_loser:
             loser = self.get_player_with_least_points()
             self.players.remove(loser)
@@ -119,12 +171,20 @@ class State(garlicsim.data_structures.State):
         
         
     def get_player_with_least_points(self):
-        '''Get the player which has the lowest number of points.'''
+        '''
+        Get the player which has the lowest number of points.
+        
+        If the players are in a `PlayerBatch`, get the player's index in it.
+        '''
+        if self.player_batch is not None:
+            return self.player_batch.get_player_with_least_points()
         return min(self.players, key=lambda player: player.points)
 
     
     def get_n_players_of_given_type(self, player_type):
         '''Get the number of existing players of the type `player_type`.'''
+        if self.player_batch is not None:
+            return self.player_batch.get_n_players_of_given_type(player_type)
         return len([player for player in self.players
                     if isinstance(player, player_type)])
 
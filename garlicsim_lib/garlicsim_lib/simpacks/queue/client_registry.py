@@ -0,0 +1,119 @@
+# Copyright 2009-2011 Ram Rachum.
+# This program is distributed under the LGPL2.1 license.
+
+'''
+This module defines the `ClientRegistry` class.
+
+See its documentation for more information.
+'''
+
+from garlicsim.general_misc.third_party import abcs_collection
+
+from garlicsim.misc import CopyOnWrite
+
+
+class ClientRegistry(CopyOnWrite, abcs_collection.MutableMapping):
+    '''
+    Dict-like registry mapping clients to the indices of their servers.
+
+    The clients are kept in several small dicts, by their hashes, and a copy
+    of the registry shares them until they're changed. (See `CopyOnWrite`.)
+    So changing a copy costs in proportion to the size of one small dict,
+    rather than copying the whole registry.
+
+    The order of the clients is arbitrary.
+    '''
+
+    n_buckets = 64
+    '''The number of small dicts that the clients are kept in.'''
+
+    def __init__(self, items=()):
+        CopyOnWrite.__init__(self)
+
+        self.buckets = [{} for i in xrange(self.n_buckets)]
+        '''List of the small dicts that the clients are kept in.'''
+
+        self.own_bucket_indices = set(xrange(self.n_buckets))
+        '''
+        Indices of the buckets that aren't shared with a copy.
+
+        When the list of buckets is copied, this is emptied.
+        '''
+
+        self.n_clients = 0
+        '''The number of clients in the registry.'''
+
+        self.update(items)
+
+
+    def __get_writable_bucket(self, client):
+        '''Get the bucket of `client`, making sure it's safe to change.'''
+        old_buckets = self.buckets
+        buckets = self.get_writable('buckets')
+        if buckets is not old_buckets:
+            self.own_bucket_indices = set()
+        index = hash(client) % self.n_buckets
+        if index not in self.own_bucket_indices:
+            buckets[index] = buckets[index].copy()
+            self.own_bucket_indices.add(index)
+        return buckets[index]
+
+
+    def __rebucket(self):
+        '''
+        Put the clients in the right buckets by their hashes.
+
+        This is needed after the registry is copied with `deepcopy` or
+        pickled, since the copies of the clients have other hashes.
+        '''
+        buckets = [{} for i in xrange(self.n_buckets)]
+        for bucket in self.buckets:
+            for (client, server_index) in bucket.iteritems():
+                buckets[hash(client) % self.n_buckets][client] = server_index
+        self.__dict__['buckets'] = buckets
+        self.__dict__['own_bucket_indices'] = set(xrange(self.n_buckets))
+
+
+    def __deepcopy__(self, memo):
+        new_registry = CopyOnWrite.__deepcopy__(self, memo)
+        new_registry.__rebucket()
+        return new_registry
+
+
+    def __setstate__(self, my_dict):
+        self.__dict__.update(my_dict)
+        self.__rebucket()
+
+
+    def __getitem__(self, client):
+        return self.buckets[hash(client) % self.n_buckets][client]
+
+
+    def __setitem__(self, client, server_index):
+        bucket = self.__get_writable_bucket(client)
+        if client not in bucket:
+            self.n_clients += 1
+        bucket[client] = server_index
+
+
+    def __delitem__(self, client):
+        del self.__get_writable_bucket(client)[client]
+        self.n_clients -= 1
+
+
+    def __contains__(self, client):
+        return client in self.buckets[hash(client) % self.n_buckets]
+
+
+    def __iter__(self):
+        for bucket in self.buckets:
+            for client in bucket:
+                yield client
+
+
+    def __len__(self):
+        return self.n_clients
+
+
+    def __repr__(self):
+        return '<%s with %s clients>' % (type(self).__name__, len(self))
@@ -11,18 +11,30 @@ See its documentation for more information.
 class Event(object):
     '''
     An event which will happen in the future.
-    
-    An event has a `.time_left` property, saying how much time there is until
-    the event happens, and an `.action` property which gets called when the
-    event happens.
+
+    An event has a `.time` attribute, saying at which time of its event set it
+    will happen, and an `.action` property which gets called when the event
+    happens.
+
+    Events don't change after they're created, so an event set and its copies
+    share them. (See `CopyOnWrite`.) That's why an event can't tell how much
+    time there is until it happens, since that's different in each copy of the
+    event set; Use `EventSet.get_time_left` for that, e.g.
+    `state.event_set.get_time_left(event)`.
     '''
-    
-    def __init__(self, time_left, action):
-        assert time_left > 0
-        self.time_left = time_left
+
+    def __init__(self, time, action):
+        self.time = time
         self.action = action
-        self.done = False
 
-        
-    def _get_time_left(self):
-        return self.time_left
\ No newline at end of file
+
+    @property
+    def time_left(self):
+        '''Removed; Use `EventSet.get_time_left` instead.'''
+        raise AttributeError(
+            "`Event.time_left` was removed, because events are shared between "
+            "copies of event sets, whose times differ. Use "
+            "`event_set.get_time_left(event)` with the event set of your "
+            "state instead."
+        )
+
@@ -7,15 +7,33 @@ This module defines the `EventSet` class.
 See its documentation for more information.
 '''
 
+import heapq
+
+from garlicsim.misc import CopyOnWrite
+
 from .event import Event
 
 
-class EventSet(object):
+class EventSet(CopyOnWrite):
     '''A set of events that happen in the same "world".'''
     
     def __init__(self):
+        CopyOnWrite.__init__(self)
+        
+        self.time = 0
+        '''The current time, which the times of the events are relative to.'''
+        
         self.events = []
-        '''Sorted list of all the events in the system.'''
+        '''
+        Heap of all the events in the system.
+        
+        Its items are tuples of `(time, serial_number, event)`. The serial
+        numbers make events that are scheduled to the same time happen in the
+        order in which they were created.
+        '''
+        
+        self.n_created_events = 0
+        '''The number of events created so far, used as serial numbers.'''
     
         
     def create_event(self, time_left, action):
@@ -24,29 +42,37 @@ class EventSet(object):
 
         Returns the new event.
         '''
-        event = Event(time_left, action)
+        assert time_left > 0
+        event = Event(self.time + time_left, action)
         
-        self.events.append(event)
-        self.events.sort(key=Event._get_time_left)
+        heapq.heappush(self.get_writable('events'),
+                       (event.time, self.n_created_events, event))
+        self.n_created_events += 1
         
         return event
+    
+    
+    def get_time_left(self, event):
+        '''Get how much time there is until `event` happens.'''
+        return event.time - self.time
 
     
-    def do_next_event(self):
+    def do_next_event(self, *args, **kwargs):
         '''
         Pass the time until the closest pending event(s), making them happen.
         
-        Return the amount of time that was passed.
+        Any arguments are passed to the event's action. Return the amount of
+        time that was passed.
         '''
         if not self.events:
             raise Exception('No pending events.')
             
-        closest_event = self.events.pop(0)
+        (time, serial_number, closest_event) = \
+            heapq.heappop(self.get_writable('events'))
         
-        for event in self.events:
-            event.time_left -= closest_event.time_left
+        time_passed = time - self.time
+        self.time = time
             
-        closest_event.action()
+        closest_event.action(*args, **kwargs)
         
-        return closest_event.time_left
-    
\ No newline at end of file
+        return time_passed
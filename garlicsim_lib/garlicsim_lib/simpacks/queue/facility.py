@@ -7,59 +7,99 @@ This module defines the `Server` class.
 See its documentation for more information.
 '''
 
+import heapq
+import collections
+
 from garlicsim.general_misc import identities
 
 import garlicsim
+from garlicsim.misc import CopyOnWrite
 from .server import Server
+from .client_registry import ClientRegistry
 
 
-class Facility(identities.HasIdentity):
+class Facility(CopyOnWrite, identities.HasIdentity):
     '''A facility in which there are servers serving clients.'''
     
-    def __init__(self, event_set, servers=[], clients=[]):
-        identities.HasIdentity.__init__(self)
-        
-        self.event_set = event_set
+    def __init__(self, event_set=None, servers=(), clients=()):
         '''
-        An event set for events such as servers finishing or clients arriving.
+        Constructor.
+        
+        Each of the `servers` must have its index in `servers` as its `.index`.
+        The `clients` are put in the queue.
+        
+        `event_set` is accepted for compatibility with older versions, and
+        isn't kept; the methods that schedule events get it as an argument,
+        so the facility could be copied separately from it. (See `State`.)
         '''
+        CopyOnWrite.__init__(self)
+        identities.HasIdentity.__init__(self)
         
-        self.servers = servers
+        self.servers = list(servers)
         '''List of all the servers in the facility.'''
         
-        self.clients = clients
+        self.waiting_clients = collections.deque(clients)
+        '''Line of all the clients waiting in the queue.'''
+        
+        self.clients = ClientRegistry(dict.fromkeys(self.waiting_clients))
+        '''
+        Registry of all the clients, both those getting served and those on
+        queue.
+        
+        It's a dict-like `ClientRegistry` mapping each client to the index of
+        the server serving it, or to `None` if it's waiting in the queue.
+        '''
+        
+        self.idle_server_indices = []
         '''
-        List of all the clients, both those getting served and those on queue.
+        Heap of the indices of the idle servers.
+        
+        We keep it so we won't have to look through all the servers to find an
+        idle one. The server with the lowest index gets the next client.
         '''
         
-        self.waiting_clients = clients[:]
-        '''List of all the clients waiting in the queue.'''
+        self.n_finished_clients = 0
+        '''The number of clients that were served by all servers.'''
+        
+        for server in self.servers:
+            self.__register_server(server)
+        
+        
+    def __register_server(self, server):
+        '''Register a server that was just put in `.servers`.'''
+        assert self.servers[server.index] is server
+        self.n_finished_clients += server.client_counter
+        if server.is_busy():
+            self.get_writable('clients')[server.current_client] = server.index
+        else:
+            heapq.heappush(self.get_writable('idle_server_indices'),
+                           server.index)
         
         
     def create_server(self, mean_service_time):
         '''Create a new server for this facility.'''
+        servers = self.get_writable('servers')
         new_server = Server(
-            event_set=self.event_set,
             facility=self,
             mean_service_time=mean_service_time
         )
-        self.servers.append(new_server)
+        servers.append(new_server)
+        self.__register_server(new_server)
         return new_server
-
     
-    def add_client(self, client):
+    
+    def add_client(self, client, event_set):
         '''Add a new client to this facility, to be served by a server.'''
-        self.clients.append(client)
-        if not self.waiting_clients: # Queue is empty, no waiting clients
-            # If there's an idle server, have it service the new client:
-            idle_servers = list(self.idle_servers_generator())
-            if idle_servers:
-                first_idle_server = idle_servers[0]
-                first_idle_server.service_client(client)
-            else:
-                self.waiting_clients.append(client)
-        else: # There are clients awaiting in the queue
-            self.waiting_clients.append(client)
+        if not self.waiting_clients and self.idle_server_indices:
+            first_idle_server_index = \
+                heapq.heappop(self.get_writable('idle_server_indices'))
+            first_idle_server = \
+                self.get_writable_item('servers', first_idle_server_index)
+            first_idle_server.service_client(client, event_set)
+            self.get_writable('clients')[client] = first_idle_server_index
+        else:
+            self.get_writable('waiting_clients').append(client)
+            self.get_writable('clients')[client] = None
             
             
     def idle_servers_generator(self):
@@ -69,21 +109,38 @@ class Facility(identities.HasIdentity):
                 yield server
             
             
-    def feed_client(self, server):
+    def feed_client(self, server, event_set):
         '''
         Order a server to start servicing the first client in the queue.
         
-        The server must be idle.
+        The server must be idle, and writable. (See `CopyOnWrite`.) If there
+        are no clients waiting, it's marked as idle, to get the next client
+        that arrives.
         '''
         assert not server.is_busy()
         if self.waiting_clients:
-            client = self.waiting_clients.pop(0)
-            server.service_client(client)
+            client = self.get_writable('waiting_clients').popleft()
+            server.service_client(client, event_set)
+            self.get_writable('clients')[client] = server.index
+        else:
+            heapq.heappush(self.get_writable('idle_server_indices'),
+                           server.index)
+            
+            
+    def finish_service(self, server_index, event_set):
+        '''
+        Have a server finish serving its client, and feed it the next one.
+        '''
+        server = self.get_writable_item('servers', server_index)
+        client = server.finish_client()
+        del self.get_writable('clients')[client]
+        self.n_finished_clients += 1
+        self.feed_client(server, event_set)
         
     
     def finished_client_count(self):
         '''Return the number of clients that were served by all servers.'''
-        return sum((server.client_counter for server in self.servers))
+        return self.n_finished_clients
         
     
     def __repr__(self):
@@ -98,4 +155,4 @@ class Facility(identities.HasIdentity):
         
                     
 
- 
\ No newline at end of file
+ 
@@ -10,20 +10,28 @@ See its documentation for more information.
 from garlicsim.general_misc.infinity import infinity
 from garlicsim.general_misc import identities
 import garlicsim
+from garlicsim.misc import CopyOnWrite
 
 from . import math_tools
 
 from .client import Client
 
 
-class Population(identities.HasIdentity):
+class Population(CopyOnWrite, identities.HasIdentity):
     '''A population which generates clients.'''
-    def __init__(self, event_set, facility, size=infinity, mean_arrival_time=1):
+    def __init__(self, event_set, facility=None, size=infinity,
+                 mean_arrival_time=1):
         '''
         Constructor.
         
-        `mean_arrival_time` is the mean time between arrivals.
+        `mean_arrival_time` is the mean time between arrivals. The first
+        arrival is scheduled in `event_set`.
+        
+        `facility` is accepted for compatibility with older versions, and
+        isn't kept; the clients are put in the facility of the state where
+        they arrive. (See `State`.)
         '''
+        CopyOnWrite.__init__(self)
         identities.HasIdentity.__init__(self)
         if not (size == infinity):
             raise NotImplementedError
@@ -40,32 +48,33 @@ class Population(identities.HasIdentity):
         self.mean_arrival_time = mean_arrival_time
         '''The mean time between arrivals of clients.'''
         
-        self.event_set = event_set
-        '''Event set for events such as new clients arriving.'''
-        
-        self.facility = facility
-        '''The facility in which clients are served.'''
-        
         self.next_arrival = None
         '''The event of the next arrival.'''
         
-        self.schedule_next_arrival()
+        self.schedule_next_arrival(event_set)
         
         
-    def schedule_next_arrival(self):
+    def schedule_next_arrival(self, event_set):
         '''Schedule the next arrival of a client from the population.'''
         assert self.next_arrival is None
-        self.next_arrival = self.event_set.create_event(
+        self.next_arrival = event_set.create_event(
             math_tools.time_for_next_occurence(self.mean_arrival_time),
-            self.make_arrival
+            _make_arrival
         )
     
         
-    def make_arrival(self):
+    def make_arrival(self, facility, event_set):
         '''Create a client and put it into the facility.'''
         client = Client()
-        self.facility.add_client(client)
+        facility.add_client(client, event_set)
         self.next_arrival = None
-        self.schedule_next_arrival()
+        self.schedule_next_arrival(event_set)
         return client
 
+    
+def _make_arrival(state):
+    '''Event action for a client arriving from the population.'''
+    state.get_writable('population').make_arrival(
+        state.get_writable('facility'),
+        state.get_writable('event_set')
+    )
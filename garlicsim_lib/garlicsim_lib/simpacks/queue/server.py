@@ -7,28 +7,41 @@ This module defines the `Server` class.
 See its documentation for more information.
 '''
 
+import functools
+
 from garlicsim.general_misc import identities
 import garlicsim
+from garlicsim.misc import CopyOnWrite
 
 from . import math_tools
 
 
-class Server(identities.HasIdentity):
+class Server(CopyOnWrite, identities.HasIdentity):
     '''A server which serves clients in a facility.'''
     
-    def __init__(self, event_set, facility, mean_service_time):
+    def __init__(self, event_set=None, facility=None, mean_service_time=3,
+                 index=None):
         '''
         Constructor.
         
         `mean_service_time` is the mean time it takes to service a client.
+        `index` is the server's index in its facility's list of servers; if
+        it's not given, it's the index that the server gets when it's appended
+        to the `.servers` of `facility`.
+        
+        `event_set` and `facility` aren't kept, since the facility may be
+        copied separately from its servers; (see `State`;) the methods that
+        need them get them as arguments. They're accepted for compatibility
+        with older versions.
         '''
+        CopyOnWrite.__init__(self)
         identities.HasIdentity.__init__(self)
         
-        self.event_set = event_set
-        '''Event set for events such as the end of a client's service.'''
+        if index is None:
+            index = len(facility.servers)
         
-        self.facility = facility
-        '''The facility in which clients are served.'''
+        self.index = index
+        '''The server's index in the `.servers` list of its facility.'''
         
         self.mean_service_time = mean_service_time
         '''The mean time it takes the server to service a client.'''
@@ -45,7 +58,7 @@ class Server(identities.HasIdentity):
         '''A counter for the number of clients that this server served.'''
     
         
-    def service_client(self, client):
+    def service_client(self, client, event_set):
         '''
         Service a client.
         
@@ -54,21 +67,20 @@ class Server(identities.HasIdentity):
         assert self.current_client is None and \
                self.finish_service_event is None
         self.current_client = client
-        self.finish_service_event = self.event_set.create_event(
+        self.finish_service_event = event_set.create_event(
             math_tools.time_for_next_occurence(self.mean_service_time),
-            self.finish_client
+            functools.partial(_finish_service, self.index)
         )
         
         
     def finish_client(self):
-        '''Finish serving the currently served client.'''
+        '''Finish serving the currently served client, and return it.'''
         assert self.current_client is not None
         self.client_counter += 1
         client = self.current_client 
         self.current_client = None
         self.finish_service_event = None
-        self.facility.clients.remove(client)
-        self.facility.feed_client(self)
+        return client
         
         
     def is_busy(self):
@@ -83,4 +95,14 @@ class Server(identities.HasIdentity):
         )
         
 
- 
\ No newline at end of file
+def _finish_service(server_index, state):
+    '''
+    Event action for a server finishing serving its client.
+    
+    It gets the server by its index in the state where the event happens,
+    since the server may have been copied after the event was created.
+    '''
+    state.get_writable('facility').finish_service(
+        server_index,
+        state.get_writable('event_set')
+    )
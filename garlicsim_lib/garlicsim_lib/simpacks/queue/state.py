@@ -10,16 +10,41 @@ from __future__ import division
 
 from garlicsim.general_misc.infinity import infinity
 import garlicsim
+from garlicsim.misc import CopyOnWrite
 
 from . import events as events_module
 from .facility import Facility
 from .population import Population
 
 
-class State(garlicsim.data_structures.State):
-    '''World state. A frozen moment in time in the simulation world.'''
+class State(CopyOnWrite, garlicsim.data_structures.State):
+    '''
+    World state. A frozen moment in time in the simulation world.
     
-    def __init__(self, event_set, facility, servers, population):
+    The state and the objects it's made of are copy-on-write, (see
+    `CopyOnWrite`,) so a step copies only the servers and containers it
+    changes, no matter how many servers there are. The objects don't refer to
+    each other; the events' actions get the state when they happen, and get
+    the objects they change from it with `get_writable`.
+    
+    To edit a state that's already in a tree, fork it with
+    `Tree.fork_to_edit`, which copies it fully, so the new state can be
+    changed with plain attribute assignments. When changing a state that was
+    copied lazily, like one in the middle of a step, get every object and
+    container that you change with `get_writable` or `get_writable_item`,
+    starting from the state, e.g.
+    `state.get_writable('facility').get_writable_item('servers', 0)`.
+    '''
+    
+    def __init__(self, event_set, facility, servers=None, population=None):
+        '''
+        Constructor.
+        
+        `servers` is accepted for compatibility with older versions; if it's
+        given, it must be `facility.servers`.
+        '''
+        assert servers is None or servers is facility.servers
+        CopyOnWrite.__init__(self)
         garlicsim.data_structures.State.__init__(self)
         
         self.event_set = event_set
@@ -28,13 +53,16 @@ class State(garlicsim.data_structures.State):
         self.facility = facility
         '''The facility in which clients wait to be serviced.'''
         
-        self.servers = servers
-        '''Servers which service the clients.'''
-        
         self.population = population
         '''Population from which the clients arrive.'''
 
         
+    servers = property(
+        lambda self: self.facility.servers,
+        doc='''Servers which service the clients.'''
+    )
+        
+    
     @staticmethod
     def create_root(n_servers=3, population_size=infinity, mean_arrival_time=1,
                     mean_service_time=3):
@@ -42,14 +70,13 @@ class State(garlicsim.data_structures.State):
         
         event_set = events_module.EventSet()
         
-        facility = Facility(event_set=event_set)
+        facility = Facility()
         
         for i in range(n_servers):
             facility.create_server(mean_service_time=mean_service_time)
                     
         population = Population(
             event_set=event_set,
-            facility=facility,
             size=population_size,
             mean_arrival_time=mean_arrival_time
         )
@@ -57,7 +84,6 @@ class State(garlicsim.data_structures.State):
         return State(
             event_set=event_set,
             facility=facility,
-            servers=facility.servers,
             population=population
         )
     
@@ -68,7 +94,7 @@ class State(garlicsim.data_structures.State):
         # todo good idea: t=None means step to next client. If given int just
         # do many steps. (What with cut last?)
         
-        time_passed = self.event_set.do_next_event()
+        time_passed = self.get_writable('event_set').do_next_event(self)
         self.clock += time_passed
 
-        
\ No newline at end of file
+        
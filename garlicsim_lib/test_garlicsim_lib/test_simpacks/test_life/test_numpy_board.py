@@ -0,0 +1,51 @@
+# Copyright 2009-2011 Ram Rachum.
+# This program is distributed under the LGPL2.1 license.
+
+'''Testing module for `NumpyBoard`.'''
+
+import nose
+
+from garlicsim_lib.simpacks import life
+
+
+def _to_numpy_state(state):
+    '''Make a state with a `NumpyBoard` with the same cells as `state`.'''
+    from garlicsim_lib.simpacks.life.numpy_board import NumpyBoard
+    numpy_state = life.State.create_root(state.board.width,
+                                         state.board.height,
+                                         board_type=NumpyBoard)
+    for x in xrange(state.board.width):
+        for y in xrange(state.board.height):
+            numpy_state.board.set(x, y, state.board.get(x, y))
+    return numpy_state
+
+
+def test():
+    '''Test that `NumpyBoard` computes the same generations as `Board`.'''
+    try:
+        import numpy
+    except ImportError:
+        raise nose.SkipTest('NumPy is not installed.')
+    
+    for (birth, survival) in [([3], [2, 3]), ([3, 6], [2, 3]), ([1], [])]:
+        state = life.State.create_messy_root(13, 7)
+        numpy_state = _to_numpy_state(state)
+        n_live_cells = numpy_state.get_n_live_cells()
+        assert n_live_cells == state.get_n_live_cells()
+        assert repr(numpy_state) == repr(state)
+        for i in xrange(10):
+            state = state.step(birth, survival)
+            numpy_state = numpy_state.step(birth, survival)
+            assert numpy_state == _to_numpy_state(state)
+            assert numpy_state.get_n_live_cells() == state.get_n_live_cells()
+            assert numpy_state - numpy_state == 0
+            
+    new_numpy_state = numpy_state.step(birth, survival)
+    delta = new_numpy_state.diff(numpy_state)
+    assert list(delta) == state.step(birth, survival).diff(state)
+    assert numpy_state.patch(delta) == new_numpy_state
+    
+    state_generator = numpy_state.step_generator(randomness=1)
+    random_state = state_generator.next()
+    assert random_state != state_generator.next()
+    assert 0 < random_state.get_n_live_cells() < 13 * 7
@@ -0,0 +1,49 @@
+# Copyright 2009-2011 Ram Rachum.
+# This program is distributed under the LGPL2.1 license.
+
+'''Testing module for `PackedBoard` and the packed pickling of boards.'''
+
+import cPickle as pickle
+
+from garlicsim_lib.simpacks import life
+from garlicsim_lib.simpacks.life.state import Board, PackedBoard
+
+
+def test():
+    '''Test that `PackedBoard` computes the same generations as `Board`.'''
+    state = life.State.create_messy_root(13, 7)
+    packed_state = life.State.create_root(13, 7, board_type=PackedBoard)
+    for x in xrange(13):
+        for y in xrange(7):
+            packed_state.board.set(x, y, state.board.get(x, y))
+    assert packed_state == state
+    
+    for i in xrange(10):
+        (new_state, new_packed_state) = (state.step(), packed_state.step())
+        assert isinstance(new_packed_state.board, PackedBoard)
+        assert new_packed_state == new_state
+        assert new_packed_state.get_n_live_cells() == \
+               new_state.get_n_live_cells()
+        delta = new_packed_state.diff(packed_state)
+        assert delta == new_state.diff(state)
+        assert packed_state.patch(delta) == new_packed_state
+        (state, packed_state) = (new_state, new_packed_state)
+        
+    assert repr(packed_state) == repr(state)
+    
+    
+def test_pickling():
+    '''Test that boards are pickled with their cells packed in bits.'''
+    for board_type in (Board, PackedBoard):
+        state = life.State.create_messy_root(80, 50, board_type=board_type)
+        pickled_state = pickle.dumps(state, protocol=2)
+        assert len(pickled_state) < 1000
+        unpickled_state = pickle.loads(pickled_state)
+        assert type(unpickled_state.board) is board_type
+        assert unpickled_state == state
+        
+    # Boards pickled by older versions kept their cells in a list:
+    board = Board.__new__(Board)
+    board.__setstate__({'width': 2, 'height': 1,
+                        '_Board__list': [True, False]})
+    assert board.get_cells() == [True, False]
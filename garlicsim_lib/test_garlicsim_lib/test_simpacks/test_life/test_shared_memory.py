@@ -0,0 +1,90 @@
+# Copyright 2009-2011 Ram Rachum.
+# This program is distributed under the LGPL2.1 license.
+
+'''Testing module for sending Life states through shared memory.'''
+
+import sys
+import time
+
+import nose
+
+import garlicsim
+from garlicsim.data_structures import Cycle
+from garlicsim.asynchronous_crunching.crunchers import ProcessCruncher
+from garlicsim_lib.simpacks import life
+from garlicsim_lib.simpacks.life.state import Board, PackedBoard
+
+
+TIMEOUT = 60
+'''How many seconds we let the crunching take before we fail.'''
+
+
+def _get_board_types():
+    '''Get the board types to test, with `NumpyBoard` if NumPy is installed.'''
+    board_types = [Board, PackedBoard]
+    try:
+        from garlicsim_lib.simpacks.life.numpy_board import NumpyBoard
+    except ImportError:
+        pass
+    else:
+        board_types.append(NumpyBoard)
+    return board_types
+
+
+def test_payload():
+    '''Test that a state is rebuilt from its payload.'''
+    for board_type in _get_board_types():
+        state = life.State.create_messy_root(13, 7, board_type=board_type)
+        (payload, rest) = state.dump_payload()
+        assert isinstance(payload, str)
+        new_state = life.State.load_payload(buffer(payload), rest)
+        assert type(new_state.board) is board_type
+        assert new_state == state
+        assert new_state.board is not state.board
+        
+
+def test_process_cruncher():
+    '''Test crunching with `ProcessCruncher`, which uses shared memory.'''
+    if sys.platform == 'win32':
+        raise nose.SkipTest("Shared memory isn't used on Windows.")
+    for board_type in _get_board_types():
+        yield check_process_cruncher, board_type
+        
+        
+def check_process_cruncher(board_type):
+    '''Check that states crunched in a process are sent in shared memory.'''
+    project = garlicsim.Project(life)
+    project.crunching_manager.cruncher_type = ProcessCruncher
+    root = project.root_this_state(
+        life.State.create_messy_root(20, 15, board_type=board_type)
+    )
+    n_steps = 30
+    project.begin_crunching(root, n_steps)
+    
+    shared_memory_rings = set()
+    start_time = time.time()
+    while project.crunching_manager.jobs:
+        assert time.time() - start_time < TIMEOUT, \
+               "Crunching didn't finish in %s seconds." % TIMEOUT
+        time.sleep(0.05)
+        for cruncher in project.crunching_manager.crunchers.itervalues():
+            shared_memory_rings.add(cruncher.shared_memory_ring)
+        project.sync_crunchers()
+        
+    (shared_memory_ring,) = shared_memory_rings
+    assert shared_memory_ring is not None
+    # The crunching manager loaded payloads from the ring:
+    assert shared_memory_ring.consumed_position.value > 0
+    
+    (leaf,) = root.get_all_leaves()
+    path = leaf.make_containing_path()
+    states = [node.state for node in path]
+    if len(states) < n_steps + 1:
+        # The messy board settled into a cycle, so the crunching stopped there:
+        (cycle,) = leaf.ends
+        assert isinstance(cycle, Cycle)
+    else:
+        assert len(states) == n_steps + 1
+    assert all(type(state.board) is board_type for state in states)
+    assert states == garlicsim.list_simulate(root.state, len(states) - 1)
+    assert [state.clock for state in states] == range(len(states))
@@ -0,0 +1,62 @@
+# Copyright 2009-2011 Ram Rachum.
+# This program is distributed under the LGPL2.1 license.
+
+'''Testing module for `PlayerBatch`.'''
+
+import itertools
+
+import nose
+
+import garlicsim
+from garlicsim_lib.simpacks import prisoner
+from garlicsim_lib.simpacks.prisoner.players import Angel, Devil, TitForTat
+
+
+def test():
+    '''Test that a `PlayerBatch` scores the same as player objects.'''
+    try:
+        import numpy
+    except ImportError:
+        raise nose.SkipTest('NumPy is not installed.')
+    from garlicsim_lib.simpacks.prisoner.player_batch import PlayerBatch
+    
+    player_types = [Angel, Devil, TitForTat]
+    type_pairs = [(player_type, other_player_type) for (i, player_type) in
+                  enumerate(player_types) for other_player_type in
+                  player_types[i:]]
+    players = [player_type() for player_type in
+               itertools.chain(*type_pairs)]
+    
+    player_batch = PlayerBatch(len(players), player_types=player_types)
+    player_batch.type_indices = numpy.array(
+        [player_types.index(type(player)) for player in players]
+    )
+    player_batch.prepare_for_new_match(replace_loser=False)
+    player_batch.opponents = numpy.arange(len(players)) ^ 1
+    
+    for round in xrange(7):
+        for i in xrange(0, len(players), 2):
+            prisoner.BasePlayer.play_game(players[i], players[i + 1], round)
+        player_batch.play_round(round)
+    assert list(player_batch.points) == [player.points for player in players]
+    
+    
+def test_state():
+    '''Test a state whose players are in a `PlayerBatch`.'''
+    try:
+        import numpy
+    except ImportError:
+        raise nose.SkipTest('NumPy is not installed.')
+    
+    state = prisoner.State.create_root(60, batch=True)
+    state.clock = 0
+    assert state.get_n_players_of_given_type(Angel) == 20
+    assert state.get_n_players_of_given_type(prisoner.BasePlayer) == 60
+    
+    states = garlicsim.list_simulate(state, 3 * 8)
+    player_batch = states[-1].player_batch
+    assert len(player_batch.points) == 60
+    assert player_batch.points[player_batch.get_player_with_least_points()] \
+           == player_batch.points.min()
+    assert states[0].player_batch.points.sum() == 0
+    assert states[-2].player_batch.points.any()
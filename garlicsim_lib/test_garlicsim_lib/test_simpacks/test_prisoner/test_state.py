@@ -0,0 +1,28 @@
+# Copyright 2009-2011 Ram Rachum.
+# This program is distributed under the LGPL2.1 license.
+
+'''Testing module for the `prisoner` simpack's `State`.'''
+
+from garlicsim.misc.state_deepcopy import state_deepcopy
+from garlicsim_lib.simpacks import prisoner
+
+
+def test_state_copy():
+    '''Test that `__state_copy__` copies the players.'''
+    state = prisoner.State.create_messy_root(10)
+    state.clock = 0
+    state.inplace_step()
+    
+    new_state = state_deepcopy(state)
+    for (player, new_player) in zip(state.players, new_state.players):
+        assert player is not new_player
+        assert player & new_player
+        assert (type(player), player.points) == \
+               (type(new_player), new_player.points)
+    new_players = set(new_state.players)
+    assert all(set(player_pair) <= new_players for player_pair in
+               new_state.player_pairs)
+    
+    new_state.inplace_step()
+    assert [player.points for player in state.players] != \
+           [player.points for player in new_state.players]
@@ -0,0 +1,43 @@
+# Copyright 2009-2011 Ram Rachum.
+# This program is distributed under the LGPL2.1 license.
+
+'''Testing module for `EventSet`.'''
+
+import copy
+
+import nose
+
+from garlicsim_lib.simpacks.queue.events import EventSet
+
+
+def test():
+    '''Test that events happen in order of time, then of creation.'''
+    event_set = EventSet()
+    happened = []
+    make_action = lambda name: (lambda: happened.append(name))
+    
+    events = dict(
+        (name, event_set.create_event(time_left, make_action(name)))
+        for (name, time_left) in [('c', 3), ('a', 1), ('b1', 2), ('b2', 2)]
+    )
+    assert event_set.get_time_left(events['c']) == 3
+    nose.tools.assert_raises(AttributeError, lambda: events['c'].time_left)
+    
+    assert event_set.do_next_event() == 1
+    assert happened == ['a']
+    assert event_set.get_time_left(events['c']) == 2
+    
+    event_set.create_event(0.5, make_action('b0'))
+    
+    copied_event_set = copy.deepcopy(event_set)
+    
+    for i in xrange(3):
+        event_set.do_next_event()
+    assert happened == ['a', 'b0', 'b1', 'b2']
+    assert event_set.time == 2
+    assert event_set.get_time_left(events['c']) == 1
+    
+    assert event_set.do_next_event() == 1
+    nose.tools.assert_raises(Exception, event_set.do_next_event)
+    
+    assert len(copied_event_set.events) == 4
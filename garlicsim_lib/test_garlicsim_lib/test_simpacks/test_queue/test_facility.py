@@ -0,0 +1,38 @@
+# Copyright 2009-2011 Ram Rachum.
+# This program is distributed under the LGPL2.1 license.
+
+'''Testing module for `Facility`.'''
+
+import garlicsim
+from garlicsim_lib.simpacks import queue
+
+
+def test():
+    '''Test that the facility's bookkeeping matches its servers.'''
+    state = queue.State.create_root(n_servers=20, mean_arrival_time=0.1,
+                                    mean_service_time=3)
+    state.clock = 0
+    facility = state.facility
+    assert facility.idle_server_indices == range(20)
+    
+    states = garlicsim.list_simulate(state, 300)
+    for state in states[1::10]:
+        facility = state.facility
+        busy_servers = [server for server in facility.servers if
+                        server.is_busy()]
+        idle_servers = list(facility.idle_servers_generator())
+        assert sorted(facility.idle_server_indices) == \
+               [facility.servers.index(server) for server in idle_servers]
+        if facility.waiting_clients:
+            assert not idle_servers
+        assert len(facility.clients) == \
+               len(busy_servers) + len(facility.waiting_clients)
+        assert facility.clients == dict(
+            [(server.current_client, server.index) for server in
+             busy_servers] +
+            [(client, None) for client in facility.waiting_clients]
+        )
+        assert facility.finished_client_count() == \
+               sum(server.client_counter for server in facility.servers)
+        
+    assert state.facility.finished_client_count() > 0
@@ -0,0 +1,157 @@
+# Copyright 2009-2011 Ram Rachum.
+# This program is distributed under the LGPL2.1 license.
+
+'''Testing module for the `queue` simpack's `State`.'''
+
+import copy
+import random
+import cPickle as pickle
+
+import nose
+
+import garlicsim
+
+from garlicsim.misc.state_deepcopy import state_deepcopy, StateCopy
+from garlicsim_lib.simpacks import queue
+
+
+def _summarize(state):
+    '''Summarize a state, for comparing.'''
+    return (state.clock,
+            len(state.facility.waiting_clients),
+            [server.client_counter for server in state.servers])
+
+
+def _get_history(state, copy_function, n_steps):
+    '''Step copies of the state, and summarize the states.'''
+    random.seed(0)
+    history = []
+    for i in xrange(n_steps):
+        state = copy_function(state)
+        state.inplace_step()
+        history.append(_summarize(state))
+    return history
+
+
+def test_state_copy():
+    '''Test that copying lazily gives the same states as `deepcopy`.'''
+    state = queue.State.create_root(n_servers=5, mean_arrival_time=0.5)
+    state.clock = 0
+    for i in xrange(100):
+        state.inplace_step()
+        
+    summary = _summarize(state)
+    deepcopy = lambda state: copy.deepcopy(state, StateCopy())
+    assert _get_history(state, state_deepcopy, 200) == \
+           _get_history(state, deepcopy, 200)
+    assert _summarize(state) == summary
+    
+    
+def test_copy_on_write():
+    '''Test that a step copies only the servers it changes.'''
+    state = queue.State.create_root(n_servers=50, mean_arrival_time=1)
+    state.clock = 0
+    for i in xrange(20):
+        state.inplace_step()
+    summary = _summarize(state)
+        
+    new_state = state_deepcopy(state)
+    assert new_state.facility is state.facility
+    new_state.inplace_step()
+    assert _summarize(state) == summary
+    assert new_state.event_set is not state.event_set
+    assert new_state.facility is not state.facility
+    
+    changed_servers = [
+        server for (server, old_server) in zip(new_state.servers, state.servers)
+        if server is not old_server
+    ]
+    assert len(changed_servers) == 1
+    (changed_server,) = changed_servers
+    assert changed_server & state.servers[changed_server.index]
+    
+    
+def test_fork_to_edit():
+    '''Test that a state forked to edit can be changed like a plain object.'''
+    project = garlicsim.Project(queue)
+    root = project.root_this_state(
+        queue.State.create_root(n_servers=5, mean_arrival_time=0.5)
+    )
+    project.begin_crunching(root, 30)
+    project.ensure_buffer(root, 0)
+    path = root.make_containing_path()
+    while len(path) < 30:
+        project.sync_crunchers()
+        path = root.make_containing_path()
+    template_node = path[20]
+    template_summary = _summarize(template_node.state)
+    
+    new_node = project.tree.fork_to_edit(template_node)
+    new_state = new_node.state
+    new_state.facility.servers[0].mean_service_time = 100
+    new_state.facility.add_client(queue.client.Client(), new_state.event_set)
+    new_state.population.mean_arrival_time = 7
+    new_node.finalize()
+    assert _summarize(template_node.state) == template_summary
+    assert len(new_state.facility.clients) == \
+           len(template_node.state.facility.clients) + 1
+    assert template_node.state.servers[0].mean_service_time == 3
+    
+    next_state = state_deepcopy(new_state)
+    next_state.inplace_step()
+    assert next_state.servers[0].mean_service_time == 100
+    assert next_state.population.mean_arrival_time == 7
+    
+    
+def test_full_copies():
+    '''Test events and client registries in deep copies and pickled ones.'''
+    state = queue.State.create_root(n_servers=5, mean_arrival_time=0.3)
+    state.clock = 0
+    for i in xrange(20):
+        state.inplace_step()
+    event = state.population.next_arrival
+    time_left = state.event_set.get_time_left(event)
+    assert time_left > 0
+    
+    for new_state in (copy.deepcopy(state, StateCopy()),
+                      pickle.loads(pickle.dumps(state, protocol=2))):
+        new_event = new_state.population.next_arrival
+        assert new_event.time == event.time
+        assert new_state.event_set.get_time_left(new_event) == time_left
+        new_facility = new_state.facility
+        assert len(new_facility.clients) == len(state.facility.clients)
+        assert new_facility.waiting_clients
+        for client in new_facility.waiting_clients:
+            assert new_facility.clients[client] is None
+        for server in new_facility.servers:
+            assert new_facility.clients[server.current_client] == server.index
+            
+            
+def test_time_left():
+    '''Test the time left until events, several steps after they're made.'''
+    state = queue.State.create_root(n_servers=3, mean_arrival_time=0.5)
+    state.clock = 0
+    states = garlicsim.list_simulate(state, 30)
+    
+    # The step iterator doesn't keep older states, so their event sets are
+    # gone:
+    simpack_grokker = garlicsim.misc.SimpackGrokker(queue)
+    step_profile = garlicsim.misc.StepProfile(
+        simpack_grokker.default_step_function
+    )
+    step_iterator = simpack_grokker.get_step_iterator(state, step_profile)
+    for i in xrange(30):
+        last_state = step_iterator.next()
+    
+    for state in states + [last_state]:
+        event_set = state.event_set
+        events = [state.population.next_arrival] + \
+                 [server.finish_service_event for server in state.servers
+                  if server.finish_service_event is not None]
+        for event in events:
+            time_left = event_set.get_time_left(event)
+            assert 0 < time_left == event.time - event_set.time
+            # The next event is the closest one:
+            assert time_left >= event_set.events[0][0] - event_set.time
+            nose.tools.assert_raises(AttributeError,
+                                     lambda: event.time_left)
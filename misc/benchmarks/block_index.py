@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+
+# Copyright 2009-2011 Ram Rachum.
+# This program is distributed under the LGPL2.1 license.
+
+'''
+Benchmark for adding a long natural chain of nodes to a tree.
+
+Every natural node is added to its parent's block, and the tree asks the block
+for node indices along the way, so the time per chunk of nodes should stay flat
+as the block grows. If indexing inside a block were linear, later chunks would
+be much slower than earlier ones.
+
+Usage: `block_index.py [n_nodes]`, default is 1,000,000 nodes.
+'''
+
+import sys
+import time
+
+import shared
+
+import garlicsim
+from garlicsim import data_structures as ds
+from garlicsim_lib.simpacks import life
+
+
+def main(n_nodes=10**6, n_chunks=10):
+    tree = ds.Tree()
+    state = life.State.create_root(3, 3)
+    step_profile = garlicsim.misc.StepProfile(life.State.step)
+    current_node = tree.add_state(state)
+    chunk_size = n_nodes // n_chunks
+    
+    for i_chunk in xrange(n_chunks):
+        start_time = time.time()
+        for i in xrange(chunk_size):
+            current_node = tree.add_state(state, parent=current_node,
+                                          step_profile=step_profile)
+            current_node.is_last_on_block()
+        shared.report('Adding nodes %s-%s' % (i_chunk * chunk_size,
+                                              (i_chunk + 1) * chunk_size),
+                      time.time() - start_time, chunk_size)
+        
+    block = current_node.block
+    nodes = list(block)
+    _, seconds = shared.timed(lambda: [block.index(node) for node in nodes])
+    shared.report('`Block.index` on every node', seconds, len(nodes))
+    
+    _, seconds = shared.timed(
+        lambda: [current_node.get_ancestor(len(nodes) // 2)
+                 for i in xrange(1000)]
+    )
+    shared.report('`Node.get_ancestor` across the block', seconds, 1000)
+
+    
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
+    
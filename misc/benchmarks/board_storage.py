@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+
+# Copyright 2009-2011 Ram Rachum.
+# This program is distributed under the LGPL2.1 license.
+
+'''
+Benchmark for the size of Life boards, in memory and pickled.
+
+Makes a random board of each type and reports the memory taken by its cells,
+and the size of the board pickled, which is what gets sent from a cruncher
+process and saved with the project, along with the time to pickle and unpickle
+it. For comparison it also reports the same for a plain list of the cells,
+which is how `Board` used to be pickled.
+
+Usage: `board_storage.py [width] [height]`, default is a 1000x1000 board.
+'''
+
+import sys
+import cPickle as pickle
+
+import shared
+
+from garlicsim_lib.simpacks.life.state import Board, PackedBoard
+
+
+def get_cells_memory(board):
+    '''Get the memory taken by the board's cells, in bytes.'''
+    if isinstance(board, PackedBoard):
+        return sys.getsizeof(board._PackedBoard__packed_cells)
+    else:
+        # The bools themselves are shared, so it's just the list:
+        return sys.getsizeof(board._Board__list)
+
+
+def pickle_and_unpickle(thing):
+    '''Pickle and unpickle `thing`, return the size of the pickle.'''
+    pickled_thing = pickle.dumps(thing, protocol=2)
+    pickle.loads(pickled_thing)
+    return len(pickled_thing)
+
+
+def main(width=1000, height=1000):
+    board = Board(width, height, 'random')
+    packed_board = PackedBoard(width, height, 'random')
+    print('Board cells in memory: %.1f KB' %
+          (get_cells_memory(board) / 1024.0))
+    print('PackedBoard cells in memory: %.1f KB' %
+          (get_cells_memory(packed_board) / 1024.0))
+    
+    for (title, thing) in (('List of cells', board.get_cells()),
+                           ('Board', board),
+                           ('PackedBoard', packed_board)):
+        (size, seconds) = shared.timed(pickle_and_unpickle, thing)
+        shared.report('%s pickled, %.1f KB' % (title, size / 1024.0), seconds)
+
+    
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
+    
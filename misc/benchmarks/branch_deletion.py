@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+
+# Copyright 2009-2011 Ram Rachum.
+# This program is distributed under the LGPL2.1 license.
+
+'''
+Benchmark for deleting a branch from a big tree.
+
+Builds a tree with a long natural timeline and a branch forking from its
+middle, then deletes the branch with `Tree.delete_node_range`.
+
+Usage: `branch_deletion.py [trunk_length] [branch_length]`, default is a
+1,000,000 node trunk and a 50,000 node branch.
+'''
+
+import sys
+
+import shared
+
+import garlicsim
+from garlicsim import data_structures as ds
+from garlicsim_lib.simpacks import life
+
+
+class TinyState(garlicsim.data_structures.State):
+    '''A state with nothing but a clock, so we mostly measure the tree.'''
+
+
+def add_timeline(tree, parent, length, step_profile):
+    '''Add a natural timeline of `length` nodes after `parent`.'''
+    return tree.add_states([TinyState() for i in xrange(length)],
+                           parent=parent, step_profile=step_profile)
+
+
+def main(trunk_length=10**6, branch_length=5 * 10**4):
+    tree = ds.Tree()
+    step_profile = garlicsim.misc.StepProfile(life.State.step)
+
+    root = tree.add_state(TinyState())
+    trunk = add_timeline(tree, root, trunk_length, step_profile)
+    branch = add_timeline(tree, trunk[trunk_length // 2], branch_length,
+                          step_profile)
+
+    node_range = ds.NodeRange(branch[0], branch[-1])
+    (result, seconds) = shared.timed(tree.delete_node_range, node_range)
+    shared.report('Deleting a %s node branch from a %s node tree' %
+                  (branch_length, trunk_length + branch_length + 1),
+                  seconds, branch_length)
+
+    assert len(tree.nodes) == trunk_length + 1
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
+
@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+
+# Copyright 2009-2011 Ram Rachum.
+# This program is distributed under the LGPL2.1 license.
+
+'''
+Benchmark for how long it takes a new cruncher to deliver its first state.
+
+Starts crunchers over and over, the way the crunching manager does when the
+user forks the simulation or changes the step profile, and measures the time
+from starting each cruncher until its first state arrives in its work queue.
+
+Usage: `cruncher_start_latency.py [n_jobs]`, default is 20 jobs.
+'''
+
+import sys
+import time
+
+import shared
+
+import garlicsim
+from garlicsim.general_misc import queue_tools
+from garlicsim.asynchronous_crunching import CrunchingProfile
+from garlicsim.asynchronous_crunching.crunchers import ProcessCruncher, \
+                                                       ProcessPoolCruncher
+from garlicsim_lib.simpacks import life
+
+
+def get_first_state(cruncher):
+    '''Wait until the cruncher puts something in its work queue.'''
+    while True:
+        for thing in queue_tools.iterate(cruncher.work_queue,
+                                         limit_to_original_size=True):
+            return thing
+        time.sleep(0.0001)
+
+
+def run_jobs(project, cruncher_type, n_jobs):
+    '''Start and retire `n_jobs` crunchers, return total time to first state.'''
+    state = project.root_this_state(life.State.create_messy_root(3, 3)).state
+    total_seconds = 0
+    for i in xrange(n_jobs):
+        step_profile = project.build_step_profile(randomness=(i % 2) * 0.01)
+        crunching_profile = CrunchingProfile(clock_target=10**6,
+                                             step_profile=step_profile)
+        cruncher = cruncher_type(project.crunching_manager, state,
+                                 crunching_profile)
+        start_time = time.time()
+        cruncher.start()
+        get_first_state(cruncher)
+        total_seconds += time.time() - start_time
+        cruncher.retire()
+    return total_seconds
+
+
+def main(n_jobs=20):
+    # Sending states one by one, so we measure start latency and not batching:
+    garlicsim.asynchronous_crunching.CRUNCHER_BATCH_SIZE = 1
+    
+    project = garlicsim.Project(life)
+
+    seconds = run_jobs(project, ProcessCruncher, n_jobs)
+    shared.report('ProcessCruncher, time to first state', seconds, n_jobs)
+
+    # Making the pool first, so we measure warm starts:
+    run_jobs(project, ProcessPoolCruncher, 1)
+    seconds = run_jobs(project, ProcessPoolCruncher, n_jobs)
+    shared.report('ProcessPoolCruncher, time to first state', seconds, n_jobs)
+
+    from garlicsim.asynchronous_crunching.crunchers.process_pool_cruncher \
+         import worker_pool
+    worker_pool = worker_pool.get_worker_pool(project.crunching_manager, None)
+    print('Mean job start latency reported by the pool: %.2f ms' %
+          (worker_pool.get_mean_job_start_latency() * 1000))
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
+
@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+
+# Copyright 2009-2011 Ram Rachum.
+# This program is distributed under the LGPL2.1 license.
+
+'''
+Benchmark for the throughput of asynchronous crunching.
+
+Crunches the `life` simpack on a tiny board, which makes for a very cheap step
+function, with each of the cruncher types, with and without batching the states
+that crunchers send to the crunching manager. Reports the number of states per
+second that got into the tree.
+
+Usage: `crunching_throughput.py [n_states]`, default is 20,000 states.
+'''
+
+import sys
+import time
+
+import shared
+
+import garlicsim
+from garlicsim.asynchronous_crunching import crunchers
+from garlicsim_lib.simpacks import life
+
+
+def crunch(cruncher_type, n_states):
+    '''Crunch `n_states` states and return the number of seconds it took.'''
+    project = garlicsim.Project(life)
+    project.crunching_manager.cruncher_type = cruncher_type
+    root = project.root_this_state(life.State.create_messy_root(3, 3))
+    
+    start_time = time.time()
+    project.begin_crunching(root, n_states)
+    while project.crunching_manager.jobs:
+        project.sync_crunchers()
+        time.sleep(0.01)
+    seconds = time.time() - start_time
+    
+    assert len(project.tree.nodes) >= n_states
+    return seconds
+
+
+def main(n_states=20000):
+    default_batch_size = garlicsim.asynchronous_crunching.CRUNCHER_BATCH_SIZE
+    for cruncher_type in (crunchers.ThreadCruncher, crunchers.ProcessCruncher):
+        for batch_size in (1, default_batch_size):
+            garlicsim.asynchronous_crunching.CRUNCHER_BATCH_SIZE = batch_size
+            seconds = crunch(cruncher_type, n_states)
+            print('%-16s batch size %-4s %9.0f states per second' %
+                  (cruncher_type.__name__, batch_size, n_states / seconds))
+    garlicsim.asynchronous_crunching.CRUNCHER_BATCH_SIZE = default_batch_size
+
+    
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
+    
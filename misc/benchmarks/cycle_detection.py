@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+
+# Copyright 2009-2011 Ram Rachum.
+# This program is distributed under the LGPL2.1 license.
+
+'''
+Benchmark for crunching deterministic Life simulations, which may cycle.
+
+Crunches two 50x50 Life boards to the clock target with a `ThreadCruncher`:
+One with a blinker, which repeats every 2 steps, so crunching it can stop
+right away, and a messy one, which doesn't cycle for a long time, to show the
+cost of checking the states for cycles.
+
+Usage: `cycle_detection.py [clock_target]`, default is 200.
+'''
+
+import sys
+import time
+
+import shared
+
+import garlicsim
+from garlicsim.asynchronous_crunching import crunchers
+from garlicsim_lib.simpacks import life
+
+
+def make_blinker_state():
+    '''Create a Life state with a blinker.'''
+    state = life.State.create_root(50, 50)
+    for x in (24, 25, 26):
+        state.board.set(x, 25, True)
+    return state
+
+
+def crunch(state, clock_target):
+    '''Crunch from `state` until the job is done.'''
+    project = garlicsim.Project(life)
+    project.crunching_manager.cruncher_type = crunchers.ThreadCruncher
+    root = project.root_this_state(state)
+    project.begin_crunching(root, clock_target)
+    while project.crunching_manager.jobs:
+        time.sleep(0.01)
+        project.sync_crunchers()
+    return root.make_containing_path()[-1].state.clock
+
+
+def main(clock_target=200):
+    (last_clock, seconds) = shared.timed(crunch, make_blinker_state(),
+                                         clock_target)
+    shared.report('blinker, crunched to clock %s' % last_clock, seconds, 1)
+    (last_clock, seconds) = shared.timed(
+        crunch,
+        life.State.create_messy_root(50, 50),
+        clock_target
+    )
+    shared.report('messy board, crunched to clock %s' % last_clock,
+                  seconds, last_clock)
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
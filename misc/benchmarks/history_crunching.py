@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+
+# Copyright 2009-2011 Ram Rachum.
+# This program is distributed under the LGPL2.1 license.
+
+'''
+Benchmark for crunching a history-dependent simulation with many crunchers.
+
+Crunches the `_history_test` simpack, whose step function reads from its
+history browser a few times per step, with 1, 4 and 16 `ThreadCruncher`s at
+once, each crunching its own fork, while the main thread keeps syncing the
+crunchers. Reports the number of states per second that got into the tree.
+
+Usage: `history_crunching.py [n_states_per_cruncher]`, default is 500 states.
+'''
+
+from __future__ import division
+
+import sys
+import time
+
+import shared
+
+import garlicsim
+from garlicsim.asynchronous_crunching import crunchers
+from garlicsim_lib.simpacks import _history_test
+
+
+def crunch(n_crunchers, n_states_per_cruncher):
+    '''Crunch with `n_crunchers` crunchers, return the number of seconds.'''
+    project = garlicsim.Project(_history_test)
+    project.crunching_manager.cruncher_type = crunchers.ThreadCruncher
+    root = project.root_this_state(_history_test.State.create_root())
+    
+    start_time = time.time()
+    for i in xrange(n_crunchers):
+        # The step function advances the clock by 0.1 on every step:
+        project.begin_crunching(root, n_states_per_cruncher * 0.1)
+    while project.crunching_manager.jobs:
+        project.sync_crunchers()
+        time.sleep(0.01)
+    seconds = time.time() - start_time
+    
+    assert len(project.tree.nodes) >= n_crunchers * n_states_per_cruncher
+    return seconds
+
+
+def main(n_states_per_cruncher=500):
+    for n_crunchers in (1, 4, 16):
+        seconds = crunch(n_crunchers, n_states_per_cruncher)
+        print('%-2s thread crunchers %9.0f states per second' %
+              (n_crunchers, n_crunchers * n_states_per_cruncher / seconds))
+
+    
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,41 @@
+#!/usr/bin/env python
+
+# Copyright 2009-2011 Ram Rachum.
+# This program is distributed under the LGPL2.1 license.
+
+'''
+Benchmark for synchronous crunching of a history-dependent simulation.
+
+Uses the `_history_test` simpack, whose step function looks up states by clock
+in the history browser every step. The time per step should stay flat as the
+timeline grows.
+
+Usage: `history_step.py [n_steps]`, default is 20,000 steps.
+'''
+
+import sys
+import time
+
+import shared
+
+import garlicsim
+from garlicsim_lib.simpacks import _history_test
+
+
+def main(n_steps=20000, n_chunks=5):
+    project = garlicsim.Project(_history_test)
+    node = project.root_this_state(_history_test.State.create_root())
+    chunk_size = n_steps // n_chunks
+    
+    for i_chunk in xrange(n_chunks):
+        start_time = time.time()
+        for node in project.iter_simulate(node, chunk_size):
+            pass
+        shared.report('Steps %s-%s' % (i_chunk * chunk_size,
+                                       (i_chunk + 1) * chunk_size),
+                      time.time() - start_time, chunk_size)
+
+        
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
+    
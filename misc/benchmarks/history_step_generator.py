@@ -0,0 +1,40 @@
+#!/usr/bin/env python
+
+# Copyright 2009-2011 Ram Rachum.
+# This program is distributed under the LGPL2.1 license.
+
+'''
+Benchmark for history step generators.
+
+Simulates the `moving_average` simpack in this folder, which keeps the moving
+average of a value over a window of states, with several window sizes: Once
+with its history step function, which sums the window on every step, and once
+with its history step generator, which keeps a running sum.
+
+Usage: `history_step_generator.py [n_steps]`, default is 1,000 steps.
+'''
+
+import sys
+
+import shared
+
+import garlicsim
+
+import moving_average
+
+
+def main(n_steps=1000):
+    state = moving_average.State.create_root()
+    for window in (10, 100, 1000):
+        for step_function in (moving_average.State.history_step,
+                              moving_average.State.history_step_generator):
+            (result, seconds) = shared.timed(garlicsim.simulate, state,
+                                             n_steps, step_function,
+                                             window=window)
+            shared.report('window of %s, %s' % (window,
+                                                step_function.__name__),
+                          seconds, n_steps)
+
+    
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
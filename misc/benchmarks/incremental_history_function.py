@@ -0,0 +1,50 @@
+#!/usr/bin/env python
+
+# Copyright 2009-2011 Ram Rachum.
+# This program is distributed under the LGPL2.1 license.
+
+'''
+Benchmark for getting a history function's values over a path.
+
+Crunches a path of a small Life board, and gets the total number of live
+cells up to each node, once with a `history_cache` function that builds a
+history browser for every node, and once with one that also has an
+incremental form.
+
+Usage: `incremental_history_function.py [n_nodes]`, default is 300.
+'''
+
+import sys
+
+import shared
+
+import garlicsim
+from garlicsim_lib.simpacks import life
+
+
+def total_live_cells(history_browser):
+    '''Return how many cells were alive, summed over the history.'''
+    return sum(history_browser[i].get_n_live_cells() for i in
+               xrange(len(history_browser)))
+
+
+def main(n_nodes=300):
+    project = garlicsim.Project(life)
+    root = project.root_this_state(life.State.create_messy_root(12, 12))
+    path = project.simulate(root, n_nodes).make_containing_path()
+    
+    history_function = garlicsim.misc.caching.history_cache(total_live_cells)
+    (result, seconds) = shared.timed(map, history_function, path)
+    shared.report('Without incremental form', seconds, n_nodes)
+    
+    history_function = garlicsim.misc.caching.history_cache(total_live_cells)
+    @history_function.incremental
+    def history_function(parent_value, state):
+        return parent_value + state.get_n_live_cells()
+    (incremental_result, seconds) = shared.timed(map, history_function, path)
+    shared.report('With incremental form', seconds, n_nodes)
+    assert incremental_result == result
+    
+    
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,50 @@
+#!/usr/bin/env python
+
+# Copyright 2009-2011 Ram Rachum.
+# This program is distributed under the LGPL2.1 license.
+
+'''
+Benchmark for computing Life generations with `Board` and `NumpyBoard`.
+
+Steps a random board of each size with each board type, for at least a second
+or one step, whichever takes longer, and reports the time per step.
+
+Usage: `life_engines.py [min_seconds]`, default is 1 second.
+'''
+
+import sys
+import time
+
+import shared
+
+from garlicsim_lib.simpacks import life
+from garlicsim_lib.simpacks.life.numpy_board import NumpyBoard
+
+
+SIZES = [(45, 25), (500, 500), (2000, 2000)]
+
+
+def step_for_a_while(state, min_seconds):
+    '''Step the state until `min_seconds` pass, return number of steps.'''
+    start_time = time.time()
+    n_steps = 0
+    while n_steps == 0 or time.time() - start_time < min_seconds:
+        state = state.step()
+        n_steps += 1
+    return n_steps
+
+
+def main(min_seconds=1):
+    for (width, height) in SIZES:
+        for board_type in (life.state.Board, NumpyBoard):
+            state = life.State.create_messy_root(width, height,
+                                                 board_type=board_type)
+            (n_steps, seconds) = shared.timed(step_for_a_while, state,
+                                              min_seconds)
+            shared.report('%s, %sx%s' % (board_type.__name__, width, height),
+                          seconds, n_steps)
+
+    
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
+    
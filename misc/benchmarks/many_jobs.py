@@ -0,0 +1,49 @@
+#!/usr/bin/env python
+
+# Copyright 2009-2011 Ram Rachum.
+# This program is distributed under the LGPL2.1 license.
+
+'''
+Benchmark for ensuring a buffer on a tree with many forks that have jobs.
+
+Makes a root with `n_forks` children, each with a crunching job on it, and
+calls `Project.ensure_buffer` on the root over and over. This looks up the
+jobs of every leaf in the crunching manager, which used to go over all the
+jobs for each leaf.
+
+Usage: `many_jobs.py [n_forks] [n_calls]`, default is 500 forks, 20 calls.
+'''
+
+import sys
+
+import shared
+
+import garlicsim
+from garlicsim_lib.simpacks import life
+
+
+def make_project(n_forks):
+    '''Make a project whose root has `n_forks` children, each with a job.'''
+    project = garlicsim.Project(life)
+    root = project.root_this_state(life.State.create_messy_root(4, 4))
+    for i in xrange(n_forks):
+        leaf = project.tree.add_state(root.state.step(), parent=root)
+        project.begin_crunching(leaf, 10)
+    return (project, root)
+
+
+def ensure_buffer_many_times(project, root, n_calls):
+    '''Call `ensure_buffer` on the root `n_calls` times.'''
+    for i in xrange(n_calls):
+        project.ensure_buffer(root, clock_buffer=10)
+
+
+def main(n_forks=500, n_calls=20):
+    (project, root) = make_project(n_forks)
+    (result, seconds) = shared.timed(ensure_buffer_many_times, project, root,
+                                     n_calls)
+    shared.report('ensure_buffer with %s forks' % n_forks, seconds, n_calls)
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
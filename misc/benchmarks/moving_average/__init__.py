@@ -0,0 +1,15 @@
+# Copyright 2009-2011 Ram Rachum.
+# This program is distributed under the LGPL2.1 license.
+
+'''
+A history-dependent simpack for the `history_step_generator.py` benchmark.
+
+A value takes a random walk, and each state also has the moving average of the
+value over the last few states. It can be stepped either with a history step
+function, which looks at the last few states on every step, or with a history
+step generator, which keeps a running sum.
+'''
+
+from .state import State
+
+name = 'Moving average'
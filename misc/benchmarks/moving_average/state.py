@@ -0,0 +1,64 @@
+# Copyright 2009-2011 Ram Rachum.
+# This program is distributed under the LGPL2.1 license.
+
+'''
+This module defines the `State` class.
+
+See its documentation for more information.
+'''
+
+from __future__ import division
+
+import random
+import collections
+
+import garlicsim
+
+
+class State(garlicsim.data_structures.State):
+    '''A value and its moving average.'''
+    
+    def __init__(self, value, average):
+        
+        self.value = value
+        '''The value, which takes a random walk.'''
+        
+        self.average = average
+        '''The average of the value in the last `window` states.'''
+        
+        
+    @staticmethod
+    def create_root():
+        return State(0, 0)
+    
+    
+    @staticmethod
+    def create_messy_root():
+        value = random.gauss(0, 1)
+        return State(value, value)
+    
+    
+    @staticmethod
+    def history_step(history_browser, window=100):
+        '''Step the value, and average it over the last states.'''
+        n_past_states = min(window - 1, len(history_browser))
+        value = history_browser.get_last_state().value + random.gauss(0, 1)
+        total = value + sum(history_browser[-i].value for i in
+                            xrange(1, n_past_states + 1))
+        return State(value, total / (n_past_states + 1))
+    
+    
+    @staticmethod
+    def history_step_generator(history_browser, window=100):
+        '''Step the value, and average it using a running sum.'''
+        n_past_states = min(window - 1, len(history_browser))
+        values = collections.deque(history_browser[-i].value for i in
+                                   xrange(n_past_states, 0, -1))
+        total = sum(values)
+        while True:
+            value = values[-1] + random.gauss(0, 1)
+            values.append(value)
+            total += value
+            yield State(value, total / len(values))
+            if len(values) == window:
+                total -= values.popleft()
@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+
+# Copyright 2009-2011 Ram Rachum.
+# This program is distributed under the LGPL2.1 license.
+
+'''
+Benchmark for random access and clock lookups on a long path.
+
+The path is made of many short blocks, (we fork the tree every few nodes,) so
+lookups that walk the path member by member get slower as it grows. With the
+path's index, the time per lookup should stay nearly flat.
+
+Usage: `path_lookup.py [n_nodes]`, default is 200,000 nodes.
+'''
+
+import sys
+import random
+
+import shared
+
+import garlicsim
+from garlicsim import data_structures as ds
+from garlicsim_lib.simpacks import life
+
+
+def main(n_nodes=200000, block_length=10, n_lookups=2000):
+    tree = ds.Tree()
+    state = life.State.create_root(3, 3)
+    step_profile = garlicsim.misc.StepProfile(life.State.step)
+    root = tree.add_state(state)
+    current_node = root
+    path = root.make_containing_path()
+    
+    for n in (n_nodes // 8, n_nodes // 4, n_nodes // 2, n_nodes):
+        while len(tree.nodes) < n:
+            current_node = tree.add_state(state, parent=current_node,
+                                          step_profile=step_profile)
+            if len(tree.nodes) % block_length == 0:
+                # Forking to end the current block and start a new one:
+                tree.add_state(state, parent=current_node.parent,
+                               step_profile=step_profile)
+        length = len(path)
+        clocks = [random.random() * length for i in xrange(n_lookups)]
+        indices = [random.randrange(length) for i in xrange(n_lookups)]
+        
+        _, seconds = shared.timed(
+            lambda: [path.get_node_by_clock(clock) for clock in clocks]
+        )
+        shared.report('`get_node_by_clock` on %s nodes' % length,
+                      seconds, n_lookups)
+        _, seconds = shared.timed(lambda: [path[i] for i in indices])
+        shared.report('`Path.__getitem__` on %s nodes' % length,
+                      seconds, n_lookups)
+
+        
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
+    
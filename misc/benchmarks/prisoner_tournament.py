@@ -0,0 +1,41 @@
+#!/usr/bin/env python
+
+# Copyright 2009-2011 Ram Rachum.
+# This program is distributed under the LGPL2.1 license.
+
+'''
+Benchmark for stepping a big population in the `prisoner` simpack.
+
+Steps a `prisoner` state through a few matches, once with player objects and
+once with the players in a `PlayerBatch`, and reports the time per step.
+
+Usage: `prisoner_tournament.py [n_players] [n_matches]`, default is 100,000
+players playing 3 matches.
+'''
+
+import sys
+
+import shared
+
+from garlicsim_lib.simpacks import prisoner
+
+
+def step(state, n_steps):
+    '''Step the state in place `n_steps` times.'''
+    for i in xrange(n_steps):
+        state.inplace_step()
+
+
+def main(n_players=10**5, n_matches=3):
+    for batch in (False, True):
+        state = prisoner.State.create_messy_root(n_players, batch=batch)
+        state.clock = 0
+        n_steps = n_matches * (state.n_rounds + 1)
+        (result, seconds) = shared.timed(step, state, n_steps)
+        shared.report('%s, step' % ('PlayerBatch' if batch else 'Players'),
+                      seconds, n_steps)
+
+    
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
+    
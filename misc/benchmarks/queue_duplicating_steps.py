@@ -0,0 +1,49 @@
+#!/usr/bin/env python
+
+# Copyright 2009-2011 Ram Rachum.
+# This program is distributed under the LGPL2.1 license.
+
+'''
+Benchmark for producing a distinct `queue` state on every step.
+
+Simulates `queue` states with more and more servers, the way the crunchers do:
+With the `DuplicatingStepIterator`, which copies the state before every
+inplace step. The clients arrive fast enough to keep most of the servers busy.
+
+Usage: `queue_duplicating_steps.py [n_steps]`, default is 1,000 steps.
+'''
+
+import sys
+
+import shared
+
+import garlicsim
+from garlicsim_lib.simpacks import queue
+
+
+def make_state(n_servers):
+    '''Make a `queue` state with `n_servers` servers that are mostly busy.'''
+    mean_service_time = 3
+    state = queue.State.create_root(
+        n_servers=n_servers,
+        mean_arrival_time=(0.9 * mean_service_time / n_servers),
+        mean_service_time=mean_service_time
+    )
+    state.clock = 0
+    # Letting the servers get busy:
+    for i in xrange(n_servers):
+        state.inplace_step()
+    return state
+
+
+def main(n_steps=1000):
+    for n_servers in (100, 1000, 10000):
+        state = make_state(n_servers)
+        (result, seconds) = shared.timed(garlicsim.list_simulate, state,
+                                         n_steps)
+        shared.report('queue with %s servers, step' % n_servers, seconds,
+                      n_steps)
+
+    
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
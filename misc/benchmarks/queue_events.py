@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+
+# Copyright 2009-2011 Ram Rachum.
+# This program is distributed under the LGPL2.1 license.
+
+'''
+Benchmark for the event set and the facility of the `queue` simpack.
+
+First runs the "hold" model on a bare `EventSet`: With one pending event per
+server, it repeatedly fires the next event, which schedules a new one. Then it
+steps a `queue` state with that many servers, with clients arriving fast
+enough to keep all the servers busy.
+
+Usage: `queue_events.py [n_servers] [n_steps]`, default is 10,000 servers and
+1,000 steps.
+'''
+
+import sys
+import random
+
+import shared
+
+from garlicsim_lib.simpacks import queue
+from garlicsim_lib.simpacks.queue import events
+
+
+def hold(event_set, n_steps):
+    '''Fire `n_steps` events, each scheduling a new one.'''
+    for i in xrange(n_steps):
+        event_set.do_next_event()
+        
+        
+def schedule_another_event(event_set):
+    '''Schedule an event that will schedule another event when it happens.'''
+    event_set.create_event(random.expovariate(1),
+                           lambda: schedule_another_event(event_set))
+    
+    
+def step(state, n_steps):
+    '''Step the state in place `n_steps` times.'''
+    for i in xrange(n_steps):
+        state.inplace_step()
+
+
+def main(n_servers=10000, n_steps=1000):
+    event_set = events.EventSet()
+    for i in xrange(n_servers):
+        schedule_another_event(event_set)
+    (result, seconds) = shared.timed(hold, event_set, n_steps)
+    shared.report('EventSet with %s pending events' % n_servers, seconds,
+                  n_steps)
+    
+    mean_service_time = 3
+    state = queue.State.create_root(
+        n_servers=n_servers,
+        mean_arrival_time=(0.9 * mean_service_time / n_servers),
+        mean_service_time=mean_service_time
+    )
+    state.clock = 0
+    # Letting the servers get busy:
+    step(state, n_servers)
+    (result, seconds) = shared.timed(step, state, n_steps)
+    shared.report('queue with %s servers, step' % n_servers, seconds, n_steps)
+
+    
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
+    
@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+
+# Copyright 2009-2011 Ram Rachum.
+# This program is distributed under the LGPL2.1 license.
+
+'''
+Benchmark for evaluating scalar state functions over a long path.
+
+Crunches a long path of a small Life board, and gets the number of live cells
+of every node in it: Once by calling `State.get_n_live_cells` node by node, as
+plotting code would without a scalar evaluator, (a second time it's cached per
+state,) and then with the project's `ScalarEvaluator`, first evaluating
+everything, then again, and then again after crunching some more.
+
+Usage: `scalar_evaluation.py [n_nodes]`, default is 20,000.
+'''
+
+import sys
+
+import shared
+
+import garlicsim
+from garlicsim_lib.simpacks import life
+
+
+def get_node_by_node(path):
+    '''Get the number of live cells of every node, calling for each one.'''
+    return [node.state.get_n_live_cells() for node in path]
+
+
+def main(n_nodes=20000):
+    project = garlicsim.Project(life)
+    root = project.root_this_state(life.State.create_messy_root(12, 12))
+    leaf = project.simulate(root, n_nodes)
+    path = leaf.make_containing_path()
+    n_more_nodes = n_nodes // 100
+    
+    for i in (1, 2):
+        (result, seconds) = shared.timed(get_node_by_node, path)
+        shared.report('Node by node, time #%s' % i, seconds, n_nodes)
+        
+    scalar_evaluator = project.scalar_evaluator
+    for i in (1, 2):
+        (result, seconds) = shared.timed(scalar_evaluator.evaluate, path)
+        shared.report('Scalar evaluator, time #%s' % i, seconds, n_nodes)
+        
+    project.simulate(path[-1], n_more_nodes)
+    (result, seconds) = shared.timed(scalar_evaluator.evaluate, path)
+    shared.report('Scalar evaluator, after %s more nodes' % n_more_nodes,
+                  seconds, n_nodes + n_more_nodes)
+    
+    
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,52 @@
+# Copyright 2009-2011 Ram Rachum.
+# This program is distributed under the LGPL2.1 license.
+
+'''
+Tools shared by the benchmark scripts.
+
+Importing this module adds `garlicsim`'s and `garlicsim_lib`'s root folders to
+`sys.path` if they can't currently be imported, so the benchmarks can be run
+straight from a repo checkout.
+'''
+
+import os.path
+import sys
+import imp
+import time
+
+
+def _exists(module_name):
+    '''Return whether a top-level module by the name `module_name` exists.'''
+    assert '.' not in module_name
+    try:
+        imp.find_module(module_name)
+    except ImportError:
+        return False
+    else:
+        return True
+
+    
+_repo_path = os.path.realpath(
+    os.path.join(os.path.split(__file__)[0], '..', '..')
+)
+
+for _package_name in ('garlicsim', 'garlicsim_lib'):
+    if not _exists(_package_name):
+        sys.path.append(os.path.join(_repo_path, _package_name))
+
+
+def timed(function, *args, **kwargs):
+    '''Call `function` and return a tuple `(result, seconds_it_took)`.'''
+    start_time = time.time()
+    result = function(*args, **kwargs)
+    return (result, time.time() - start_time)
+
+
+def report(title, seconds, n=None):
+    '''Print a one-line benchmark result, optionally with time per item.'''
+    if n:
+        print('%-50s %9.3f s  (%.2f us per item)' %
+              (title, seconds, seconds * 1e6 / n))
+    else:
+        print('%-50s %9.3f s' % (title, seconds))
+        
@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+
+# Copyright 2009-2011 Ram Rachum.
+# This program is distributed under the LGPL2.1 license.
+
+'''
+Benchmark for copying states of the `garlicsim_lib` simpacks.
+
+Copies states of the `life`, `queue` and `prisoner` simpacks over and over,
+once with `state_deepcopy` and once with a plain `deepcopy` using the
+`StateCopy` memo, which `state_deepcopy` falls back to for states that don't
+define `__state_copy__`.
+
+Usage: `state_copying.py [n_copies]`, default is 1,000 copies.
+'''
+
+import sys
+import copy
+
+import shared
+
+import garlicsim
+from garlicsim.misc.state_deepcopy import state_deepcopy, StateCopy
+from garlicsim_lib.simpacks import life, queue, prisoner
+
+
+def make_states():
+    '''Make a few states to copy, with titles.'''
+    life_state = life.State.create_messy_root(100, 100)
+    
+    queue_state = queue.State.create_root(n_servers=50,
+                                          mean_arrival_time=0.05)
+    queue_state.clock = 0
+    for i in xrange(1000):
+        queue_state.inplace_step()
+        
+    prisoner_state = prisoner.State.create_messy_root(200)
+    prisoner_batch_state = prisoner.State.create_messy_root(10000, batch=True)
+        
+    return [('life, 100x100', life_state),
+            ('queue, 50 servers', queue_state),
+            ('prisoner, 200 players', prisoner_state),
+            ('prisoner, batch of 10,000 players', prisoner_batch_state)]
+
+
+def copy_many_times(copy_function, state, n_copies):
+    '''Copy the state `n_copies` times.'''
+    for i in xrange(n_copies):
+        copy_function(state)
+        
+        
+def plain_deepcopy(state):
+    '''Deepcopy the state the way `state_deepcopy` falls back to.'''
+    return copy.deepcopy(state, StateCopy())
+
+
+def main(n_copies=1000):
+    for (title, state) in make_states():
+        for copy_function in (plain_deepcopy, state_deepcopy):
+            (result, seconds) = shared.timed(copy_many_times, copy_function,
+                                             state, n_copies)
+            shared.report('%s, %s' % (title, copy_function.__name__),
+                          seconds, n_copies)
+
+    
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
+    
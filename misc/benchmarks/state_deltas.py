@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+
+# Copyright 2009-2011 Ram Rachum.
+# This program is distributed under the LGPL2.1 license.
+
+'''
+Benchmark for storing the states of a long life run as deltas.
+
+Builds a tree with one long natural timeline of a life simulation, once
+storing every state in full and once with `Tree.store_deltas` on, and reports
+how much the process' peak RSS grew per node, and how long it takes to get the
+states of nodes in order and in random order. Unix only, since it uses the
+`resource` module.
+
+Usage: `state_deltas.py [n_nodes] [board_size]`, default is 3,000 nodes of a
+100x100 board.
+'''
+
+import sys
+import random
+import resource
+import multiprocessing
+
+import shared
+
+import garlicsim
+from garlicsim import data_structures as ds
+from garlicsim_lib.simpacks import life
+
+
+def get_peak_rss():
+    '''Get the peak RSS of the current process, in bytes. (Linux semantics.)'''
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def build_tree(n_nodes, board_size, store_deltas):
+    '''Build a tree with a natural timeline of `n_nodes` life states.'''
+    tree = ds.Tree()
+    tree.store_deltas = store_deltas
+    step_profile = garlicsim.misc.StepProfile(life.State.step)
+    random.seed(0)
+    state = life.State.create_messy_root(board_size, board_size)
+    nodes = [tree.add_state(state)]
+    for i in xrange(n_nodes):
+        state = state.step()
+        state.clock = i + 1
+        nodes.append(tree.add_state(state, parent=nodes[-1],
+                                    step_profile=step_profile))
+    return (tree, nodes)
+
+
+def get_states(tree, nodes):
+    '''Get the states of all the nodes, starting with an empty cache.'''
+    tree._state_cache.clear()
+    for node in nodes:
+        node.state
+        
+
+def run(n_nodes, board_size, store_deltas):
+    '''Build a tree and report its memory use and state access times.'''
+    title = 'Deltas' if store_deltas else 'Full states'
+    initial_rss = get_peak_rss()
+    (tree, nodes) = build_tree(n_nodes, board_size, store_deltas)
+    rss_growth = get_peak_rss() - initial_rss
+    print('%s: Peak RSS grew by %.1f MB, %d bytes per node.' %
+          (title, rss_growth / 2.0**20, rss_growth // n_nodes))
+    
+    (result, seconds) = shared.timed(get_states, tree, nodes)
+    shared.report('%s, getting states in order' % title, seconds, len(nodes))
+    
+    shuffled_nodes = nodes[:]
+    random.shuffle(shuffled_nodes)
+    (result, seconds) = shared.timed(get_states, tree, shuffled_nodes)
+    shared.report('%s, getting states in random order' % title, seconds,
+                  len(nodes))
+    
+
+def main(n_nodes=3000, board_size=100):
+    # Running each in its own process, since peak RSS only grows:
+    for store_deltas in (False, True):
+        process = multiprocessing.Process(
+            target=run,
+            args=(n_nodes, board_size, store_deltas)
+        )
+        process.start()
+        process.join()
+
+    
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
+    
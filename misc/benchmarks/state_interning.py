@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+
+# Copyright 2009-2011 Ram Rachum.
+# This program is distributed under the LGPL2.1 license.
+
+'''
+Benchmark for sharing equal states between the forks of a tree.
+
+Builds a tree with many forks from one node of a life simulation, all going
+through the same states, once with `Tree.intern_states` off and once with it
+on, and reports how much the process' peak RSS grew per node and how long
+adding the nodes took. Runs with life states stored in full and as deltas.
+Unix only, since it uses the `resource` module.
+
+Usage: `state_interning.py [n_forks] [n_nodes] [board_size]`, default is 20
+forks of 100 nodes of a 100x100 board.
+'''
+
+import sys
+import random
+import resource
+import multiprocessing
+
+import shared
+
+import garlicsim
+from garlicsim import data_structures as ds
+from garlicsim_lib.simpacks import life
+
+
+def get_peak_rss():
+    '''Get the peak RSS of the current process, in bytes. (Linux semantics.)'''
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def build_tree(tree, states, n_forks):
+    '''Add `n_forks` forks with copies of `states` after a root.'''
+    step_profile = garlicsim.misc.StepProfile(life.State.step)
+    root = tree.add_state(states[0])
+    for i in xrange(n_forks):
+        fork_states = \
+            [garlicsim.misc.state_deepcopy.state_deepcopy(state) for state
+             in states[1:]]
+        tree.add_states(fork_states, root, step_profile)
+        
+
+def run(n_forks, n_nodes, board_size, use_deltas, intern_states):
+    '''Build a tree and report its memory use and the time it took.'''
+    random.seed(0)
+    states = [life.State.create_messy_root(board_size, board_size)]
+    for i in xrange(n_nodes):
+        state = states[-1].step()
+        state.clock = i + 1
+        states.append(state)
+        
+    tree = ds.Tree()
+    tree.store_deltas = use_deltas
+    tree.intern_states = intern_states
+    initial_rss = get_peak_rss()
+    (result, seconds) = shared.timed(build_tree, tree, states, n_forks)
+    rss_growth = get_peak_rss() - initial_rss
+    title = '%s, %s' % ('Deltas' if use_deltas else 'Full states',
+                        'interning' if intern_states else 'no interning')
+    shared.report(title, seconds, n_forks * n_nodes)
+    print('%s: Peak RSS grew by %.1f MB, %d bytes per node, sharing ratio '
+          '%.1f.' % (title, rss_growth / 2.0**20,
+                     rss_growth // (n_forks * n_nodes),
+                     tree.get_sharing_ratio()))
+    
+
+def main(n_forks=20, n_nodes=100, board_size=100):
+    # Running each in its own process, since peak RSS only grows:
+    for use_deltas in (False, True):
+        for intern_states in (False, True):
+            process = multiprocessing.Process(
+                target=run,
+                args=(n_forks, n_nodes, board_size, use_deltas, intern_states)
+            )
+            process.start()
+            process.join()
+
+    
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
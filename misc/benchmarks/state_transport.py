@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+
+# Copyright 2009-2011 Ram Rachum.
+# This program is distributed under the LGPL2.1 license.
+
+'''
+Benchmark for sending big states from a process to the main process.
+
+A child process sends the same big state over and over, once through a
+`multiprocessing.Queue` and once through a `SharedMemoryRing`, the way
+`ProcessCruncher` does, and the main process rebuilds the states. The state
+keeps its data in a flat array, which is what the shared memory hooks suit.
+
+Usage: `state_transport.py [n_cells] [n_states]`, default is 1,000,000 cells
+sent 200 times.
+'''
+
+import sys
+import array
+import random
+import multiprocessing
+
+import shared
+
+import garlicsim
+from garlicsim.asynchronous_crunching.misc import SharedMemoryRing, \
+                                                  StatePayload
+
+
+class ArrayState(garlicsim.data_structures.State):
+    '''A state whose data is an array of bytes.'''
+    
+    def __init__(self, cells):
+        self.cells = cells
+    
+    def dump_payload(self):
+        '''Get the cells as a string.'''
+        return (self.cells.tostring(), None)
+    
+    @classmethod
+    def load_payload(cls, payload, rest):
+        '''Create a state from the output of `dump_payload`.'''
+        cells = array.array('b')
+        cells.fromstring(payload)
+        return cls(cells)
+
+
+def send_states(queue, state, n_states, ring):
+    '''Put `state` in the queue `n_states` times, packing it if given a ring.'''
+    for i in xrange(n_states):
+        queue.put(ring.pack(state) if ring else state)
+
+
+def receive_states(queue, n_states):
+    '''Get `n_states` states from the queue, loading them if needed.'''
+    for i in xrange(n_states):
+        thing = queue.get()
+        if isinstance(thing, StatePayload):
+            thing.load()
+
+
+def run(state, n_states, ring):
+    '''Send the states from a child process and receive them.'''
+    queue = multiprocessing.Queue(10)
+    process = multiprocessing.Process(target=send_states,
+                                      args=(queue, state, n_states, ring))
+    process.start()
+    receive_states(queue, n_states)
+    process.join()
+
+
+def main(n_cells=10**6, n_states=200):
+    state = ArrayState(
+        array.array('b', (random.randint(0, 1) for i in xrange(n_cells)))
+    )
+    state.clock = 0
+
+    (result, seconds) = shared.timed(run, state, n_states, None)
+    shared.report('Pickled through the queue', seconds, n_states)
+
+    ring = SharedMemoryRing(
+        garlicsim.asynchronous_crunching.PROCESS_CRUNCHER_SHARED_MEMORY_SIZE
+    )
+    (result, seconds) = shared.timed(run, state, n_states, ring)
+    shared.report('Through shared memory', seconds, n_states)
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
+
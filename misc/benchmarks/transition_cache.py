@@ -0,0 +1,46 @@
+#!/usr/bin/env python
+
+# Copyright 2009-2011 Ram Rachum.
+# This program is distributed under the LGPL2.1 license.
+
+'''
+Benchmark for crunching the same Life states again, with a transition cache.
+
+Simulates a messy 50x50 Life board several times from the same state, the way
+forks from one node are crunched, first without a transition cache and then
+with one.
+
+Usage: `transition_cache.py [n_steps] [n_forks]`, default is 100 and 5.
+'''
+
+import sys
+
+import shared
+
+import garlicsim
+from garlicsim_lib.simpacks import life
+
+
+def crunch_forks(project, root, n_steps, n_forks):
+    '''Simulate `n_forks` forks of `n_steps` steps from `root`.'''
+    for i in xrange(n_forks):
+        project.simulate(root, n_steps)
+        
+
+def main(n_steps=100, n_forks=5):
+    state = life.State.create_messy_root(50, 50)
+    for use_cache in (False, True):
+        project = garlicsim.Project(life)
+        if use_cache:
+            project.transition_cache = garlicsim.misc.TransitionCache()
+        root = project.root_this_state(state)
+        (_, seconds) = shared.timed(crunch_forks, project, root, n_steps,
+                                    n_forks)
+        shared.report('%s forks of %s steps, %s' %
+                      (n_forks, n_steps,
+                       project.transition_cache or 'no cache'),
+                      seconds, n_steps * n_forks)
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
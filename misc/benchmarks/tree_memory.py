@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+
+# Copyright 2009-2011 Ram Rachum.
+# This program is distributed under the LGPL2.1 license.
+
+'''
+Benchmark for the memory taken by a long natural timeline.
+
+Builds a tree with one long natural timeline of tiny states, and reports how
+much the peak RSS grew, per node. It does this twice, each time in a fresh
+process:
+
+ - With the compact nodes that the tree uses, which have `__slots__` and share
+   their parent's step profile.
+ 
+ - With regular nodes, like the tree used before: Every node has a `__dict__`
+   and its own copy of the step profile.
+
+Unix only, since it uses the `resource` module and forks.
+
+Usage: `tree_memory.py [n_nodes]`, default is 1,000,000 nodes.
+'''
+
+import sys
+import copy
+import resource
+import multiprocessing
+
+import shared
+
+import garlicsim
+from garlicsim import data_structures as ds
+from garlicsim.data_structures.node import Node
+from garlicsim_lib.simpacks import life
+
+
+class TinyState(garlicsim.data_structures.State):
+    '''A state with nothing but a clock, so we mostly measure the tree.'''
+
+    
+def get_peak_rss():
+    '''Get the peak RSS of the current process, in bytes. (Linux semantics.)'''
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def make_regular_node_type():
+    '''Make a `Node` type that has a `__dict__` instead of `__slots__`.'''
+    excluded_names = set(Node.__slots__) | \
+                     set(('__slots__', '__dict__', '__weakref__'))
+    namespace = dict(
+        (name, value) for (name, value) in vars(Node).iteritems() if
+        name not in excluded_names
+    )
+    return type(Node)('Node', Node.__bases__, namespace)
+
+
+def build_timeline(n_nodes, compact, result_queue):
+    '''Build the timeline, and put the peak RSS growth in `result_queue`.'''
+    if not compact:
+        ds.tree.Node = make_regular_node_type()
+    tree = ds.Tree()
+    step_profile = garlicsim.misc.StepProfile(life.State.step)
+    initial_rss = get_peak_rss()
+    
+    current_node = tree.add_state(TinyState())
+    for i in xrange(n_nodes):
+        current_node = tree.add_state(TinyState(), parent=current_node,
+                                      step_profile=step_profile)
+        if not compact:
+            current_node.step_profile = copy.copy(step_profile)
+    assert isinstance(current_node, Node) == compact
+        
+    result_queue.put(get_peak_rss() - initial_rss)
+
+    
+def main(n_nodes=10**6):
+    for (compact, title) in ((False, 'Regular nodes'),
+                             (True, 'Compact nodes')):
+        result_queue = multiprocessing.Queue()
+        process = multiprocessing.Process(target=build_timeline,
+                                          args=(n_nodes, compact,
+                                                result_queue))
+        process.start()
+        rss_growth = result_queue.get()
+        process.join()
+        print('%s: Peak RSS grew by %.1f MB for %s nodes, %d bytes per '
+              'node.' % (title, rss_growth / 2.0**20, n_nodes,
+                         rss_growth // n_nodes))
+
+    
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
+    